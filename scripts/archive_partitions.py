@@ -0,0 +1,47 @@
+import sys
+import os
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.db_manager import engine, SessionLocal
+from src.data.partitions import detach_partitions, list_partitions
+from src.data.cube import refresh_booking_cube
+from src.data.version import bump_data_version
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Archive arrival months by detaching their bookings partitions")
+    parser.add_argument("--before", required=True, help="First month to keep, as YYYY-MM; earlier months are detached")
+    parser.add_argument("--schema", default="archive", help="Schema the detached partitions are moved to")
+    parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be detached")
+    args = parser.parse_args()
+    
+    before = datetime.datetime.strptime(args.before, "%Y-%m").date()
+    
+    if args.dry_run:
+        with engine.connect() as connection:
+            for name, month in list_partitions(connection):
+                if month < before:
+                    print(f"Would detach {name}")
+        return
+    
+    detached = detach_partitions(engine, before, archive_schema=None if args.drop else args.schema, drop=args.drop)
+    for name in detached:
+        print(f"Detached {name}" + (" and dropped it" if args.drop else f" into schema {args.schema}"))
+    
+    if not detached:
+        print("Nothing to archive")
+        return
+    
+    session = SessionLocal()
+    try:
+        refresh_booking_cube(session)
+        bump_data_version(session)
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import sys
+import time
+import json
+import random
+import argparse
+import datetime
+import threading
+import statistics
+import urllib.request
+import urllib.error
+
+def request(url: str, payload=None, timeout: float = 300) -> float:
+
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    
+    start_time = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+    return time.perf_counter() - start_time
+
+def analytics_payload():
+
+    # A random date window defeats the result cache, so every request does real work
+    start = datetime.date(2015, 7, 1) + datetime.timedelta(days=random.randint(0, 700))
+    end = start + datetime.timedelta(days=random.randint(30, 365))
+    return {
+        "report_type": "full",
+        "filters": {"start_date": start.isoformat(), "end_date": end.isoformat()},
+        "include_plots": True
+    }
+
+def ask_payload():
+
+    return {"question": random.choice([
+        "Which country had the most bookings?",
+        "What is the average lead time for resort hotels?",
+        "How many bookings were canceled in August?"
+    ])}
+
+def load_worker(url: str, make_payload, stop: threading.Event, completed: list):
+
+    while not stop.is_set():
+        try:
+            completed.append(request(url, make_payload()))
+        except (urllib.error.URLError, OSError) as e:
+            print(f"Load request failed: {e}")
+            time.sleep(0.5)
+
+def probe_health(base_url: str, duration: float, interval: float) -> list:
+
+    latencies = []
+    end_time = time.perf_counter() + duration
+    while time.perf_counter() < end_time:
+        latencies.append(request(f"{base_url}/health/", timeout=60))
+        time.sleep(interval)
+    return latencies
+
+def summarize(label: str, latencies: list):
+
+    if not latencies:
+        print(f"{label:<28} no samples")
+        return
+    
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<28} n={len(ordered):<5} p50 {statistics.median(ordered) * 1000:8.1f} ms   "
+          f"p95 {p95 * 1000:8.1f} ms   max {ordered[-1] * 1000:8.1f} ms")
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Measure /health latency while /ask and /analytics are saturated")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--ask-clients", type=int, default=4)
+    parser.add_argument("--analytics-clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+    
+    base_url = args.url.rstrip("/")
+    
+    try:
+        request(f"{base_url}/health/", timeout=10)
+    except (urllib.error.URLError, OSError) as e:
+        print(f"API not reachable at {base_url}: {e}")
+        sys.exit(1)
+    
+    print(f"Idle: probing /health for {args.duration:.0f}s")
+    idle = probe_health(base_url, args.duration, args.interval)
+    
+    print(f"Loaded: {args.ask_clients} /ask and {args.analytics_clients} /analytics clients, "
+          f"probing /health for {args.duration:.0f}s")
+    stop = threading.Event()
+    ask_done, analytics_done = [], []
+    workers = [
+        threading.Thread(target=load_worker, args=(f"{base_url}/ask/", ask_payload, stop, ask_done), daemon=True)
+        for _ in range(args.ask_clients)
+    ] + [
+        threading.Thread(target=load_worker, args=(f"{base_url}/analytics/", analytics_payload, stop, analytics_done), daemon=True)
+        for _ in range(args.analytics_clients)
+    ]
+    for worker in workers:
+        worker.start()
+    
+    time.sleep(1)
+    loaded = probe_health(base_url, args.duration, args.interval)
+    stop.set()
+    
+    print()
+    summarize("/health idle", idle)
+    summarize("/health under load", loaded)
+    summarize("/ask", ask_done)
+    summarize("/analytics (full, uncached)", analytics_done)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import sys
+import os
+import json
+import time
+import argparse
+import datetime
+import statistics
+import numpy as np
+import faiss
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import ROOT_DIR, MODEL_PATH, FAISS_TRAIN_SAMPLE
+from src.data.db_manager import SessionLocal
+from src.rag.embedder import TextEmbedder, generate_booking_documents
+from src.rag.index_types import INDEX_TYPES, create_index, set_search_params, index_memory_bytes, training_sample_mask
+
+BENCHMARK_DIR = os.path.join(ROOT_DIR, "data", "benchmarks")
+
+def load_vectors(limit: int, embedder: TextEmbedder) -> np.ndarray:
+
+    # Encoding is by far the slowest part, so the vectors are kept between runs
+    model_name = MODEL_PATH.replace("/", "_")
+    cache_path = os.path.join(BENCHMARK_DIR, f"index_vectors_{model_name}_{limit}.npy")
+    if os.path.exists(cache_path):
+        print(f"Using cached vectors from {cache_path}")
+        return np.load(cache_path)
+    
+    session = SessionLocal()
+    try:
+        batches = []
+        encoded = 0
+        for documents in generate_booking_documents(session):
+            documents = documents[:limit - encoded]
+            batches.append(np.asarray(embedder.embed_batch([doc['text'] for doc in documents]), dtype='float32'))
+            encoded += len(documents)
+            print(f"Encoded {encoded}/{limit} documents")
+            if encoded >= limit:
+                break
+    finally:
+        session.close()
+    
+    vectors = np.vstack(batches)
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    np.save(cache_path, vectors)
+    return vectors
+
+def search_latencies(index, queries: np.ndarray, k: int) -> list:
+
+    # One query per call, as /ask issues them
+    latencies = []
+    for query in queries:
+        start_time = time.perf_counter()
+        index.search(query.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - start_time)
+    return sorted(latencies)
+
+def recall_at_k(found: np.ndarray, expected: np.ndarray) -> float:
+
+    k = expected.shape[1]
+    return float(np.mean([len(set(row) & set(truth)) / k for row, truth in zip(found, expected)]))
+
+def benchmark_type(index_type: str, base: np.ndarray, queries: np.ndarray, ground_truth: np.ndarray, args) -> list:
+
+    index = create_index(base.shape[1], index_type, expected_vectors=len(base), train_sample=args.train_sample)
+    
+    train_seconds = 0.0
+    if not index.is_trained:
+        # The same strided sample a production build trains on; base is in booking-id order
+        sample = base[training_sample_mask(len(base), args.train_sample)]
+        start_time = time.perf_counter()
+        index.train(sample)
+        train_seconds = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    index.add_with_ids(base, np.arange(len(base)))
+    add_seconds = time.perf_counter() - start_time
+    memory_bytes = index_memory_bytes(index)
+    
+    if index_type in ('ivf_flat', 'ivf_pq'):
+        settings = [('nprobe', value) for value in args.nprobe]
+    elif index_type == 'hnsw':
+        settings = [('efSearch', value) for value in args.ef_search]
+    else:
+        settings = [(None, None)]
+    
+    results = []
+    for name, value in settings:
+        set_search_params(index, nprobe=value if name == 'nprobe' else None, ef_search=value if name == 'efSearch' else None)
+        _, found = index.search(queries, args.k)
+        latencies = search_latencies(index, queries, args.k)
+        
+        result = {
+            "index_type": index_type,
+            "parameter": name,
+            "value": value,
+            "k": args.k,
+            f"recall_at_{args.k}": round(recall_at_k(found, ground_truth), 4),
+            "p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 3),
+            "train_seconds": round(train_seconds, 2),
+            "add_seconds": round(add_seconds, 2),
+            "memory_mb": round(memory_bytes / (1024 * 1024), 1),
+            "vectors": len(base)
+        }
+        results.append(result)
+        
+        setting = f"{name}={value}" if name else "exact"
+        print(f"{index_type:<9} {setting:<14} recall@{args.k} {result[f'recall_at_{args.k}']:.3f}   "
+              f"p50 {result['p50_ms']:8.3f} ms   p95 {result['p95_ms']:8.3f} ms   {result['memory_mb']:8.1f} MB")
+    
+    return results
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Compare approximate FAISS index types against exact flat search: recall@k, latency and memory"
+    )
+    parser.add_argument("--limit", type=int, default=100000, help="Booking documents to encode and index")
+    parser.add_argument("--queries", type=int, default=500, help="Held-out documents used as queries")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours per query (/ask retrieves 5)")
+    parser.add_argument("--types", default=",".join(INDEX_TYPES), help="Comma-separated index types")
+    parser.add_argument("--nprobe", default="1,4,16,64", help="IVF lists probed per query, comma-separated")
+    parser.add_argument("--ef-search", default="16,32,64,128", help="HNSW candidate list sizes, comma-separated")
+    parser.add_argument("--train-sample", type=int, default=FAISS_TRAIN_SAMPLE)
+    parser.add_argument("--output", help="JSON report path (default: data/benchmarks/index_report_<time>.json)")
+    args = parser.parse_args()
+    args.nprobe = [int(value) for value in args.nprobe.split(",")]
+    args.ef_search = [int(value) for value in args.ef_search.split(",")]
+    
+    vectors = load_vectors(args.limit + args.queries, TextEmbedder())
+    if len(vectors) <= args.queries:
+        print(f"Need more than {args.queries} bookings to benchmark, found {len(vectors)}")
+        sys.exit(1)
+    
+    # Held-out documents stand in for questions; their exact neighbours are the ground truth
+    order = np.random.default_rng(0).permutation(len(vectors))
+    queries = np.ascontiguousarray(vectors[order[:args.queries]])
+    base = np.ascontiguousarray(vectors[order[args.queries:]])
+    
+    exact = faiss.IndexFlatL2(base.shape[1])
+    exact.add(base)
+    _, ground_truth = exact.search(queries, args.k)
+    del exact
+    
+    print(f"{len(base)} vectors, {len(queries)} queries, dimension {base.shape[1]}")
+    results = []
+    for index_type in args.types.split(","):
+        results.extend(benchmark_type(index_type.strip(), base, queries, ground_truth, args))
+    
+    output = args.output or os.path.join(BENCHMARK_DIR, f"index_report_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": datetime.datetime.now().isoformat(),
+            "model": MODEL_PATH,
+            "parameters": {"vectors": len(base), "queries": len(queries), "k": args.k, "train_sample": args.train_sample},
+            "results": results
+        }, f, indent=2)
+    print(f"Report written to {output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
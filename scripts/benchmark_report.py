@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.db_manager import SessionLocal
+from src.analytics.visualizer import generate_analytics_report, report_plot_specs
+from src.analytics.plots import render_plot
+from src.analytics.fused import generate_fused_report
+from src.analytics.parallel import get_report_executor, shutdown_report_executor, generate_analytics_report_parallel
+from src.config import ANALYTICS_WORKERS
+
+def run_serial():
+
+    session = SessionLocal()
+    try:
+        report_data = generate_analytics_report(session)
+    finally:
+        session.close()
+    
+    for plot_type, data, params in report_plot_specs(report_data).values():
+        render_plot(plot_type, data, params)
+
+def run_fused():
+
+    session = SessionLocal()
+    try:
+        report_data = generate_fused_report(session)
+    finally:
+        session.close()
+    
+    for plot_type, data, params in report_plot_specs(report_data).values():
+        render_plot(plot_type, data, params)
+
+def run_parallel(workers: int):
+
+    report_data = generate_analytics_report_parallel(workers)
+    
+    executor = get_report_executor(workers)
+    futures = [
+        executor.submit(render_plot, plot_type, data, params)
+        for plot_type, data, params in report_plot_specs(report_data).values()
+    ]
+    for future in futures:
+        future.result()
+
+def time_runs(label: str, fn, runs: int):
+
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start_time)
+    
+    print(f"{label:<20} median {statistics.median(timings) * 1000:9.1f} ms   "
+          f"min {min(timings) * 1000:9.1f} ms   max {max(timings) * 1000:9.1f} ms")
+    return statistics.median(timings)
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare serial, fused and process-pool full report generation")
+    parser.add_argument("--workers", type=int, default=max(ANALYTICS_WORKERS, 2))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    
+    print(f"Full report (queries + all plot renders), {args.runs} runs each")
+    
+    start_time = time.perf_counter()
+    run_parallel(args.workers)
+    print(f"Process pool start-up and warm-up with {args.workers} workers: "
+          f"{(time.perf_counter() - start_time) * 1000:.1f} ms")
+    
+    run_serial()
+    
+    try:
+        serial = time_runs("serial", run_serial, args.runs)
+        fused = time_runs("fused", run_fused, args.runs)
+        parallel = time_runs(f"parallel ({args.workers} workers)", lambda: run_parallel(args.workers), args.runs)
+        print(f"Speed-up: fused {serial / fused:.2f}x, parallel {serial / parallel:.2f}x")
+    finally:
+        shutdown_report_executor()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,32 +1,45 @@
 import sys
 import os
+import argparse
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src.data.db_manager import SessionLocal
-from src.rag.embedder import generate_booking_documents
-from src.rag.vector_store import VectorStore
+from src.config import EMBEDDING_WORKERS, EMBEDDING_BATCH_SIZE, EMBEDDING_CHECKPOINT_BATCHES, FAISS_INDEX_TYPE
+from src.rag.index_builder import build_index, update_index
+from src.rag.index_types import INDEX_TYPES
 
-def build_embeddings():
+def build_embeddings(workers: int = EMBEDDING_WORKERS, batch_size: int = EMBEDDING_BATCH_SIZE,
+                     checkpoint_every: int = EMBEDDING_CHECKPOINT_BATCHES, restart: bool = False,
+                     index_type: str = FAISS_INDEX_TYPE, incremental: bool = False):
+    
+    if incremental:
+        print("Updating vector embeddings for changed bookings...")
+        update_index(batch_size=batch_size)
+        return
     
     print("Building vector embeddings for hotel booking data...")
-
-    session = SessionLocal()
     
     try:
-        documents = generate_booking_documents(session)
-        print(f"Generated {len(documents)} document representations")
-
-        vector_store = VectorStore()
-
-        vector_store.add_documents(documents)
+        total = build_index(workers=workers, batch_size=batch_size, checkpoint_every=checkpoint_every, restart=restart,
+                            index_type=index_type)
+        print(f"Generated {total} document representations")
         
         print("Embeddings successfully built and stored using FAISS")
         
     except Exception as e:
         print(f"Error building embeddings: {e}")
         raise
-    finally:
-        session.close()
 
 if __name__ == "__main__":
-    build_embeddings()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the FAISS index over all bookings, resuming an interrupted build")
+    parser.add_argument("--workers", type=int, default=EMBEDDING_WORKERS, help="Encoder processes (1 encodes in-process)")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE, help="Texts per encoder forward pass")
+    parser.add_argument("--checkpoint-every", type=int, default=EMBEDDING_CHECKPOINT_BATCHES,
+                        help="Document batches between index flushes and checkpoints")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=FAISS_INDEX_TYPE,
+                        help="FAISS index: exact flat search or an approximate IVF/HNSW index")
+    parser.add_argument("--restart", action="store_true", help="Discard any interrupted build and start over")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-embed only the bookings changed by incremental loads since the index was built")
+    args = parser.parse_args()
+    
+    build_embeddings(args.workers, args.batch_size, args.checkpoint_every, args.restart, args.index_type, args.incremental)
\ No newline at end of file
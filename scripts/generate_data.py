@@ -0,0 +1,29 @@
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import RAW_DATA_DIR
+from src.data.synthetic import write_synthetic_csv
+
+def parse_rows(value: str) -> int:
+
+    # Accepts plain counts and k/M suffixes, e.g. 100k, 1M, 10M
+    value = value.strip()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1].lower(), 1)
+    return int(float(value[:-1] if multiplier > 1 else value) * multiplier)
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic bookings CSV shaped like hotel_bookings.csv")
+    parser.add_argument("--rows", type=parse_rows, default=parse_rows("100k"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="CSV path (default: data/raw/synthetic_bookings_<rows>.csv)")
+    args = parser.parse_args()
+    
+    output = args.output or os.path.join(RAW_DATA_DIR, f"synthetic_bookings_{args.rows}.csv")
+    write_synthetic_csv(output, args.rows, seed=args.seed)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,13 +1,21 @@
 import sys
 import os
+import argparse
 from sqlalchemy_utils import database_exists, create_database
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.data.db_manager import init_db, engine
+from src.data.db_manager import init_db, engine, SessionLocal
+from src.data.daily_revenue import install_daily_revenue_triggers, rebuild_daily_revenue
+from src.data.partitions import create_partitioned_bookings
 from src.config import DATABASE_URL
 
 def main():
+    parser = argparse.ArgumentParser(description="Create the database, tables, indexes and triggers")
+    parser.add_argument("--partitioned", action="store_true",
+                        help="Create bookings range-partitioned by arrival month (new databases only)")
+    args = parser.parse_args()
+    
     print(f"Initializing database at {DATABASE_URL}")
     
     if not database_exists(engine.url):
@@ -16,8 +24,19 @@ def main():
     else:
         print(f"Database already exists at {DATABASE_URL}")
     
+    if args.partitioned:
+        # Partitions for each arrival month are created by the loader as data arrives
+        create_partitioned_bookings(engine)
+    
     init_db()
     
+    install_daily_revenue_triggers()
+    session = SessionLocal()
+    try:
+        rebuild_daily_revenue(session)
+    finally:
+        session.close()
+    
     print("Database initialization complete")
 
 if __name__ == "__main__":
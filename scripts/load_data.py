@@ -1,83 +1,79 @@
 import sys
 import os
+import argparse
 import pandas as pd
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.data.loader import load_raw_data
-from src.data.cleaner import clean_data
-from src.data.db_manager import engine, SessionLocal, Hotel, Country, Booking
+from src.data.loader import load_clean_chunks, source_arrival_months
+from src.data.db_manager import engine, SessionLocal, Booking
+from src.data.bulk import bulk_load_bookings
+from src.data.ingest import upsert_bookings, write_changed_ids
+from src.data.parallel_ingest import parallel_ingest
+from src.data.partitions import ensure_partitions
+from src.data.cube import refresh_booking_cube, update_booking_cube
+from src.data.version import bump_data_version
+from src.config import INGEST_WORKERS
 
-def load_data_to_db():
+def load_data_to_db(file_path=None, incremental=False, workers=1):
     print("Loading and processing the dataset...")
     
-    df = load_raw_data()
-    df_clean = clean_data(df)
-    
-    print(f"Processed {len(df_clean)} booking records")
+    # Chunks are read, cleaned and copied one at a time, so memory stays bounded for any file size;
+    # an unchanged source file is read back from the processed Parquet cache instead of re-parsed.
+    # With several workers the CSV is split into byte ranges cleaned and loaded in parallel instead.
+    chunks = load_clean_chunks(file_path) if workers <= 1 else None
 
     session = SessionLocal()
     
     try:
-        print("Loading hotels...")
-        hotels = {}
-        for hotel_type in df_clean['hotel'].unique():
-            hotel = Hotel(name=hotel_type, type=hotel_type)
-            session.add(hotel)
-            hotels[hotel_type] = hotel
+        # A full load appends with COPY, which the unique source key index rejects part way through once
+        # the bookings are already there; loading the file again merges it instead. The check runs on its
+        # own connection, so no open transaction holds a lock that partition creation by workers waits on
+        if not incremental:
+            with engine.connect() as connection:
+                loaded = connection.execute(select(Booking.id).limit(1)).first() is not None
+            if loaded:
+                print("Bookings are already loaded; merging new and changed rows as with --incremental")
+                incremental = True
         
-        print("Loading countries...")
-        countries = {}
-        for country_name in df_clean['country'].unique():
-            country = Country(name=country_name)
-            session.add(country)
-            countries[country_name] = country
+        if workers <= 1:
+            # Partitions cannot be created once the single load transaction has written to bookings
+            ensure_partitions(engine, source_arrival_months(file_path))
         
-        session.commit()
+        if workers > 1:
+            total_rows, changes = parallel_ingest(file_path, workers, incremental)
+            print(f"Processed {total_rows} booking records")
+            if incremental and not changes['inserted'] and not changes['updated']:
+                print("No booking changes; cube and data version left as they are")
+                return
+        elif incremental:
+            print("Merging new and changed bookings...")
+            changes = upsert_bookings(session, chunks)
+            if not changes['inserted'] and not changes['updated']:
+                print("No booking changes; cube and data version left as they are")
+                return
+        else:
+            print("Loading bookings...")
+            total_rows = bulk_load_bookings(session, chunks)
+            print(f"Processed {total_rows} booking records")
         
-        print("Loading bookings...")
-        batch_size = 1000
-        total_rows = len(df_clean)
+        print("Data loaded successfully to the database")
         
-        for i in range(0, total_rows, batch_size):
-            print(f"Processing batch {i//batch_size + 1}/{(total_rows//batch_size) + 1}")
-            batch = df_clean.iloc[i:i+batch_size]
-            
-            for _, row in batch.iterrows():
-                booking = Booking(
-                    hotel_id=hotels[row['hotel']].id,
-                    is_canceled=bool(row['is_canceled']),
-                    lead_time=row['lead_time'],
-                    arrival_date=row['arrival_date'],
-                    departure_date=row['departure_date'],
-                    adults=row['adults'],
-                    children=row['children'],
-                    babies=row['babies'],
-                    country_id=countries[row['country']].id,
-                    market_segment=row['market_segment'],
-                    distribution_channel=row['distribution_channel'],
-                    is_repeated_guest=bool(row['is_repeated_guest']),
-                    previous_cancellations=row['previous_cancellations'],
-                    previous_bookings_not_canceled=row['previous_bookings_not_canceled'],
-                    reserved_room_type=row['reserved_room_type'],
-                    assigned_room_type=row['assigned_room_type'],
-                    booking_changes=row['booking_changes'],
-                    deposit_type=row['deposit_type'],
-                    days_in_waiting_list=row['days_in_waiting_list'],
-                    customer_type=row['customer_type'],
-                    adr=row['adr'],
-                    required_car_parking_spaces=row['required_car_parking_spaces'],
-                    total_of_special_requests=row['total_of_special_requests'],
-                    reservation_status=row['reservation_status'],
-                    reservation_status_date=pd.to_datetime(row['reservation_status_date']),
-                    total_nights=row['total_nights']
-                )
-                session.add(booking)
-            
-            session.commit()
+        # A full load rebuilds the cube; an incremental one recomputes only the days its changes touch
+        if incremental:
+            print("Updating booking cube...")
+            update_booking_cube(session, changes['inserted'] + changes['updated'])
+        else:
+            print("Building booking cube...")
+            refresh_booking_cube(session)
         
-        print("Data loaded successfully to the database")
+        # Invalidates every cached analytics result computed from the previous data
+        data_version = bump_data_version(session)
+        
+        if incremental:
+            write_changed_ids(changes, data_version)
         
     except Exception as e:
         session.rollback()
@@ -87,4 +83,12 @@ def load_data_to_db():
         session.close()
 
 if __name__ == "__main__":
-    load_data_to_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the hotel bookings CSV into the database")
+    parser.add_argument("--file", help="CSV to load instead of the default dataset")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Upsert only new or changed bookings (the default once bookings are loaded)")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS,
+                        help="Worker processes that clean and load partitions of the file in parallel")
+    args = parser.parse_args()
+    
+    load_data_to_db(args.file, args.incremental, args.workers)
\ No newline at end of file
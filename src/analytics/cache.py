@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from src.config import ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL, ANALYTICS_CACHE_DIR, ANALYTICS_CACHE_MAX_BYTES
+
+def cache_key(report_type: str, period: Optional[str], filters: Optional[Dict[str, Any]], data_version: int) -> str:
+
+    payload = json.dumps(
+        {'report_type': report_type, 'period': period, 'filters': filters or {}, 'data_version': data_version},
+        sort_keys=True,
+        default=str
+    )
+    # Prefixed with the data version, so the disk tier can drop reports of older versions by file name
+    return f"{data_version}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def _key_version(key: str) -> Optional[int]:
+
+    version, _, digest = key.partition('-')
+    return int(version) if version.isdigit() and digest else None
+
+class AnalyticsCache:
+    def __init__(self, max_entries: int = 128, ttl: float = 3600, cache_dir: str = "", max_bytes: int = 256 << 20):
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _disk_path(self, key: str) -> str:
+
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+    
+    def _get_from_disk(self, key: str) -> Optional[Any]:
+
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+    
+    def _set_on_disk(self, key: str, value: Any):
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._prune_disk(_key_version(key))
+    
+    def _disk_files(self):
+
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        
+        files = []
+        for name in names:
+            if not name.endswith('.pkl'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+        return files
+    
+    def _prune_disk(self, data_version: Optional[int]):
+
+        # Runs after each write, which only happens on a cache miss that computed a whole report, so the
+        # directory scan is cheap next to it. Reports of older data versions can never be hit again, expired
+        # ones are removed before they are read, and the oldest of the rest go once the tier passes max_bytes
+        now = time.time()
+        kept = []
+        stale = []
+        for mtime, size, name in self._disk_files():
+            version = _key_version(name[:-len('.pkl')])
+            if now - mtime > self.ttl or (data_version is not None and (version is None or version < data_version)):
+                stale.append(name)
+            else:
+                kept.append((mtime, size, name))
+        
+        total = sum(size for _, size, _ in kept)
+        if self.max_bytes > 0:
+            for mtime, size, name in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                stale.append(name)
+                total -= size
+        
+        for name in stale:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                # Another worker sharing the directory removed it first
+                pass
+    
+    def get(self, key: str) -> Optional[Any]:
+
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+        
+        value = self._get_from_disk(key) if self.cache_dir else None
+        
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        
+        # Promote disk hits so repeated requests are served from memory
+        self._set_in_memory(key, value)
+        return value
+    
+    def _set_in_memory(self, key: str, value: Any):
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def set(self, key: str, value: Any):
+
+        if self.max_entries > 0:
+            self._set_in_memory(key, value)
+        if self.cache_dir:
+            self._set_on_disk(key, value)
+    
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for _, _, name in self._disk_files():
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+    
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'disk_tier': bool(self.cache_dir),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+analytics_cache = AnalyticsCache(ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL, ANALYTICS_CACHE_DIR, ANALYTICS_CACHE_MAX_BYTES)
\ No newline at end of file
@@ -1,68 +1,92 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sqlalchemy import func, desc, extract
+from sqlalchemy import func, desc, extract, case
 from sqlalchemy.orm import Session
-import io
-import base64
-from src.data.db_manager import Booking, Country, Hotel
+from typing import Any, Dict, Optional
+from src.data.db_manager import BookingCube, Country, Hotel
+from src.analytics.filters import apply_filters
 
-def get_cancellation_rate(session: Session):
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
-    total_bookings = session.query(func.count(Booking.id)).scalar()
-    canceled_bookings = session.query(func.count(Booking.id)).filter(Booking.is_canceled == True).scalar()
+def get_cancellation_rate(session: Session, filters: Optional[Dict[str, Any]] = None):
+
+    query = session.query(
+        func.sum(BookingCube.booking_count),
+        func.sum(case((BookingCube.is_canceled == True, BookingCube.booking_count), else_=0))
+    )
+    
+    totals = apply_filters(query, BookingCube, filters).one()
     
+    return {
+        'data': cancellation_rate_data(totals[0] or 0, totals[1] or 0)
+    }
+
+def cancellation_rate_data(total_bookings, canceled_bookings):
+
     cancellation_rate = (canceled_bookings / total_bookings) * 100 if total_bookings > 0 else 0
     
+    return {
+        'total_bookings': total_bookings,
+        'canceled_bookings': canceled_bookings,
+        'confirmed_bookings': total_bookings - canceled_bookings,
+        'cancellation_rate': cancellation_rate
+    }
+
+def plot_cancellation_rate(data):
+
     # Create a pie chart
     plt.figure(figsize=(8, 8))
-    plt.pie(
-        [canceled_bookings, total_bookings - canceled_bookings],
-        labels=['Canceled', 'Confirmed'],
-        autopct='%1.1f%%',
-        startangle=90,
-        colors=['#ff9999', '#66b3ff']
-    )
+    if data['total_bookings'] > 0:
+        plt.pie(
+            [data['canceled_bookings'], data['confirmed_bookings']],
+            labels=['Canceled', 'Confirmed'],
+            autopct='%1.1f%%',
+            startangle=90,
+            colors=['#ff9999', '#66b3ff']
+        )
+    else:
+        plt.text(0.5, 0.5, 'No bookings', ha='center', va='center')
     plt.title('Booking Cancellation Rate')
     plt.axis('equal')
-    
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'data': {
-            'total_bookings': total_bookings,
-            'canceled_bookings': canceled_bookings,
-            'confirmed_bookings': total_bookings - canceled_bookings,
-            'cancellation_rate': cancellation_rate
-        },
-        'plot': f"data:image/png;base64,{image_base64}"
-    }
 
-def get_cancellation_by_country(session: Session, top_n: int = 10):
+def get_cancellation_by_country(session: Session, top_n: int = 10, filters: Optional[Dict[str, Any]] = None):
 
-    country_stats = session.query(
+    query = session.query(
         Country.name.label('country'),
-        func.count(Booking.id).label('total_bookings'),
-        func.sum(func.cast(Booking.is_canceled, 'integer')).label('canceled_bookings')
+        func.sum(BookingCube.booking_count).label('total_bookings'),
+        func.sum(case((BookingCube.is_canceled == True, BookingCube.booking_count), else_=0)).label('canceled_bookings')
     ).join(
-        Booking, Country.id == Booking.country_id
-    ).group_by(
+        BookingCube, Country.id == BookingCube.country_id
+    )
+    
+    country_stats = apply_filters(query, BookingCube, filters).group_by(
         Country.name
     ).having(
-        func.count(Booking.id) > 10  
+        func.sum(BookingCube.booking_count) > 10
     ).order_by(
         desc('total_bookings')
     ).limit(top_n).all()
     
-    df = pd.DataFrame(country_stats)
+    df = format_cancellation_by_country(
+        pd.DataFrame(country_stats, columns=['country', 'total_bookings', 'canceled_bookings'])
+    )
     
+    return {
+        'data': df.to_dict(orient='records')
+    }
+
+def format_cancellation_by_country(df: pd.DataFrame) -> pd.DataFrame:
+
+    df = df.astype({'total_bookings': 'int64', 'canceled_bookings': 'int64'})
     df['cancellation_rate'] = (df['canceled_bookings'] / df['total_bookings'] * 100).round(2)
     
-    df = df.sort_values('cancellation_rate', ascending=False)
+    return df.sort_values('cancellation_rate', ascending=False)
+
+def plot_cancellation_by_country(data, top_n: int = 10):
+
+    df = pd.DataFrame(data, columns=['country', 'cancellation_rate'])
     
     # Create visualization
     plt.figure(figsize=(12, 6))
@@ -70,11 +94,11 @@ def get_cancellation_by_country(session: Session, top_n: int = 10):
     
     for i, bar in enumerate(bars):
         if df['cancellation_rate'].iloc[i] > 50:
-            bar.set_color('#ff6666')  
+            bar.set_color('#ff6666')
         elif df['cancellation_rate'].iloc[i] > 30:
-            bar.set_color('#ffcc66') 
+            bar.set_color('#ffcc66')
         else:
-            bar.set_color('#66cc66') 
+            bar.set_color('#66cc66')
     
     plt.title(f'Cancellation Rate by Country (Top {top_n})')
     plt.xlabel('Country')
@@ -82,37 +106,41 @@ def get_cancellation_by_country(session: Session, top_n: int = 10):
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'data': df.to_dict(orient='records'),
-        'plot': f"data:image/png;base64,{image_base64}"
-    }
 
-def get_cancellation_by_month(session: Session):
+def get_cancellation_by_month(session: Session, filters: Optional[Dict[str, Any]] = None):
 
-    monthly_stats = session.query(
-        extract('month', Booking.arrival_date).label('month'),
-        func.count(Booking.id).label('total_bookings'),
-        func.sum(func.cast(Booking.is_canceled, 'integer')).label('canceled_bookings')
-    ).group_by(
-        extract('month', Booking.arrival_date)
+    query = session.query(
+        extract('month', BookingCube.arrival_date).label('month'),
+        func.sum(BookingCube.booking_count).label('total_bookings'),
+        func.sum(case((BookingCube.is_canceled == True, BookingCube.booking_count), else_=0)).label('canceled_bookings')
+    )
+    
+    monthly_stats = apply_filters(query, BookingCube, filters).group_by(
+        extract('month', BookingCube.arrival_date)
     ).order_by(
         'month'
     ).all()
     
-    df = pd.DataFrame(monthly_stats)
+    df = format_cancellation_by_month(
+        pd.DataFrame(monthly_stats, columns=['month', 'total_bookings', 'canceled_bookings'])
+    )
     
+    return {
+        'data': df.to_dict(orient='records')
+    }
+
+def format_cancellation_by_month(df: pd.DataFrame) -> pd.DataFrame:
+
+    df = df.astype({'total_bookings': 'int64', 'canceled_bookings': 'int64'})
     df['cancellation_rate'] = (df['canceled_bookings'] / df['total_bookings'] * 100).round(2)
     
-    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-    df['month_name'] = df['month'].apply(lambda x: month_names[int(x)-1])
+    df['month_name'] = df['month'].apply(lambda x: MONTH_NAMES[int(x)-1])
+    
+    return df
+
+def plot_cancellation_by_month(data):
+
+    df = pd.DataFrame(data, columns=['month_name', 'cancellation_rate'])
     
     plt.figure(figsize=(12, 6))
     plt.plot(df['month_name'], df['cancellation_rate'], marker='o', linestyle='-', color='#3366cc')
@@ -120,15 +148,4 @@ def get_cancellation_by_month(session: Session):
     plt.xlabel('Month')
     plt.ylabel('Cancellation Rate (%)')
     plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'data': df.to_dict(orient='records'),
-        'plot': f"data:image/png;base64,{image_base64}"
-    }
\ No newline at end of file
+    plt.tight_layout()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, or_, cast, String
+from src.data.db_manager import Hotel, Country
+
+DATE_FILTERS = ['start_date', 'end_date']
+VALUE_FILTERS = ['hotel', 'country', 'market_segment', 'distribution_channel']
+
+def _as_list(value: Any) -> List[Any]:
+
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+def _as_date(name: str, value: Any) -> datetime.date:
+
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Filter '{name}' must be an ISO date (YYYY-MM-DD), got {value!r}")
+
+def parse_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+
+    if not filters:
+        return {}
+    
+    unknown = set(filters) - set(DATE_FILTERS) - set(VALUE_FILTERS)
+    if unknown:
+        raise ValueError(
+            f"Unknown filters: {', '.join(sorted(unknown))}. "
+            f"Supported filters: {', '.join(DATE_FILTERS + VALUE_FILTERS)}"
+        )
+    
+    parsed = {}
+    for name in DATE_FILTERS:
+        if filters.get(name) is not None:
+            parsed[name] = _as_date(name, filters[name])
+    for name in VALUE_FILTERS:
+        if filters.get(name) is not None:
+            parsed[name] = _as_list(filters[name])
+    
+    if 'start_date' in parsed and 'end_date' in parsed and parsed['start_date'] > parsed['end_date']:
+        raise ValueError("Filter 'start_date' must not be after 'end_date'")
+    
+    return parsed
+
+def apply_filters(query, model, filters: Optional[Dict[str, Any]]):
+
+    # Works for both Booking and BookingCube, which share the filterable columns
+    filters = parse_filters(filters)
+    
+    if 'start_date' in filters:
+        query = query.filter(model.arrival_date >= filters['start_date'])
+    if 'end_date' in filters:
+        query = query.filter(model.arrival_date <= filters['end_date'])
+    if 'hotel' in filters:
+        hotel_ids = select(Hotel.id).where(or_(Hotel.name.in_(filters['hotel']), Hotel.type.in_(filters['hotel'])))
+        query = query.filter(model.hotel_id.in_(hotel_ids))
+    if 'country' in filters:
+        country_ids = select(Country.id).where(Country.name.in_(filters['country']))
+        query = query.filter(model.country_id.in_(country_ids))
+    # Label columns are enums; comparing as text makes an unknown label match nothing instead of failing
+    if 'market_segment' in filters:
+        query = query.filter(cast(model.market_segment, String).in_(filters['market_segment']))
+    if 'distribution_channel' in filters:
+        query = query.filter(cast(model.distribution_channel, String).in_(filters['distribution_channel']))
+    
+    return query
\ No newline at end of file
@@ -0,0 +1,108 @@
+import pandas as pd
+from sqlalchemy import func, extract, case, tuple_
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
+from src.data.db_manager import BookingCube, Country, Hotel
+from src.analytics.filters import apply_filters
+from src.analytics.revenue import revenue_period_columns, format_revenue_trends
+from src.analytics.cancellation import cancellation_rate_data, format_cancellation_by_country, format_cancellation_by_month
+from src.analytics.geographic import format_geographic_distribution
+from src.analytics.lead_time import get_lead_time_distribution, format_lead_time_vs_cancellation
+
+def _query_cube_grouping_sets(session: Session, period: str, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+
+    period_columns = revenue_period_columns(BookingCube.arrival_date, period)
+    month_of_year = extract('month', BookingCube.arrival_date)
+    
+    # One grouping set per report section, plus the empty set for the overall totals
+    dimensions = {
+        'period': [column.element for column in period_columns],
+        'hotel_type': [Hotel.type],
+        'country': [Country.name],
+        'month_of_year': [month_of_year],
+        'lead_time_bucket': [BookingCube.lead_time_bucket]
+    }
+    
+    query = session.query(
+        *period_columns,
+        Hotel.type.label('hotel_type'),
+        Country.name.label('country'),
+        month_of_year.label('month_of_year'),
+        BookingCube.lead_time_bucket.label('lead_time_bucket'),
+        *[func.grouping(expressions[0]).label(f'grouping_{name}') for name, expressions in dimensions.items()],
+        func.sum(BookingCube.booking_count).label('total_bookings'),
+        func.sum(case((BookingCube.is_canceled == True, BookingCube.booking_count), else_=0)).label('canceled_bookings'),
+        func.sum(case((BookingCube.is_canceled == False, BookingCube.revenue_sum), else_=0)).label('revenue'),
+        func.sum(BookingCube.lead_time_sum).label('lead_time_sum')
+    ).select_from(
+        BookingCube
+    ).join(
+        Hotel, Hotel.id == BookingCube.hotel_id
+    ).join(
+        Country, Country.id == BookingCube.country_id
+    )
+    
+    query = apply_filters(query, BookingCube, filters).group_by(
+        func.grouping_sets(*[tuple_(*expressions) for expressions in dimensions.values()], tuple_())
+    )
+    
+    rows = pd.DataFrame(query.all())
+    rows.attrs['dimensions'] = list(dimensions)
+    return rows
+
+def _grouping_set(rows: pd.DataFrame, name: str) -> pd.DataFrame:
+
+    return rows[rows[f'grouping_{name}'] == 0].copy()
+
+def generate_fused_report(session: Session, period: str = 'monthly', country_top_n: int = 10, geography_top_n: int = 15,
+                          filters: Optional[Dict[str, Any]] = None):
+
+    rows = _query_cube_grouping_sets(session, period, filters)
+    
+    grouping_columns = [f'grouping_{name}' for name in rows.attrs['dimensions']]
+    overall = rows[(rows[grouping_columns] == 1).all(axis=1)].iloc[0]
+    
+    # Revenue only counts periods and hotel types with at least one confirmed booking
+    trends = _grouping_set(rows, 'period')
+    trends = trends[trends['total_bookings'] > trends['canceled_bookings']]
+    period_names = [column.name for column in revenue_period_columns(BookingCube.arrival_date, period)]
+    trends = format_revenue_trends(trends.sort_values(period_names)[period_names + ['revenue']], period)
+    
+    by_hotel_type = _grouping_set(rows, 'hotel_type')
+    by_hotel_type = by_hotel_type[by_hotel_type['total_bookings'] > by_hotel_type['canceled_bookings']]
+    
+    countries = _grouping_set(rows, 'country').sort_values('total_bookings', ascending=False)
+    by_country = countries[countries['total_bookings'] > 10].head(country_top_n)
+    by_country = format_cancellation_by_country(by_country[['country', 'total_bookings', 'canceled_bookings']])
+    distribution = format_geographic_distribution(
+        countries.head(geography_top_n)[['country', 'total_bookings']].rename(columns={'total_bookings': 'bookings'})
+    )
+    
+    by_month = _grouping_set(rows, 'month_of_year').sort_values('month_of_year')
+    by_month = format_cancellation_by_month(
+        by_month[['month_of_year', 'total_bookings', 'canceled_bookings']].rename(columns={'month_of_year': 'month'})
+    )
+    
+    by_lead_time = _grouping_set(rows, 'lead_time_bucket').astype({'lead_time_bucket': int})
+    by_lead_time = format_lead_time_vs_cancellation(
+        by_lead_time[['lead_time_bucket', 'total_bookings', 'canceled_bookings', 'lead_time_sum']]
+    )
+    
+    return {
+        'revenue': {
+            'trends': {'data': trends.to_dict(orient='records')},
+            'by_hotel_type': {'data': by_hotel_type[['hotel_type', 'revenue']].to_dict(orient='records')}
+        },
+        'cancellation': {
+            'overall_rate': {'data': cancellation_rate_data(int(overall['total_bookings'] or 0), int(overall['canceled_bookings'] or 0))},
+            'by_country': {'data': by_country.to_dict(orient='records')},
+            'by_month': {'data': by_month.to_dict(orient='records')}
+        },
+        'geography': {
+            'distribution': {'data': distribution.to_dict(orient='records')}
+        },
+        'lead_time': {
+            'distribution': get_lead_time_distribution(session, filters=filters),
+            'vs_cancellation': {'data': by_lead_time.reset_index().to_dict(orient='records')}
+        }
+    }
\ No newline at end of file
@@ -4,28 +4,43 @@ import seaborn as sns
 import numpy as np
 from sqlalchemy import func, desc
 from sqlalchemy.orm import Session
-import io
-import base64
-from src.data.db_manager import Booking, Country
+from typing import Any, Dict, Optional
+from src.data.db_manager import BookingCube, Country
+from src.analytics.filters import apply_filters
 
-def get_geographic_distribution(session: Session, top_n: int = 15):
+def get_geographic_distribution(session: Session, top_n: int = 15, filters: Optional[Dict[str, Any]] = None):
 
-    country_stats = session.query(
+    query = session.query(
         Country.name.label('country'),
-        func.count(Booking.id).label('bookings')
+        func.sum(BookingCube.booking_count).label('bookings')
     ).join(
-        Booking, Country.id == Booking.country_id
-    ).group_by(
+        BookingCube, Country.id == BookingCube.country_id
+    )
+    
+    country_stats = apply_filters(query, BookingCube, filters).group_by(
         Country.name
     ).order_by(
         desc('bookings')
     ).limit(top_n).all()
     
-    df = pd.DataFrame(country_stats)
+    df = format_geographic_distribution(pd.DataFrame(country_stats, columns=['country', 'bookings']))
     
+    return {
+        'data': df.to_dict(orient='records')
+    }
+
+def format_geographic_distribution(df: pd.DataFrame) -> pd.DataFrame:
+
+    df = df.astype({'bookings': 'int64'})
     total_bookings = df['bookings'].sum()
     df['percentage'] = (df['bookings'] / total_bookings * 100).round(2)
     
+    return df
+
+def plot_geographic_bar(data, top_n: int = 15):
+
+    df = pd.DataFrame(data, columns=['country', 'bookings'])
+    
     plt.figure(figsize=(10, 8))
     bars = plt.barh(df['country'], df['bookings'])
     
@@ -38,12 +53,10 @@ def get_geographic_distribution(session: Session, top_n: int = 15):
     plt.ylabel('Country')
     plt.grid(axis='x', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
+
+def plot_geographic_pie(data):
+
+    df = pd.DataFrame(data, columns=['country', 'bookings', 'percentage'])
     
     # Create pie chart 
     plt.figure(figsize=(10, 8))
@@ -55,24 +68,15 @@ def get_geographic_distribution(session: Session, top_n: int = 15):
     }])
     pie_data = pd.concat([top5, others])
     
-    plt.pie(
-        pie_data['bookings'],
-        labels=pie_data['country'],
-        autopct='%1.1f%%',
-        startangle=90,
-        colors=plt.cm.Paired(np.linspace(0, 1, len(pie_data)))
-    )
+    if pie_data['bookings'].sum() > 0:
+        plt.pie(
+            pie_data['bookings'],
+            labels=pie_data['country'],
+            autopct='%1.1f%%',
+            startangle=90,
+            colors=plt.cm.Paired(np.linspace(0, 1, len(pie_data)))
+        )
+    else:
+        plt.text(0.5, 0.5, 'No bookings', ha='center', va='center')
     plt.title('Top 5 Countries by Booking Volume')
-    plt.axis('equal')
-    
-    buffer2 = io.BytesIO()
-    plt.savefig(buffer2, format='png')
-    buffer2.seek(0)
-    pie_image_base64 = base64.b64encode(buffer2.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'data': df.to_dict(orient='records'),
-        'bar_plot': f"data:image/png;base64,{image_base64}",
-        'pie_plot': f"data:image/png;base64,{pie_image_base64}"
-    }
\ No newline at end of file
+    plt.axis('equal')
\ No newline at end of file
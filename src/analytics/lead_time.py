@@ -2,103 +2,252 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from sqlalchemy import func
+from sqlalchemy import func, case, cast, type_coerce, tuple_, true, Float
+from sqlalchemy.dialects.postgresql import array, aggregate_order_by, ARRAY
 from sqlalchemy.orm import Session
-import io
-import base64
-from src.data.db_manager import Booking, Hotel
+from typing import Any, Dict, Optional
+from src.data.db_manager import Booking, BookingCube, Hotel
+from src.data.cube import LEAD_TIME_BUCKET_LABELS
+from src.analytics.filters import apply_filters
 
-def get_lead_time_distribution(session: Session):
+LEAD_TIME_QUANTILES = [0.25, 0.5, 0.75, 0.9]
 
-    lead_times = session.query(Booking.lead_time).all()
+def _lead_time_statistics(session: Session, bins: int, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+
+    # One statement: the summary CTE feeds the histogram range and whisker fences of the shape CTE, and
+    # both are joined back into one row per hotel type plus the overall row
+    quantiles = func.percentile_cont(
+        array(LEAD_TIME_QUANTILES, type_=Float)
+    ).within_group(Booking.lead_time)
     
-    lead_times = [lt[0] for lt in lead_times]
+    summary_query = session.query(
+        Hotel.type.label('hotel_type'),
+        func.grouping(Hotel.type).label('is_overall'),
+        func.count(Booking.id).label('bookings'),
+        func.avg(Booking.lead_time).label('mean'),
+        func.stddev_pop(Booking.lead_time).label('std'),
+        func.min(Booking.lead_time).label('min'),
+        func.max(Booking.lead_time).label('max'),
+        quantiles.label('quantiles')
+    ).join(
+        Booking, Hotel.id == Booking.hotel_id
+    )
     
-    stats = {
-        'mean': np.mean(lead_times),
-        'median': np.median(lead_times),
-        'min': np.min(lead_times),
-        'max': np.max(lead_times),
-        'std': np.std(lead_times),
-        'quantiles': {
-            '25%': np.percentile(lead_times, 25),
-            '50%': np.percentile(lead_times, 50),
-            '75%': np.percentile(lead_times, 75),
-            '90%': np.percentile(lead_times, 90),
+    summary = apply_filters(summary_query, Booking, filters).group_by(
+        func.grouping_sets(tuple_(Hotel.type), tuple_())
+    ).cte('lead_time_summary')
+    
+    # Same range np.histogram uses, including its widening of a degenerate range
+    degenerate = summary.c['min'] == summary.c['max']
+    bounds = session.query(
+        case((degenerate, summary.c['min'] - 0.5), else_=summary.c['min']).label('lower'),
+        case((degenerate, summary.c['max'] + 0.5), else_=summary.c['max']).label('upper')
+    ).filter(summary.c.is_overall == 1).cte('lead_time_bounds')
+    
+    # Whisker ends follow the usual 1.5 * IQR rule around each hotel type's quartiles
+    quartiles = type_coerce(summary.c.quantiles, ARRAY(Float))
+    q1, q3 = quartiles[1], quartiles[3]
+    fences = session.query(
+        summary.c.hotel_type,
+        (q1 - 1.5 * (q3 - q1)).label('lower_fence'),
+        (q3 + 1.5 * (q3 - q1)).label('upper_fence')
+    ).filter(summary.c.is_overall == 0).cte('lead_time_fences')
+    
+    # width_bucket puts the maximum in bucket bins + 1; np.histogram closes the last bin instead
+    bucket = func.least(func.width_bucket(cast(Booking.lead_time, Float), bounds.c.lower, bounds.c.upper, bins), bins)
+    
+    shape_query = session.query(
+        Hotel.type.label('hotel_type'),
+        bucket.label('bucket'),
+        func.grouping(Hotel.type).label('is_histogram'),
+        func.count(Booking.id).label('bookings'),
+        func.min(Booking.lead_time).filter(Booking.lead_time >= fences.c.lower_fence).label('whislo'),
+        func.max(Booking.lead_time).filter(Booking.lead_time <= fences.c.upper_fence).label('whishi')
+    ).join(
+        Booking, Hotel.id == Booking.hotel_id
+    ).join(
+        fences, fences.c.hotel_type == Hotel.type
+    ).join(
+        bounds, true()
+    )
+    
+    shape = apply_filters(shape_query, Booking, filters).group_by(
+        func.grouping_sets(tuple_(Hotel.type), tuple_(bucket))
+    ).cte('lead_time_shape')
+    
+    whiskers = session.query(shape).filter(shape.c.is_histogram == 0).subquery('lead_time_whiskers')
+    histogram = session.query(
+        func.array_agg(aggregate_order_by(shape.c.bucket, shape.c.bucket)).label('histogram_buckets'),
+        func.array_agg(aggregate_order_by(shape.c.bookings, shape.c.bucket)).label('histogram_counts')
+    ).filter(shape.c.is_histogram == 1).subquery('lead_time_histogram')
+    
+    statistics = session.query(
+        summary,
+        bounds.c.lower,
+        bounds.c.upper,
+        whiskers.c.whislo,
+        whiskers.c.whishi,
+        histogram.c.histogram_buckets,
+        histogram.c.histogram_counts
+    ).select_from(
+        summary
+    ).outerjoin(
+        bounds, true()
+    ).outerjoin(
+        whiskers, whiskers.c.hotel_type == summary.c.hotel_type
+    ).outerjoin(
+        histogram, summary.c.is_overall == 1
+    ).all()
+    
+    return pd.DataFrame(statistics, columns=[
+        'hotel_type', 'is_overall', 'bookings', 'mean', 'std', 'min', 'max', 'quantiles', 'lower', 'upper',
+        'whislo', 'whishi', 'histogram_buckets', 'histogram_counts'
+    ])
+
+def get_lead_time_distribution(session: Session, bins: int = 30, filters: Optional[Dict[str, Any]] = None):
+
+    statistics = _lead_time_statistics(session, bins, filters)
+    overall = statistics[statistics['is_overall'] == 1].iloc[0]
+    
+    if not overall['bookings']:
+        return {
+            'stats': {},
+            'histogram': {'edges': [], 'counts': []},
+            'by_hotel_type': []
         }
+    
+    quantiles = dict(zip(['25%', '50%', '75%', '90%'], overall['quantiles']))
+    
+    stats = {
+        'mean': float(overall['mean']),
+        'median': float(quantiles['50%']),
+        'min': float(overall['min']),
+        'max': float(overall['max']),
+        'std': float(overall['std']),
+        'quantiles': {name: float(value) for name, value in quantiles.items()}
     }
     
+    by_hotel_type = statistics[statistics['is_overall'] == 0].sort_values('hotel_type').reset_index(drop=True)
+    by_hotel_type['q1'] = by_hotel_type['quantiles'].str[0]
+    by_hotel_type['median'] = by_hotel_type['quantiles'].str[1]
+    by_hotel_type['q3'] = by_hotel_type['quantiles'].str[2]
+    
+    lower, upper = float(overall['lower']), float(overall['upper'])
+    histogram = pd.Series(overall['histogram_counts'], index=overall['histogram_buckets'])
+    counts = histogram.reindex(range(1, bins + 1), fill_value=0)
+    
+    return {
+        'stats': stats,
+        'histogram': {
+            'edges': np.linspace(lower, upper, bins + 1).tolist(),
+            'counts': [int(count) for count in counts]
+        },
+        'by_hotel_type': [
+            {
+                'hotel_type': row['hotel_type'],
+                'min': float(row['min']),
+                'q1': float(row['q1']),
+                'median': float(row['median']),
+                'q3': float(row['q3']),
+                'max': float(row['max']),
+                'whislo': float(row['whislo']),
+                'whishi': float(row['whishi'])
+            }
+            for _, row in by_hotel_type.iterrows()
+        ]
+    }
+
+def plot_lead_time_histogram(data):
+
+    stats = data['stats']
+    edges = np.array(data['histogram']['edges'])
+    
     plt.figure(figsize=(12, 6))
-    sns.histplot(lead_times, bins=30, kde=True)
+    plt.bar(edges[:-1], data['histogram']['counts'], width=np.diff(edges), align='edge', alpha=0.7, edgecolor='white')
     plt.title('Distribution of Booking Lead Time')
     plt.xlabel('Lead Time (days)')
     plt.ylabel('Count')
     plt.grid(True, alpha=0.3)
-    plt.axvline(stats['mean'], color='r', linestyle='--', label=f"Mean: {stats['mean']:.1f} days")
-    plt.axvline(stats['median'], color='g', linestyle='-.', label=f"Median: {stats['median']:.1f} days")
-    plt.legend()
+    if stats:
+        plt.axvline(stats['mean'], color='r', linestyle='--', label=f"Mean: {stats['mean']:.1f} days")
+        plt.axvline(stats['median'], color='g', linestyle='-.', label=f"Median: {stats['median']:.1f} days")
+        plt.legend()
     plt.tight_layout()
-    
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    histogram_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    lead_by_hotel = session.query(
-        Hotel.type.label('hotel_type'),
-        Booking.lead_time
-    ).join(
-        Booking, Hotel.id == Booking.hotel_id
-    ).all()
-    
-    lead_by_hotel_df = pd.DataFrame(lead_by_hotel)
+
+def plot_lead_time_boxplot(data):
+
+    box_stats = [
+        {
+            'label': row['hotel_type'],
+            'whislo': row['whislo'],
+            'q1': row['q1'],
+            'med': row['median'],
+            'q3': row['q3'],
+            'whishi': row['whishi']
+        }
+        for row in data
+    ]
     
     plt.figure(figsize=(10, 6))
-    sns.boxplot(x='hotel_type', y='lead_time', data=lead_by_hotel_df)
+    ax = plt.gca()
+    if box_stats:
+        ax.bxp(box_stats, showfliers=False, patch_artist=True,
+               boxprops={'facecolor': '#66b3ff'}, medianprops={'color': 'black'})
     plt.title('Lead Time Distribution by Hotel Type')
     plt.xlabel('Hotel Type')
     plt.ylabel('Lead Time (days)')
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    
-    buffer2 = io.BytesIO()
-    plt.savefig(buffer2, format='png')
-    buffer2.seek(0)
-    boxplot_base64 = base64.b64encode(buffer2.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'stats': stats,
-        'histogram': f"data:image/png;base64,{histogram_base64}",
-        'boxplot': f"data:image/png;base64,{boxplot_base64}"
-    }
 
-def get_lead_time_vs_cancellation(session: Session):
+def get_lead_time_vs_cancellation(session: Session, filters: Optional[Dict[str, Any]] = None):
 
-    cancellation_data = session.query(
-        Booking.lead_time,
-        Booking.is_canceled
+    query = session.query(
+        BookingCube.lead_time_bucket,
+        func.sum(BookingCube.booking_count).label('total_bookings'),
+        func.sum(case((BookingCube.is_canceled == True, BookingCube.booking_count), else_=0)).label('canceled_bookings'),
+        func.sum(BookingCube.lead_time_sum).label('lead_time_sum')
+    )
+    
+    cancellation_data = apply_filters(query, BookingCube, filters).group_by(
+        BookingCube.lead_time_bucket
     ).all()
     
-    df = pd.DataFrame(cancellation_data, columns=['lead_time', 'is_canceled'])
+    df = pd.DataFrame(
+        cancellation_data,
+        columns=['lead_time_bucket', 'total_bookings', 'canceled_bookings', 'lead_time_sum']
+    )
     
-    lead_time_bins = [0, 7, 30, 90, 180, 365, float('inf')]
-    bin_labels = ['0-7 days', '8-30 days', '31-90 days', '91-180 days', '181-365 days', '>365 days']
-    df['lead_time_group'] = pd.cut(df['lead_time'], bins=lead_time_bins, labels=bin_labels)
+    cancellation_by_leadtime = format_lead_time_vs_cancellation(df)
     
-    cancellation_by_leadtime = df.groupby('lead_time_group').agg(
-        total_bookings=('is_canceled', 'count'),
-        canceled_bookings=('is_canceled', 'sum')
+    return {
+        'data': cancellation_by_leadtime.reset_index().to_dict(orient='records')
+    }
+
+def format_lead_time_vs_cancellation(df: pd.DataFrame) -> pd.DataFrame:
+
+    cancellation_by_leadtime = df.astype('int64').set_index('lead_time_bucket').reindex(
+        range(len(LEAD_TIME_BUCKET_LABELS)), fill_value=0
     )
+    cancellation_by_leadtime.index = pd.Index(LEAD_TIME_BUCKET_LABELS, name='lead_time_group')
+    
+    totals = cancellation_by_leadtime['total_bookings'].replace(0, np.nan)
     cancellation_by_leadtime['cancellation_rate'] = (
-        cancellation_by_leadtime['canceled_bookings'] / cancellation_by_leadtime['total_bookings'] * 100
-    ).round(2)
+        cancellation_by_leadtime['canceled_bookings'] / totals * 100
+    ).round(2).fillna(0)
+    cancellation_by_leadtime['avg_lead_time'] = (
+        cancellation_by_leadtime['lead_time_sum'] / totals
+    ).round(1).fillna(0)
+    
+    return cancellation_by_leadtime.drop(columns='lead_time_sum')
+
+def plot_lead_time_vs_cancellation(data):
+
+    cancellation_by_leadtime = pd.DataFrame(data, columns=['lead_time_group', 'cancellation_rate'])
     
     # Create bar chart
     plt.figure(figsize=(10, 6))
     plt.bar(
-        cancellation_by_leadtime.index,
+        cancellation_by_leadtime['lead_time_group'],
         cancellation_by_leadtime['cancellation_rate'],
         color=plt.cm.RdYlGn_r(np.linspace(0, 0.8, len(cancellation_by_leadtime)))
     )
@@ -107,16 +256,4 @@ def get_lead_time_vs_cancellation(session: Session):
     plt.ylabel('Cancellation Rate (%)')
     plt.xticks(rotation=45)
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    
-    # Save plot to base64 encoded string
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'data': cancellation_by_leadtime.reset_index().to_dict(orient='records'),
-        'plot': f"data:image/png;base64,{image_base64}"
-    }
\ No newline at end of file
+    plt.tight_layout()
\ No newline at end of file
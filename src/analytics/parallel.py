@@ -0,0 +1,82 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from src.config import ANALYTICS_WORKERS
+
+# Workers must never pick up an interactive backend; set before they import pyplot
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import matplotlib
+from src.data.db_manager import SessionLocal, engine
+from src.analytics.visualizer import REPORT_SECTIONS
+from src.analytics.plots import register_plot, get_plot_png
+
+_executor = None
+
+def _init_worker():
+
+    matplotlib.use("Agg")
+    # Never reuse pooled connections inherited from the parent process
+    engine.dispose()
+
+def _run_section(analytics_function, kwargs):
+
+    session = SessionLocal()
+    try:
+        return analytics_function(session, **kwargs)
+    finally:
+        session.close()
+
+def _render_plot(plot_type: str, data: Any, params: Dict[str, Any]) -> str:
+
+    key = register_plot(plot_type, data, **params)
+    get_plot_png(key)
+    return key
+
+def get_report_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+
+    global _executor
+    
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max_workers or ANALYTICS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    
+    return _executor
+
+def shutdown_report_executor():
+
+    global _executor
+    
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+def generate_analytics_report_parallel(max_workers: Optional[int] = None, filters: Optional[Dict[str, Any]] = None):
+
+    executor = get_report_executor(max_workers)
+    
+    futures = [
+        (section, name, executor.submit(_run_section, analytics_function, {**kwargs, 'filters': filters}))
+        for section, name, analytics_function, kwargs in REPORT_SECTIONS
+    ]
+    
+    report = {}
+    for section, name, future in futures:
+        report.setdefault(section, {})[name] = future.result()
+    
+    return report
+
+def prerender_plots(plot_specs: Dict[str, Tuple[str, Any, Dict[str, Any]]], max_workers: Optional[int] = None) -> Dict[str, str]:
+
+    executor = get_report_executor(max_workers)
+    
+    futures = {
+        name: executor.submit(_render_plot, plot_type, data, params)
+        for name, (plot_type, data, params) in plot_specs.items()
+    }
+    
+    return {name: future.result() for name, future in futures.items()}
\ No newline at end of file
@@ -0,0 +1,176 @@
+import os
+import io
+import re
+import json
+import hashlib
+import datetime
+import decimal
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Any, Dict, Optional
+from src.config import PLOTS_DIR, PLOTS_MAX_BYTES
+from src.analytics.revenue import plot_revenue_trends, plot_revenue_by_hotel_type
+from src.analytics.cancellation import plot_cancellation_rate, plot_cancellation_by_country, plot_cancellation_by_month
+from src.analytics.geographic import plot_geographic_bar, plot_geographic_pie
+from src.analytics.lead_time import plot_lead_time_histogram, plot_lead_time_boxplot, plot_lead_time_vs_cancellation
+
+PLOT_RENDERERS = {
+    'revenue_trends': plot_revenue_trends,
+    'revenue_by_hotel_type': plot_revenue_by_hotel_type,
+    'cancellation_rate': plot_cancellation_rate,
+    'cancellation_by_country': plot_cancellation_by_country,
+    'cancellation_by_month': plot_cancellation_by_month,
+    'geographic_bar': plot_geographic_bar,
+    'geographic_pie': plot_geographic_pie,
+    'lead_time_histogram': plot_lead_time_histogram,
+    'lead_time_boxplot': plot_lead_time_boxplot,
+    'lead_time_vs_cancellation': plot_lead_time_vs_cancellation
+}
+
+PLOT_KEY_PATTERN = re.compile(r'^[a-z_]+-[0-9a-f]{32}$')
+
+def _json_default(value):
+
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _spec_path(key: str) -> str:
+
+    return os.path.join(PLOTS_DIR, f"{key}.json")
+
+def _png_path(key: str) -> str:
+
+    return os.path.join(PLOTS_DIR, f"{key}.png")
+
+def _write_atomic(path: str, content: bytes):
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def _touch(path: str):
+
+    # The file mtime records a plot's last use, which pruning goes by
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def prune_plots(max_bytes: int = PLOTS_MAX_BYTES) -> int:
+
+    # A plot's spec and PNG go together, least recently used plot first, until the directory fits max_bytes
+    if max_bytes <= 0:
+        return 0
+    try:
+        names = os.listdir(PLOTS_DIR)
+    except OSError:
+        return 0
+    
+    plots = {}
+    for name in names:
+        key, extension = os.path.splitext(name)
+        if extension not in ('.json', '.png') or not PLOT_KEY_PATTERN.match(key):
+            continue
+        try:
+            stat = os.stat(os.path.join(PLOTS_DIR, name))
+        except OSError:
+            continue
+        last_used, size = plots.get(key, (0, 0))
+        plots[key] = (max(last_used, stat.st_mtime), size + stat.st_size)
+    
+    total = sum(size for _, size in plots.values())
+    removed = 0
+    for key, (_, size) in sorted(plots.items(), key=lambda item: item[1][0]):
+        if total <= max_bytes:
+            break
+        for path in (_spec_path(key), _png_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                # Another worker pruned it first, or it never had a PNG
+                pass
+        total -= size
+        removed += 1
+    return removed
+
+def plot_key(plot_type: str, data: Any, params: Optional[Dict[str, Any]] = None) -> str:
+
+    payload = json.dumps(
+        {'plot_type': plot_type, 'params': params or {}, 'data': data},
+        sort_keys=True,
+        default=_json_default
+    )
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+    return f"{plot_type}-{digest}"
+
+def register_plot(plot_type: str, data: Any, **params) -> str:
+
+    if plot_type not in PLOT_RENDERERS:
+        raise ValueError(f"Unknown plot type: {plot_type}")
+    
+    key = plot_key(plot_type, data, params)
+    spec_path = _spec_path(key)
+    
+    if not os.path.exists(spec_path):
+        os.makedirs(PLOTS_DIR, exist_ok=True)
+        spec = json.dumps(
+            {'plot_type': plot_type, 'params': params, 'data': data},
+            default=_json_default
+        )
+        _write_atomic(spec_path, spec.encode('utf-8'))
+        prune_plots()
+    else:
+        _touch(spec_path)
+    
+    return key
+
+def render_plot(plot_type: str, data: Any, params: Optional[Dict[str, Any]] = None) -> bytes:
+
+    renderer = PLOT_RENDERERS[plot_type]
+    
+    try:
+        renderer(data, **(params or {}))
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format='png')
+        return buffer.getvalue()
+    finally:
+        plt.close('all')
+
+def get_cached_plot_png(key: str) -> Optional[bytes]:
+
+    if not PLOT_KEY_PATTERN.match(key):
+        return None
+    
+    # A missing file, or one pruned while it was opened, is the same miss
+    png_path = _png_path(key)
+    try:
+        with open(png_path, 'rb') as f:
+            png = f.read()
+    except OSError:
+        return None
+    _touch(png_path)
+    return png
+
+def get_plot_png(key: str) -> Optional[bytes]:
+
+    png = get_cached_plot_png(key)
+    if png is not None or not PLOT_KEY_PATTERN.match(key):
+        return png
+    
+    try:
+        with open(_spec_path(key), 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+    except OSError:
+        return None
+    
+    png = render_plot(spec['plot_type'], spec['data'], spec['params'])
+    _write_atomic(_png_path(key), png)
+    prune_plots()
+    
+    return png
\ No newline at end of file
@@ -3,125 +3,94 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sqlalchemy import text, func, extract
 from sqlalchemy.orm import Session
-import io
-import base64
-from src.data.db_manager import Booking, Hotel
+from typing import Any, Dict, Optional
+from src.data.db_manager import DailyRevenue, Hotel
+from src.analytics.filters import apply_filters
 
-def get_revenue_trends(session: Session, period: str = 'monthly'):
+def revenue_period_columns(arrival_date, period: str = 'monthly'):
 
-    date_formats = {
-        'daily': "YYYY-MM-DD",
-        'weekly': "YYYY-WW",
-        'monthly': "YYYY-MM",
-        'yearly': "YYYY"
-    }
-    
-    format_str = date_formats.get(period, 'monthly')
-    
     if period == 'daily':
-        query = session.query(
-            func.to_char(Booking.arrival_date, 'YYYY-MM-DD').label('period'),
-            func.sum(Booking.adr * Booking.total_nights).label('revenue')
-        ).filter(
-            Booking.is_canceled == False
-        ).group_by(
-            func.to_char(Booking.arrival_date, 'YYYY-MM-DD')
-        ).order_by(
-            func.to_char(Booking.arrival_date, 'YYYY-MM-DD')
-        )
+        return [func.to_char(arrival_date, 'YYYY-MM-DD').label('period')]
     elif period == 'weekly':
-        query = session.query(
-            func.to_char(Booking.arrival_date, 'YYYY-MM').label('month'),
-            func.extract('week', Booking.arrival_date).label('week'),
-            func.sum(Booking.adr * Booking.total_nights).label('revenue')
-        ).filter(
-            Booking.is_canceled == False
-        ).group_by(
-            func.to_char(Booking.arrival_date, 'YYYY-MM'),
-            func.extract('week', Booking.arrival_date)
-        ).order_by(
-            func.to_char(Booking.arrival_date, 'YYYY-MM'),
-            func.extract('week', Booking.arrival_date)
-        )
+        return [
+            func.to_char(arrival_date, 'YYYY-MM').label('month'),
+            func.extract('week', arrival_date).label('week')
+        ]
     elif period == 'yearly':
-        query = session.query(
-            func.extract('year', Booking.arrival_date).label('period'),
-            func.sum(Booking.adr * Booking.total_nights).label('revenue')
-        ).filter(
-            Booking.is_canceled == False
-        ).group_by(
-            func.extract('year', Booking.arrival_date)
-        ).order_by(
-            func.extract('year', Booking.arrival_date)
-        )
-    else:  
-        query = session.query(
-            func.to_char(Booking.arrival_date, 'YYYY-MM').label('period'),
-            func.sum(Booking.adr * Booking.total_nights).label('revenue')
-        ).filter(
-            Booking.is_canceled == False
-        ).group_by(
-            func.to_char(Booking.arrival_date, 'YYYY-MM')
-        ).order_by(
-            func.to_char(Booking.arrival_date, 'YYYY-MM')
-        )
-    
-    revenue_data = pd.DataFrame(query.all())
-    
+        return [func.extract('year', arrival_date).label('period')]
+    else:
+        return [func.to_char(arrival_date, 'YYYY-MM').label('period')]
+
+def format_revenue_trends(revenue_data: pd.DataFrame, period: str = 'monthly') -> pd.DataFrame:
+
     if period == 'weekly':
         revenue_data['period'] = revenue_data['month'] + '-W' + revenue_data['week'].astype(str).str.zfill(2)
-        revenue_data = revenue_data[['period', 'revenue']]
+    
+    return revenue_data[['period', 'revenue']]
+
+def get_revenue_trends(session: Session, period: str = 'monthly', filters: Optional[Dict[str, Any]] = None):
+
+    # Every period is a roll-up of the trigger-maintained daily rows, which hold confirmed bookings only
+    period_columns = revenue_period_columns(DailyRevenue.arrival_date, period)
+    period_expressions = [column.element for column in period_columns]
+    
+    query = session.query(
+        *period_columns,
+        func.sum(DailyRevenue.revenue).label('revenue')
+    )
+    
+    query = apply_filters(query, DailyRevenue, filters).group_by(
+        *period_expressions
+    ).order_by(
+        *period_expressions
+    )
+    
+    revenue_data = pd.DataFrame(query.all(), columns=[column.name for column in period_columns] + ['revenue'])
+    revenue_data = format_revenue_trends(revenue_data, period)
+    
+    return {
+        'data': revenue_data.to_dict(orient='records')
+    }
+
+def plot_revenue_trends(data, period: str = 'monthly'):
+
+    revenue_data = pd.DataFrame(data, columns=['period', 'revenue'])
     
     plt.figure(figsize=(12, 6))
-    plt.plot(revenue_data['period'], revenue_data['revenue'], marker='o', linestyle='-')
+    plt.plot(revenue_data['period'].astype(str), revenue_data['revenue'], marker='o', linestyle='-')
     plt.title(f'Revenue Trends ({period.capitalize()})')
     plt.xlabel('Period')
     plt.ylabel('Revenue')
     plt.grid(True)
     plt.xticks(rotation=45)
     plt.tight_layout()
-    
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'data': revenue_data.to_dict(orient='records'),
-        'plot': f"data:image/png;base64,{image_base64}"
-    }
 
-def get_revenue_by_hotel_type(session: Session):
+def get_revenue_by_hotel_type(session: Session, filters: Optional[Dict[str, Any]] = None):
 
     query = session.query(
         Hotel.type.label('hotel_type'),
-        func.sum(Booking.adr * Booking.total_nights).label('revenue')
+        func.sum(DailyRevenue.revenue).label('revenue')
     ).join(
-        Booking, Hotel.id == Booking.hotel_id
-    ).filter(
-        Booking.is_canceled == False
-    ).group_by(
+        DailyRevenue, Hotel.id == DailyRevenue.hotel_id
+    )
+    
+    query = apply_filters(query, DailyRevenue, filters).group_by(
         Hotel.type
     )
     
-    revenue_data = pd.DataFrame(query.all())
+    revenue_data = pd.DataFrame(query.all(), columns=['hotel_type', 'revenue'])
+    
+    return {
+        'data': revenue_data.to_dict(orient='records')
+    }
+
+def plot_revenue_by_hotel_type(data):
+
+    revenue_data = pd.DataFrame(data, columns=['hotel_type', 'revenue'])
     
-    # Create visualization
     plt.figure(figsize=(10, 6))
     sns.barplot(x='hotel_type', y='revenue', data=revenue_data)
     plt.title('Revenue by Hotel Type')
     plt.xlabel('Hotel Type')
     plt.ylabel('Revenue')
-    plt.tight_layout()
-    
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    return {
-        'data': revenue_data.to_dict(orient='records'),
-        'plot': f"data:image/png;base64,{image_base64}"
-    }
\ No newline at end of file
+    plt.tight_layout()
\ No newline at end of file
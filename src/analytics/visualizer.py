@@ -2,30 +2,44 @@ import pandas as pd
 import io
 import base64
 from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
 from src.analytics.revenue import get_revenue_trends, get_revenue_by_hotel_type
 from src.analytics.cancellation import get_cancellation_rate, get_cancellation_by_country, get_cancellation_by_month
 from src.analytics.geographic import get_geographic_distribution
 from src.analytics.lead_time import get_lead_time_distribution, get_lead_time_vs_cancellation
 
-def generate_analytics_report(session: Session):
+# (section, name, analytics function, keyword arguments) for every part of the full report
+REPORT_SECTIONS = [
+    ('revenue', 'trends', get_revenue_trends, {'period': 'monthly'}),
+    ('revenue', 'by_hotel_type', get_revenue_by_hotel_type, {}),
+    ('cancellation', 'overall_rate', get_cancellation_rate, {}),
+    ('cancellation', 'by_country', get_cancellation_by_country, {}),
+    ('cancellation', 'by_month', get_cancellation_by_month, {}),
+    ('geography', 'distribution', get_geographic_distribution, {}),
+    ('lead_time', 'distribution', get_lead_time_distribution, {}),
+    ('lead_time', 'vs_cancellation', get_lead_time_vs_cancellation, {})
+]
 
-    report = {
-        'revenue': {
-            'trends': get_revenue_trends(session, 'monthly'),
-            'by_hotel_type': get_revenue_by_hotel_type(session)
-        },
-        'cancellation': {
-            'overall_rate': get_cancellation_rate(session),
-            'by_country': get_cancellation_by_country(session),
-            'by_month': get_cancellation_by_month(session)
-        },
-        'geography': {
-            'distribution': get_geographic_distribution(session)
-        },
-        'lead_time': {
-            'distribution': get_lead_time_distribution(session),
-            'vs_cancellation': get_lead_time_vs_cancellation(session)
-        }
-    }
+def generate_analytics_report(session: Session, filters: Optional[Dict[str, Any]] = None):
+
+    report = {}
+    
+    for section, name, analytics_function, kwargs in REPORT_SECTIONS:
+        report.setdefault(section, {})[name] = analytics_function(session, filters=filters, **kwargs)
     
-    return report
\ No newline at end of file
+    return report
+
+def report_plot_specs(report_data):
+
+    return {
+        "revenue_trends": ("revenue_trends", report_data["revenue"]["trends"]["data"], {"period": "monthly"}),
+        "revenue_by_hotel": ("revenue_by_hotel_type", report_data["revenue"]["by_hotel_type"]["data"], {}),
+        "cancellation_rate": ("cancellation_rate", report_data["cancellation"]["overall_rate"]["data"], {}),
+        "cancellation_by_country": ("cancellation_by_country", report_data["cancellation"]["by_country"]["data"], {}),
+        "cancellation_by_month": ("cancellation_by_month", report_data["cancellation"]["by_month"]["data"], {}),
+        "geographic_bar": ("geographic_bar", report_data["geography"]["distribution"]["data"], {}),
+        "geographic_pie": ("geographic_pie", report_data["geography"]["distribution"]["data"], {}),
+        "lead_time_histogram": ("lead_time_histogram", report_data["lead_time"]["distribution"], {}),
+        "lead_time_boxplot": ("lead_time_boxplot", report_data["lead_time"]["distribution"]["by_hotel_type"], {}),
+        "lead_time_vs_cancellation": ("lead_time_vs_cancellation", report_data["lead_time"]["vs_cancellation"]["data"], {})
+    }
\ No newline at end of file
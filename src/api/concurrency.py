@@ -0,0 +1,39 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from src.config import ANALYTICS_THREADS, LLM_THREADS, IO_THREADS
+
+# One bounded pool per kind of blocking work, so saturating one kind never starves the others.
+# pyplot keeps global figure state and is not thread-safe, so plot rendering gets a single thread.
+# Health checks get a thread of their own rather than queueing behind io work under load.
+POOL_SIZES = {
+    "analytics": ANALYTICS_THREADS,
+    "render": 1,
+    "llm": LLM_THREADS,
+    "io": IO_THREADS,
+    "health": 1
+}
+
+_pools = {}
+
+def get_pool(name: str) -> ThreadPoolExecutor:
+
+    if name not in _pools:
+        _pools[name] = ThreadPoolExecutor(
+            max_workers=max(POOL_SIZES[name], 1),
+            thread_name_prefix=f"{name}-pool"
+        )
+    
+    return _pools[name]
+
+async def run_in_pool(name: str, function: Callable[..., Any], *args, **kwargs) -> Any:
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(name), functools.partial(function, *args, **kwargs))
+
+def shutdown_pools():
+
+    for pool in _pools.values():
+        pool.shutdown(wait=False)
+    _pools.clear()
\ No newline at end of file
@@ -4,7 +4,9 @@ from fastapi.responses import JSONResponse
 import time
 import uvicorn
 import os
-from src.api.routers import analytics, ask, health
+from src.api.routers import analytics, ask, health, export
+from src.analytics.parallel import shutdown_report_executor
+from src.api.concurrency import shutdown_pools
 from src.config import API_HOST, API_PORT
 
 app = FastAPI(
@@ -32,6 +34,12 @@ async def add_process_time_header(request: Request, call_next):
 app.include_router(analytics.router)
 app.include_router(ask.router)
 app.include_router(health.router)
+app.include_router(export.router)
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    shutdown_report_executor()
+    shutdown_pools()
 
 @app.get("/")
 async def root():
@@ -42,7 +50,8 @@ async def root():
         "endpoints": {
             "analytics": "/analytics",
             "ask": "/ask",
-            "health": "/health"
+            "health": "/health",
+            "export": "/export/{bookings|daily_revenue}"
         }
     }
 
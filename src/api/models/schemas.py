@@ -6,6 +6,7 @@ class AnalyticsRequest(BaseModel):
     report_type: str = Field(..., description="Type of analytics report")
     period: Optional[str] = Field(default="monthly", description="Time period for analysis")
     filters: Optional[Dict[str, Any]] = Field(default=None, description="Optional filters")
+    include_plots: bool = Field(default=True, description="Include URLs of the rendered plots")
 
 class AnalyticsResponse(BaseModel):
     report_type: str
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
 from src.api.models.schemas import AnalyticsRequest, AnalyticsResponse
 from src.data.db_manager import get_db
-from src.analytics.visualizer import generate_analytics_report
+from src.config import ANALYTICS_REPORT_MODE, ANALYTICS_WORKERS
+from src.analytics.visualizer import generate_analytics_report, report_plot_specs
+from src.analytics.parallel import generate_analytics_report_parallel, prerender_plots
+from src.analytics.fused import generate_fused_report
+from src.analytics.filters import parse_filters
+from src.analytics.cache import analytics_cache, cache_key
+from src.data.version import get_data_version
 from src.analytics.revenue import get_revenue_trends, get_revenue_by_hotel_type
 from src.analytics.cancellation import get_cancellation_rate, get_cancellation_by_country, get_cancellation_by_month
 from src.analytics.geographic import get_geographic_distribution
 from src.analytics.lead_time import get_lead_time_distribution, get_lead_time_vs_cancellation
+from src.analytics.plots import register_plot, get_plot_png, get_cached_plot_png
+from src.api.concurrency import run_in_pool
 
 router = APIRouter(
     prefix="/analytics",
@@ -14,105 +23,139 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+def plot_url(key: str) -> str:
+
+    return f"{router.prefix}/plots/{key}"
+
+def compute_report(db: Session, report_type: str, period: str, filters: Dict[str, Any]):
+
+    if report_type == "full":
+        if ANALYTICS_REPORT_MODE == "parallel":
+            report_data = generate_analytics_report_parallel(filters=filters)
+        elif ANALYTICS_REPORT_MODE == "serial":
+            report_data = generate_analytics_report(db, filters=filters)
+        else:
+            report_data = generate_fused_report(db, filters=filters)
+        
+        plot_specs = report_plot_specs(report_data)
+        
+        data = {
+            "revenue": {
+                "trends": report_data["revenue"]["trends"]["data"],
+                "by_hotel_type": report_data["revenue"]["by_hotel_type"]["data"]
+            },
+            "cancellation": {
+                "overall_rate": report_data["cancellation"]["overall_rate"]["data"],
+                "by_country": report_data["cancellation"]["by_country"]["data"],
+                "by_month": report_data["cancellation"]["by_month"]["data"]
+            },
+            "geography": {
+                "distribution": report_data["geography"]["distribution"]["data"]
+            },
+            "lead_time": {
+                "distribution": report_data["lead_time"]["distribution"]["stats"],
+                "vs_cancellation": report_data["lead_time"]["vs_cancellation"]["data"]
+            }
+        }
+        
+    elif report_type == "revenue":
+        trends = get_revenue_trends(db, period, filters=filters)
+        by_hotel = get_revenue_by_hotel_type(db, filters=filters)
+        
+        data = {
+            "trends": trends["data"],
+            "by_hotel_type": by_hotel["data"]
+        }
+        
+        plot_specs = {
+            "trends": ("revenue_trends", trends["data"], {"period": period}),
+            "by_hotel_type": ("revenue_by_hotel_type", by_hotel["data"], {})
+        }
+        
+    elif report_type == "cancellation":
+        overall = get_cancellation_rate(db, filters=filters)
+        by_country = get_cancellation_by_country(db, filters=filters)
+        by_month = get_cancellation_by_month(db, filters=filters)
+        
+        data = {
+            "overall_rate": overall["data"],
+            "by_country": by_country["data"],
+            "by_month": by_month["data"]
+        }
+        
+        plot_specs = {
+            "overall_rate": ("cancellation_rate", overall["data"], {}),
+            "by_country": ("cancellation_by_country", by_country["data"], {}),
+            "by_month": ("cancellation_by_month", by_month["data"], {})
+        }
+        
+    elif report_type == "geography":
+        distribution = get_geographic_distribution(db, filters=filters)
+        
+        data = {
+            "distribution": distribution["data"]
+        }
+        
+        plot_specs = {
+            "bar_plot": ("geographic_bar", distribution["data"], {}),
+            "pie_plot": ("geographic_pie", distribution["data"], {})
+        }
+        
+    elif report_type == "lead_time":
+        distribution = get_lead_time_distribution(db, filters=filters)
+        vs_cancellation = get_lead_time_vs_cancellation(db, filters=filters)
+        
+        data = {
+            "distribution": distribution["stats"],
+            "vs_cancellation": vs_cancellation["data"]
+        }
+        
+        plot_specs = {
+            "histogram": ("lead_time_histogram", distribution, {}),
+            "boxplot": ("lead_time_boxplot", distribution["by_hotel_type"], {}),
+            "vs_cancellation": ("lead_time_vs_cancellation", vs_cancellation["data"], {})
+        }
+        
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown report type: {report_type}")
+    
+    return data, plot_specs
+
+def build_analytics_report(db: Session, request: AnalyticsRequest, filters: Dict[str, Any]):
+
+    # The data version changes on every load, so cached reports can never be stale
+    report_key = cache_key(request.report_type, request.period, filters, get_data_version(db))
+    report = analytics_cache.get(report_key)
+    cache_hit = report is not None
+    if not cache_hit:
+        report = compute_report(db, request.report_type, request.period, filters)
+        analytics_cache.set(report_key, report)
+    
+    data, plot_specs = report
+    
+    plots = {}
+    if request.include_plots:
+        if request.report_type == "full" and ANALYTICS_WORKERS > 1 and not cache_hit:
+            plot_keys = prerender_plots(plot_specs)
+        else:
+            plot_keys = {
+                name: register_plot(plot_type, plot_data, **params)
+                for name, (plot_type, plot_data, params) in plot_specs.items()
+            }
+        plots = {name: plot_url(key) for name, key in plot_keys.items()}
+    
+    return data, plots
+
 @router.post("/", response_model=AnalyticsResponse)
 async def get_analytics(request: AnalyticsRequest, db: Session = Depends(get_db)):
 
     try:
-        if request.report_type == "full":
-            report_data = generate_analytics_report(db)
-            
-            plots = {
-                "revenue_trends": report_data["revenue"]["trends"]["plot"],
-                "revenue_by_hotel": report_data["revenue"]["by_hotel_type"]["plot"],
-                "cancellation_rate": report_data["cancellation"]["overall_rate"]["plot"],
-                "cancellation_by_country": report_data["cancellation"]["by_country"]["plot"],
-                "cancellation_by_month": report_data["cancellation"]["by_month"]["plot"],
-                "geographic_bar": report_data["geography"]["distribution"]["bar_plot"],
-                "geographic_pie": report_data["geography"]["distribution"]["pie_plot"],
-                "lead_time_histogram": report_data["lead_time"]["distribution"]["histogram"],
-                "lead_time_boxplot": report_data["lead_time"]["distribution"]["boxplot"],
-                "lead_time_vs_cancellation": report_data["lead_time"]["vs_cancellation"]["plot"]
-            }
-            
-            data = {
-                "revenue": {
-                    "trends": report_data["revenue"]["trends"]["data"],
-                    "by_hotel_type": report_data["revenue"]["by_hotel_type"]["data"]
-                },
-                "cancellation": {
-                    "overall_rate": report_data["cancellation"]["overall_rate"]["data"],
-                    "by_country": report_data["cancellation"]["by_country"]["data"],
-                    "by_month": report_data["cancellation"]["by_month"]["data"]
-                },
-                "geography": {
-                    "distribution": report_data["geography"]["distribution"]["data"]
-                },
-                "lead_time": {
-                    "distribution": report_data["lead_time"]["distribution"]["stats"],
-                    "vs_cancellation": report_data["lead_time"]["vs_cancellation"]["data"]
-                }
-            }
-            
-        elif request.report_type == "revenue":
-            trends = get_revenue_trends(db, request.period)
-            by_hotel = get_revenue_by_hotel_type(db)
-            
-            data = {
-                "trends": trends["data"],
-                "by_hotel_type": by_hotel["data"]
-            }
-            
-            plots = {
-                "trends": trends["plot"],
-                "by_hotel_type": by_hotel["plot"]
-            }
-            
-        elif request.report_type == "cancellation":
-            overall = get_cancellation_rate(db)
-            by_country = get_cancellation_by_country(db)
-            by_month = get_cancellation_by_month(db)
-            
-            data = {
-                "overall_rate": overall["data"],
-                "by_country": by_country["data"],
-                "by_month": by_month["data"]
-            }
-            
-            plots = {
-                "overall_rate": overall["plot"],
-                "by_country": by_country["plot"],
-                "by_month": by_month["plot"]
-            }
-            
-        elif request.report_type == "geography":
-            distribution = get_geographic_distribution(db)
-            
-            data = {
-                "distribution": distribution["data"]
-            }
-            
-            plots = {
-                "bar_plot": distribution["bar_plot"],
-                "pie_plot": distribution["pie_plot"]
-            }
-            
-        elif request.report_type == "lead_time":
-            distribution = get_lead_time_distribution(db)
-            vs_cancellation = get_lead_time_vs_cancellation(db)
-            
-            data = {
-                "distribution": distribution["stats"],
-                "vs_cancellation": vs_cancellation["data"]
-            }
-            
-            plots = {
-                "histogram": distribution["histogram"],
-                "boxplot": distribution["boxplot"],
-                "vs_cancellation": vs_cancellation["plot"]
-            }
-            
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown report type: {request.report_type}")
+        filters = parse_filters(request.filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        data, plots = await run_in_pool("analytics", build_analytics_report, db, request, filters)
         
         return AnalyticsResponse(
             report_type=request.report_type,
@@ -120,5 +163,28 @@ async def get_analytics(request: AnalyticsRequest, db: Session = Depends(get_db)
             plots=plots
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/plots/{key}")
+async def get_plot(key: str, if_none_match: Optional[str] = Header(default=None)):
+
+    # Plot keys are content hashes, so the key itself is a strong validator
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    
+    if if_none_match:
+        candidates = [tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")]
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    
+    # Cached PNGs are plain file reads; only actual rendering goes through the single render thread
+    png = await run_in_pool("io", get_cached_plot_png, key)
+    if png is None:
+        png = await run_in_pool("render", get_plot_png, key)
+    if png is None:
+        raise HTTPException(status_code=404, detail=f"Plot not found: {key}")
+    
+    return Response(content=png, media_type="image/png", headers=headers)
\ No newline at end of file
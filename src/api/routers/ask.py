@@ -6,6 +6,7 @@ from src.data.db_manager import get_db, QueryHistory
 from src.rag.vector_store import VectorStore
 from src.rag.llm import LLMProcessor
 from src.rag.query_engine import QueryEngine
+from src.api.concurrency import run_in_pool
 
 router = APIRouter(
     prefix="/ask",
@@ -35,10 +36,14 @@ async def ask_question(request: QuestionRequest,
 
     try:
         try:
-            result = query_engine.process_query(request.question, request.filters)
+            # Embedding, FAISS search and generation all block, so they run in the bounded LLM pool
+            result = await run_in_pool("llm", query_engine.process_query, request.question, request.filters)
         except Exception as e:
             print(f"LLM processing failed, using fallback: {e}")
-            fallback_answer = query_engine.llm_processor.answer_question_fallback(request.question)
+            # The fallback also runs in the LLM pool, so no part of answering a question blocks the event loop
+            fallback_answer = await run_in_pool(
+                "llm", query_engine.llm_processor.answer_question_fallback, request.question
+            )
             result = {
                 "query": request.question,
                 "answer": fallback_answer,
@@ -56,26 +61,30 @@ async def ask_question(request: QuestionRequest,
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def load_query_history(db: Session, limit: int):
+
+    history = db.query(QueryHistory).order_by(QueryHistory.id.desc()).limit(limit).all()
+    
+    total_count = db.query(QueryHistory).count()
+    
+    return QueryHistoryResponse(
+        history=[
+            QueryHistoryEntry(
+                id=record.id,
+                query_text=record.query_text,
+                response_text=record.response_text,
+                timestamp=record.timestamp,
+                execution_time_ms=record.execution_time_ms
+            ) for record in history
+        ],
+        count=total_count
+    )
+
 @router.get("/history", response_model=QueryHistoryResponse)
 async def get_query_history(limit: int = 10, db: Session = Depends(get_db)):
 
     try:
-        history = db.query(QueryHistory).order_by(QueryHistory.id.desc()).limit(limit).all()
-        
-        total_count = db.query(QueryHistory).count()
-        
-        return QueryHistoryResponse(
-            history=[
-                QueryHistoryEntry(
-                    id=record.id,
-                    query_text=record.query_text,
-                    response_text=record.response_text,
-                    timestamp=record.timestamp,
-                    execution_time_ms=record.execution_time_ms
-                ) for record in history
-            ],
-            count=total_count
-        )
+        return await run_in_pool("io", load_query_history, db, limit)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
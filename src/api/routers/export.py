@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from src.config import EXPORT_CHUNK_SIZE
+from src.analytics.filters import parse_filters
+from src.data.export import EXPORT_MODELS, EXPORT_FORMATS, build_export_query, stream_ndjson, stream_arrow, pa
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/{table}")
+async def export_table(table: str,
+                       format: str = Query(default="ndjson", description="ndjson or arrow (Arrow IPC stream)"),
+                       columns: Optional[str] = Query(default=None, description="Comma-separated columns to export"),
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       hotel: Optional[List[str]] = Query(default=None),
+                       country: Optional[List[str]] = Query(default=None),
+                       market_segment: Optional[List[str]] = Query(default=None),
+                       distribution_channel: Optional[List[str]] = Query(default=None),
+                       limit: Optional[int] = Query(default=None, ge=1)):
+    
+    if table not in EXPORT_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown export table: {table}")
+    
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {format}")
+    
+    if format == "arrow" and pa is None:
+        raise HTTPException(status_code=400, detail="Arrow export requires pyarrow to be installed")
+    
+    try:
+        filters = parse_filters({
+            "start_date": start_date,
+            "end_date": end_date,
+            "hotel": hotel,
+            "country": country,
+            "market_segment": market_segment,
+            "distribution_channel": distribution_channel
+        })
+        column_names = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+        statement = build_export_query(table, column_names, filters, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Starlette iterates sync generators in its threadpool, so streaming never blocks the event loop
+    stream = stream_arrow if format == "arrow" else stream_ndjson
+    extension = "arrows" if format == "arrow" else "ndjson"
+    
+    return StreamingResponse(
+        stream(statement, EXPORT_CHUNK_SIZE),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+    )
\ No newline at end of file
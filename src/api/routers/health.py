@@ -5,6 +5,7 @@ import os
 from src.api.models.schemas import HealthResponse
 from src.data.db_manager import get_db, engine
 from src.config import FAISS_INDEX_PATH, FAISS_DOCUMENTS_PATH
+from src.api.concurrency import run_in_pool
 import torch
 
 router = APIRouter(
@@ -13,8 +14,7 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@router.get("/", response_model=HealthResponse)
-async def check_health(db: Session = Depends(get_db)):
+def collect_health(db: Session) -> HealthResponse:
 
     health_components = {}
     overall_status = "healthy"
@@ -105,4 +105,10 @@ async def check_health(db: Session = Depends(get_db)):
         status=overall_status,
         components=health_components,
         timestamp=datetime.datetime.now().isoformat()
-    )
\ No newline at end of file
+    )
+
+@router.get("/", response_model=HealthResponse)
+async def check_health(db: Session = Depends(get_db)):
+
+    # Its own small pool, so health checks answer promptly while analytics and LLM pools are saturated
+    return await run_in_pool("health", collect_health, db)
\ No newline at end of file
@@ -8,11 +8,60 @@ DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "hotel_bookings")
 DB_USER = os.getenv("DB_USER", "booking_admin1")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "123456")
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# A full SQLAlchemy URL overrides the DB_* settings, e.g. sqlite:///data/benchmark.db for a stand-in
+DATABASE_URL = os.getenv("DATABASE_URL") or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8000"))
 
+# How the full analytics report is computed: "fused" (grouping sets), "parallel" (process pool) or "serial"
+ANALYTICS_REPORT_MODE = os.getenv("ANALYTICS_REPORT_MODE", "fused")
+# Worker processes for the parallel report and plot pre-rendering (0 or 1 disables the pool)
+ANALYTICS_WORKERS = int(os.getenv("ANALYTICS_WORKERS", str(min(8, os.cpu_count() or 1))))
+# Analytics result cache: max in-memory entries, time to live in seconds, an optional disk tier (empty disables it)
+# and the size the disk tier is pruned back to
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "128"))
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "3600"))
+ANALYTICS_CACHE_DIR = os.getenv("ANALYTICS_CACHE_DIR", "")
+ANALYTICS_CACHE_MAX_BYTES = int(os.getenv("ANALYTICS_CACHE_MAX_BYTES", str(256 << 20)))
+
+# Threads per executor the API offloads blocking work to; keep analytics + io + 1 (health) below the DB connection pool size
+ANALYTICS_THREADS = int(os.getenv("ANALYTICS_THREADS", "4"))
+LLM_THREADS = int(os.getenv("LLM_THREADS", "1"))
+IO_THREADS = int(os.getenv("IO_THREADS", "4"))
+
+# Rows fetched from the server-side cursor and written per chunk by the export endpoint
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "10000"))
+# Raw CSV rows read, cleaned and loaded per chunk, which bounds the loader's memory
+LOAD_CHUNK_ROWS = int(os.getenv("LOAD_CHUNK_ROWS", "100000"))
+# Worker processes for parallel ingest (1 loads in-process) and the target source bytes per partition
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+INGEST_PARTITION_MB = int(os.getenv("INGEST_PARTITION_MB", "64"))
+# Bookings fetched from the server-side cursor and turned into documents per batch by the embedding build
+DOCUMENT_BATCH_ROWS = int(os.getenv("DOCUMENT_BATCH_ROWS", "10000"))
+# Embedding build: encoder processes (1 encodes in-process), texts per forward pass, and document
+# batches between checkpoints an interrupted build resumes from
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "1"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CHECKPOINT_BATCHES = int(os.getenv("EMBEDDING_CHECKPOINT_BATCHES", "10"))
+# In-memory LRU of /ask question embeddings, per process (0 disables it)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+# FAISS index built by scripts/build_embeddings.py: flat (exact), ivf_flat, ivf_pq or hnsw. IVF indexes train
+# on FAISS_TRAIN_SAMPLE vectors strided evenly over all bookings; FAISS_NLIST=0 sizes the inverted lists from
+# the booking count
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+FAISS_TRAIN_SAMPLE = int(os.getenv("FAISS_TRAIN_SAMPLE", "100000"))
+FAISS_NLIST = int(os.getenv("FAISS_NLIST", "0"))
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "48"))
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+# Query-time accuracy/speed trade-off: IVF lists probed and HNSW candidate list size
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+# Filtered /ask searches scan candidate subsets up to this size exactly instead of through the ANN index
+FAISS_PREFILTER_EXACT_MAX = int(os.getenv("FAISS_PREFILTER_EXACT_MAX", "20000"))
+# Saved segments (appended changes) a collection may accumulate before a background compaction merges them
+FAISS_SEGMENTS_MAX = int(os.getenv("FAISS_SEGMENTS_MAX", "8"))
+
 HF_TOKEN = os.getenv("HF_TOKEN", "")  # Hugging Face token
 MODEL_PATH = os.getenv("MODEL_PATH", "sentence-transformers/all-MiniLM-L6-v2")
 LLM_MODEL = os.getenv("LLM_MODEL", "TinyLlama/TinyLlama-1.1B-Chat-v1.0")
@@ -21,8 +70,18 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DATA_DIR = os.path.join(ROOT_DIR, "data", "raw")
 PROCESSED_DATA_DIR = os.path.join(ROOT_DIR, "data", "processed")
 EMBEDDINGS_DIR = os.path.join(ROOT_DIR, "data", "embeddings")
+# On-disk embedding cache shared by /ask and index builds, one vector file per model (empty disables it)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(EMBEDDINGS_DIR, "cache"))
+# Size a vector file may reach before it is compacted to its newest half (0 lets it grow without bound)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(4 << 30)))
+PLOTS_DIR = os.path.join(ROOT_DIR, "data", "plots")
+# Plot specs and PNGs are pruned, least recently used first, once PLOTS_DIR holds more than this (0 disables it)
+PLOTS_MAX_BYTES = int(os.getenv("PLOTS_MAX_BYTES", str(512 << 20)))
+# Changed booking ids written by each incremental ingest, for caches and the vector index to pick up
+CHANGES_DIR = os.path.join(ROOT_DIR, "data", "changes")
 
 DEFAULT_DATASET = os.path.join(RAW_DATA_DIR, "hotel_bookings.csv")
 
 FAISS_INDEX_PATH = os.path.join(EMBEDDINGS_DIR, "hotel_bookings_faiss.index")
-FAISS_DOCUMENTS_PATH = os.path.join(EMBEDDINGS_DIR, "hotel_bookings_docs.pkl")
\ No newline at end of file
+# Fixed-width document records; the texts and vocabularies sit beside them (src/rag/document_store.py)
+FAISS_DOCUMENTS_PATH = os.path.join(EMBEDDINGS_DIR, "hotel_bookings_docs.npy")
\ No newline at end of file
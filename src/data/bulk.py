@@ -0,0 +1,174 @@
+import io
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+from sqlalchemy import func, insert, Integer, Float, Boolean, Date
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from src.data.db_manager import Booking, Hotel, Country
+from src.data.labels import ensure_labels
+
+COPY_CHUNK_ROWS = 50000
+
+# Every Booking column except the generated primary key, in table order
+BOOKING_COLUMNS = [column.name for column in Booking.__table__.columns if column.name != 'id']
+
+SOURCE_COLUMNS = ['source_key', 'source_hash']
+
+# Attributes fixed when a booking is made; the rest (status, adr, stay, requests...) may change between feeds
+NATURAL_KEY_COLUMNS = [
+    'hotel_id', 'arrival_date', 'lead_time', 'country_id', 'market_segment', 'distribution_channel',
+    'reserved_room_type', 'customer_type', 'is_repeated_guest', 'previous_cancellations',
+    'previous_bookings_not_canceled', 'adults', 'children', 'babies'
+]
+
+def _name_ids(session: Session, model, names) -> Dict[str, int]:
+
+    rows = session.query(model.name, func.min(model.id)).filter(model.name.in_(names)).group_by(model.name).all()
+    return dict(rows)
+
+def get_or_create_ids(session: Session, model, names: Iterable[str], make_row: Callable[[str], Dict[str, Any]]) -> Dict[str, int]:
+
+    names = [name for name in pd.unique(pd.Series(list(names), dtype=object)) if pd.notna(name)]
+    
+    ids = _name_ids(session, model, names)
+    missing = [name for name in names if name not in ids]
+    if missing:
+        rows = [make_row(name) for name in missing]
+        if session.get_bind().dialect.name == 'postgresql':
+            # Concurrent loaders may create the same name; the unique name constraint decides the winner
+            session.execute(postgresql.insert(model).values(rows).on_conflict_do_nothing(index_elements=['name']))
+        else:
+            session.execute(insert(model), rows)
+        ids = _name_ids(session, model, names)
+    
+    return ids
+
+def resolve_dimension_ids(session: Session, df: pd.DataFrame, hotel_ids: Optional[Dict[str, int]] = None,
+                          country_ids: Optional[Dict[str, int]] = None):
+
+    # Ids already resolved for earlier chunks are reused; only new names hit the database.
+    # Labels new to the enum-typed columns are added the same way.
+    hotel_ids = dict(hotel_ids or {})
+    country_ids = dict(country_ids or {})
+    ensure_labels(session.get_bind(), df)
+    
+    new_hotels = [name for name in df['hotel'].unique() if name not in hotel_ids]
+    if new_hotels:
+        hotel_ids.update(get_or_create_ids(session, Hotel, new_hotels, lambda name: {'name': name, 'type': name}))
+    
+    new_countries = [name for name in df['country'].unique() if name not in country_ids]
+    if new_countries:
+        country_ids.update(get_or_create_ids(session, Country, new_countries, lambda name: {'name': name}))
+    
+    return hotel_ids, country_ids
+
+def prepare_booking_frame(df: pd.DataFrame, hotel_ids: Dict[str, int], country_ids: Dict[str, int]) -> pd.DataFrame:
+
+    frame = pd.DataFrame(index=df.index)
+    frame['hotel_id'] = df['hotel'].map(hotel_ids).astype('Int64')
+    frame['country_id'] = df['country'].map(country_ids).astype('Int64')
+    
+    for column in Booking.__table__.columns:
+        name = column.name
+        if name in ['id', 'hotel_id', 'country_id'] + SOURCE_COLUMNS:
+            continue
+        values = df[name] if name in df.columns else pd.Series(np.nan, index=df.index)
+        
+        # Nullable dtypes keep integers and booleans intact when a value is missing
+        if isinstance(column.type, Boolean):
+            frame[name] = values.astype('boolean')
+        elif isinstance(column.type, Integer):
+            frame[name] = pd.to_numeric(values).round().astype('Int64')
+        elif isinstance(column.type, Float):
+            frame[name] = pd.to_numeric(values).astype('float64')
+        elif isinstance(column.type, Date):
+            frame[name] = pd.to_datetime(values).dt.normalize()
+        else:
+            frame[name] = values
+    
+    return frame
+
+def _row_hashes(frame: pd.DataFrame) -> np.ndarray:
+
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view('int64')
+
+def natural_key_hashes(frame: pd.DataFrame) -> pd.Series:
+
+    return pd.Series(_row_hashes(frame[NATURAL_KEY_COLUMNS]), index=frame.index)
+
+def assign_source_hashes(frame: pd.DataFrame, seen_keys: Dict[int, int]) -> pd.DataFrame:
+
+    # Identical rows are legitimate (the public feed has many), so each repeat of a natural key
+    # gets its ordinal, counted across all chunks of the file through seen_keys
+    natural_key = natural_key_hashes(frame)
+    previous = natural_key.map(seen_keys).fillna(0).astype('int64')
+    ordinal = natural_key.groupby(natural_key).cumcount() + previous
+    
+    for key, count in natural_key.value_counts().items():
+        seen_keys[key] = seen_keys.get(key, 0) + count
+    
+    frame['source_key'] = _row_hashes(pd.DataFrame({'key': natural_key, 'ordinal': ordinal}))
+    frame['source_hash'] = _row_hashes(frame[[name for name in BOOKING_COLUMNS if name not in SOURCE_COLUMNS]])
+    return frame[BOOKING_COLUMNS]
+
+def prepare_booking_chunks(session: Session, frames: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Iterable[pd.DataFrame]:
+
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    
+    hotel_ids, country_ids = {}, {}
+    seen_keys = {}
+    
+    for df in frames:
+        hotel_ids, country_ids = resolve_dimension_ids(session, df, hotel_ids, country_ids)
+        yield assign_source_hashes(prepare_booking_frame(df, hotel_ids, country_ids), seen_keys)
+
+def copy_frame(session: Session, table_name: str, frame: pd.DataFrame, chunk_rows: int = COPY_CHUNK_ROWS):
+
+    # COPY runs on the session's own connection, so it commits or rolls back with the session
+    cursor = session.connection().connection.cursor()
+    copy_sql = f"COPY {table_name} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)"
+    
+    try:
+        for start in range(0, len(frame), chunk_rows):
+            buffer = io.StringIO()
+            frame.iloc[start:start + chunk_rows].to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d')
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+def executemany_frame(session: Session, model, frame: pd.DataFrame, chunk_rows: int = COPY_CHUNK_ROWS):
+
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows].astype(object)
+        records = chunk.where(chunk.notna(), None).to_dict(orient='records')
+        for record in records:
+            for name, value in record.items():
+                if isinstance(value, pd.Timestamp):
+                    record[name] = value.date()
+        session.execute(insert(model), records)
+
+def bulk_load_bookings(session: Session, frames: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> int:
+
+    # Accepts a whole frame or a stream of cleaned chunks; all chunks load in a single transaction
+    start_time = time.perf_counter()
+    use_copy = session.get_bind().dialect.name == 'postgresql'
+    total_rows = 0
+    
+    for frame in prepare_booking_chunks(session, frames):
+        if use_copy:
+            copy_frame(session, Booking.__tablename__, frame)
+        else:
+            executemany_frame(session, Booking, frame)
+        
+        total_rows += len(frame)
+        print(f"Loaded {total_rows} bookings so far")
+    
+    session.commit()
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"Loaded {total_rows} bookings in {elapsed:.2f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return total_rows
\ No newline at end of file
@@ -1,38 +1,58 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+from pandas.api.types import is_numeric_dtype
+
+MONTH_MAP = {
+    'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
+    'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
+}
+
+# Low-cardinality text columns, stored as categoricals
+CATEGORY_COLUMNS = [
+    'hotel', 'meal', 'country', 'market_segment', 'distribution_channel', 'reserved_room_type',
+    'assigned_room_type', 'deposit_type', 'customer_type', 'reservation_status'
+]
+
+# Counters, downcast to the smallest integer type that holds their values (int8/int16 in practice)
+COUNTER_COLUMNS = [
+    'lead_time', 'arrival_date_year', 'arrival_date_week_number', 'arrival_date_day_of_month',
+    'stays_in_weekend_nights', 'stays_in_week_nights', 'adults', 'children', 'babies',
+    'previous_cancellations', 'previous_bookings_not_canceled', 'booking_changes',
+    'days_in_waiting_list', 'required_car_parking_spaces', 'total_of_special_requests', 'total_nights',
+    'arrival_date_month', 'is_repeated_guest'
+]
 
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
 
-    df_clean = df.copy()
+    # Rows are filtered before anything is derived, so only the kept rows are ever copied
+    keep = pd.Series(True, index=df.index)
     
-
-    if 'children' in df_clean.columns:
-        df_clean['children'] = df_clean['children'].fillna(0)
+    if all(col in df.columns for col in ['stays_in_weekend_nights', 'stays_in_week_nights']):
+        total_nights = df['stays_in_weekend_nights'] + df['stays_in_week_nights']
+        keep &= total_nights > 0
     
-    if 'country' in df_clean.columns:
-        df_clean['country'] = df_clean['country'].fillna('UNK')
+    if 'adr' in df.columns:
+        keep &= df['adr'] > 0
     
-    if 'adr' in df_clean.columns:
-        df_clean = df_clean.dropna(subset=['adr'])
+    df_clean = df.loc[keep].copy()
     
     if 'children' in df_clean.columns:
-        df_clean['children'] = df_clean['children'].astype(int)
+        df_clean['children'] = df_clean['children'].fillna(0).astype(int)
     
     if 'babies' in df_clean.columns:
         df_clean['babies'] = df_clean['babies'].astype(int)
     
+    if 'country' in df_clean.columns:
+        df_clean['country'] = df_clean['country'].fillna('UNK')
+    
     if 'is_canceled' in df_clean.columns:
         df_clean['is_canceled'] = df_clean['is_canceled'].astype(bool)
     
     if all(col in df_clean.columns for col in ['arrival_date_year', 'arrival_date_month', 'arrival_date_day_of_month']):
-        month_map = {
-            'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
-            'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
-        }
-        
-        if df_clean['arrival_date_month'].dtype == 'object':
-            df_clean['arrival_date_month'] = df_clean['arrival_date_month'].map(month_map)
+        if not is_numeric_dtype(df_clean['arrival_date_month']):
+            df_clean['arrival_date_month'] = df_clean['arrival_date_month'].astype(object).map(MONTH_MAP)
         
         df_clean['arrival_date'] = pd.to_datetime(
             dict(
@@ -46,15 +66,26 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         df_clean['total_nights'] = df_clean['stays_in_weekend_nights'] + df_clean['stays_in_week_nights']
     
     if 'arrival_date' in df_clean.columns and 'total_nights' in df_clean.columns:
-        df_clean['departure_date'] = df_clean.apply(
-            lambda row: row['arrival_date'] + timedelta(days=int(row['total_nights'])),
-            axis=1
-        )
+        df_clean['departure_date'] = df_clean['arrival_date'] + pd.to_timedelta(df_clean['total_nights'], unit='D')
     
-    if 'total_nights' in df_clean.columns:
-        df_clean = df_clean[df_clean['total_nights'] > 0]
+    return compact_dtypes(df_clean)
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
     
-    if 'adr' in df_clean.columns:
-        df_clean = df_clean[df_clean['adr'] > 0]
+    for col in COUNTER_COLUMNS:
+        if col in df.columns and is_numeric_dtype(df[col]) and df[col].notna().all():
+            df[col] = pd.to_numeric(df[col], downcast='integer')
     
-    return df_clean
\ No newline at end of file
+    return df
+
+def clean_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+
+    # Streaming mode: only one raw chunk and its cleaned copy are in memory at a time
+    for chunk in chunks:
+        df_clean = clean_data(chunk)
+        if len(df_clean):
+            yield df_clean
\ No newline at end of file
@@ -0,0 +1,86 @@
+from typing import List
+from sqlalchemy import select, insert, delete, func, case, inspect, or_, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from src.data.db_manager import Booking, BookingCube
+
+# Upper bounds (inclusive, in days) of the lead time buckets stored in the cube
+LEAD_TIME_BUCKET_BOUNDS = [7, 30, 90, 180, 365]
+LEAD_TIME_BUCKET_LABELS = ['0-7 days', '8-30 days', '31-90 days', '91-180 days', '181-365 days', '>365 days']
+
+def lead_time_bucket(lead_time):
+
+    return case(
+        *[(lead_time <= bound, i) for i, bound in enumerate(LEAD_TIME_BUCKET_BOUNDS)],
+        else_=len(LEAD_TIME_BUCKET_BOUNDS)
+    )
+
+CUBE_COLUMNS = [
+    'hotel_id', 'country_id', 'arrival_date', 'is_canceled',
+    'market_segment', 'distribution_channel', 'lead_time_bucket',
+    'booking_count', 'revenue_sum', 'lead_time_sum'
+]
+
+def _rollup():
+
+    bucket = lead_time_bucket(Booking.lead_time)
+    
+    return select(
+        Booking.hotel_id,
+        Booking.country_id,
+        Booking.arrival_date,
+        Booking.is_canceled,
+        Booking.market_segment,
+        Booking.distribution_channel,
+        bucket,
+        func.count(Booking.id),
+        func.sum(Booking.adr * Booking.total_nights),
+        func.sum(Booking.lead_time)
+    ).group_by(
+        Booking.hotel_id,
+        Booking.country_id,
+        Booking.arrival_date,
+        Booking.is_canceled,
+        Booking.market_segment,
+        Booking.distribution_channel,
+        bucket
+    )
+
+def refresh_booking_cube(session: Session) -> int:
+
+    # The cube is derived data: rebuild the table so its columns and indexes always match the model
+    BookingCube.__table__.drop(bind=session.connection(), checkfirst=True)
+    BookingCube.__table__.create(bind=session.connection())
+    session.execute(insert(BookingCube).from_select(CUBE_COLUMNS, _rollup()))
+    session.commit()
+    
+    cube_rows = session.query(func.count(BookingCube.id)).scalar()
+    print(f"Booking cube refreshed with {cube_rows} rows")
+    return cube_rows
+
+def update_booking_cube(session: Session, booking_ids: List[int]) -> int:
+
+    # An incremental load never changes a booking's arrival date (it is part of the upsert key), so the
+    # cells an inserted or updated booking leaves and enters share it: only the changed bookings' days
+    # are recomputed, with row-level DELETE and INSERT that analytics reads never wait on
+    if not inspect(session.connection()).has_table(BookingCube.__tablename__):
+        return refresh_booking_cube(session)
+    
+    changed = bindparam('booking_ids', booking_ids, type_=ARRAY(Integer))
+    days = [day for day, in session.execute(select(Booking.arrival_date).where(Booking.id == any_(changed)).distinct())]
+    if not days:
+        return 0
+    
+    def on_days(column):
+
+        dated = [day for day in days if day is not None]
+        return or_(column.in_(dated), column.is_(None)) if None in days else column.in_(dated)
+    
+    session.execute(delete(BookingCube).where(on_days(BookingCube.arrival_date)))
+    cells = session.execute(insert(BookingCube).from_select(
+        CUBE_COLUMNS, _rollup().where(on_days(Booking.arrival_date))
+    )).rowcount
+    session.commit()
+    
+    print(f"Booking cube updated: {cells} cells recomputed over {len(days)} arrival days")
+    return cells
\ No newline at end of file
@@ -0,0 +1,109 @@
+from sqlalchemy import text, func, insert, select
+from sqlalchemy.orm import Session
+from src.data.db_manager import engine, Booking, DailyRevenue
+
+KEY_COLUMNS = "arrival_date, hotel_id, country_id, market_segment, distribution_channel"
+
+# Signed, per-statement deltas of confirmed bookings; canceling a booking moves it out of the series
+DELTA_SOURCES = {
+    "INSERT": f"SELECT {KEY_COLUMNS}, is_canceled, adr, total_nights, 1 AS sign FROM new_rows",
+    "DELETE": f"SELECT {KEY_COLUMNS}, is_canceled, adr, total_nights, -1 AS sign FROM old_rows",
+    "UPDATE": (
+        f"SELECT {KEY_COLUMNS}, is_canceled, adr, total_nights, 1 AS sign FROM new_rows "
+        f"UNION ALL SELECT {KEY_COLUMNS}, is_canceled, adr, total_nights, -1 AS sign FROM old_rows"
+    )
+}
+
+MERGE_DELTA_SQL = """
+        INSERT INTO daily_revenue AS d ({key_columns}, booking_count, revenue)
+        SELECT {key_columns}, sum(sign), coalesce(sum(sign * adr * total_nights), 0)
+        FROM ({source}) AS delta
+        WHERE is_canceled = false AND arrival_date IS NOT NULL
+        GROUP BY {key_columns}
+        HAVING sum(sign) <> 0 OR coalesce(sum(sign * adr * total_nights), 0) <> 0
+        ORDER BY {key_columns}
+        ON CONFLICT ({key_columns}) DO UPDATE
+        SET booking_count = d.booking_count + EXCLUDED.booking_count,
+            revenue = d.revenue + EXCLUDED.revenue;"""
+
+PRUNE_EMPTY_DAYS_SQL = """
+        DELETE FROM daily_revenue
+        WHERE booking_count = 0 AND arrival_date IN (SELECT arrival_date FROM old_rows);"""
+
+def _trigger_function_sql() -> str:
+
+    branches = []
+    for operation, source in DELTA_SOURCES.items():
+        body = MERGE_DELTA_SQL.format(key_columns=KEY_COLUMNS, source=source)
+        if operation != "INSERT":
+            body += PRUNE_EMPTY_DAYS_SQL
+        branches.append(f"IF TG_OP = '{operation}' THEN{body}\n    END IF;")
+    
+    return (
+        "CREATE OR REPLACE FUNCTION daily_revenue_apply_delta() RETURNS trigger AS $$\n"
+        "BEGIN\n    " + "\n    ".join(branches) + "\n    RETURN NULL;\nEND;\n$$ LANGUAGE plpgsql;"
+    )
+
+def install_daily_revenue_triggers():
+
+    # Statement-level triggers see all affected rows at once through transition tables, so a
+    # batch insert or COPY costs one grouped upsert. Deltas merge in key order, so concurrent
+    # loaders lock overlapping days in the same order and cannot deadlock. PostgreSQL only
+    # allows transition tables on single-event triggers, hence one trigger per operation.
+    transitions = {
+        "INSERT": "REFERENCING NEW TABLE AS new_rows",
+        "DELETE": "REFERENCING OLD TABLE AS old_rows",
+        "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    }
+    
+    with engine.begin() as connection:
+        connection.execute(text(_trigger_function_sql()))
+        for operation, referencing in transitions.items():
+            trigger_name = f"bookings_daily_revenue_{operation.lower()}"
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger_name} ON bookings"))
+            connection.execute(text(
+                f"CREATE TRIGGER {trigger_name} AFTER {operation} ON bookings {referencing} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION daily_revenue_apply_delta()"
+            ))
+    
+    print("Daily revenue triggers installed")
+
+def rebuild_daily_revenue(session: Session) -> int:
+
+    # Backfill for bookings loaded before the triggers existed (or after a TRUNCATE, which they skip)
+    confirmed = Booking.is_canceled == False
+    
+    rollup = select(
+        Booking.arrival_date,
+        Booking.hotel_id,
+        Booking.country_id,
+        Booking.market_segment,
+        Booking.distribution_channel,
+        func.count(Booking.id),
+        func.coalesce(func.sum(Booking.adr * Booking.total_nights), 0)
+    ).where(
+        confirmed,
+        Booking.arrival_date.isnot(None)
+    ).group_by(
+        Booking.arrival_date,
+        Booking.hotel_id,
+        Booking.country_id,
+        Booking.market_segment,
+        Booking.distribution_channel
+    )
+    
+    session.query(DailyRevenue).delete()
+    session.execute(
+        insert(DailyRevenue).from_select(
+            [
+                'arrival_date', 'hotel_id', 'country_id', 'market_segment', 'distribution_channel',
+                'booking_count', 'revenue'
+            ],
+            rollup
+        )
+    )
+    session.commit()
+    
+    daily_rows = session.query(func.count(DailyRevenue.id)).scalar()
+    print(f"Daily revenue rebuilt with {daily_rows} rows")
+    return daily_rows
\ No newline at end of file
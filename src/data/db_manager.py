@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, Date, Boolean, ForeignKey, Text
+from sqlalchemy import create_engine, inspect, text, MetaData, Table, Column, Integer, BigInteger, String, Float, Date, DateTime, Boolean, ForeignKey, Text, Index
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker, relationship
 import pandas as pd
 import datetime
 from src.config import DATABASE_URL
+from src.data.labels import LabelType, create_label_types, migrate_label_columns
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -13,7 +16,7 @@ class Hotel(Base):
     __tablename__ = "hotels"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
+    name = Column(String, unique=True, index=True)
     type = Column(String)  
     bookings = relationship("Booking", back_populates="hotel")
     
@@ -37,26 +40,93 @@ class Booking(Base):
     children = Column(Integer)
     babies = Column(Integer)
     country_id = Column(Integer, ForeignKey("countries.id"))
-    market_segment = Column(String)
-    distribution_channel = Column(String)
+    # Low-cardinality labels are stored as PostgreSQL enums (see src/data/labels.py) and read as strings
+    market_segment = Column(LabelType("market_segment_label"))
+    distribution_channel = Column(LabelType("distribution_channel_label"))
     is_repeated_guest = Column(Boolean)
     previous_cancellations = Column(Integer)
     previous_bookings_not_canceled = Column(Integer)
-    reserved_room_type = Column(String)
-    assigned_room_type = Column(String)
+    reserved_room_type = Column(LabelType("room_type_label"))
+    assigned_room_type = Column(LabelType("room_type_label"))
     booking_changes = Column(Integer)
-    deposit_type = Column(String)
+    deposit_type = Column(LabelType("deposit_type_label"))
     days_in_waiting_list = Column(Integer)
-    customer_type = Column(String)
+    customer_type = Column(LabelType("customer_type_label"))
     adr = Column(Float)  
     required_car_parking_spaces = Column(Integer)
     total_of_special_requests = Column(Integer)
-    reservation_status = Column(String)
+    reservation_status = Column(LabelType("reservation_status_label"))
     reservation_status_date = Column(Date)
     total_nights = Column(Integer)
+    # Hash of the source row's natural key (plus its duplicate ordinal) and of its full content,
+    # used by incremental ingest to upsert only new or changed rows
+    source_key = Column(BigInteger)
+    source_hash = Column(BigInteger)
     
     hotel = relationship("Hotel", back_populates="bookings")
     country = relationship("Country", back_populates="bookings")
+    
+    # Analytics filters slice on arrival date, hotel and country; lead_time is carried in
+    # the index so the lead time statistics can be answered with index-only scans
+    __table_args__ = (
+        Index("ix_bookings_arrival_hotel_canceled", "arrival_date", "hotel_id", "is_canceled", postgresql_include=["lead_time"]),
+        Index("ix_bookings_hotel_canceled", "hotel_id", "is_canceled"),
+        Index("ix_bookings_country", "country_id"),
+        Index("ix_bookings_source_key_arrival", "source_key", "arrival_date", unique=True),
+    )
+
+class BookingCube(Base):
+    __tablename__ = "booking_cube"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    hotel_id = Column(Integer, ForeignKey("hotels.id"))
+    country_id = Column(Integer, ForeignKey("countries.id"))
+    arrival_date = Column(Date)
+    is_canceled = Column(Boolean)
+    market_segment = Column(LabelType("market_segment_label"))
+    distribution_channel = Column(LabelType("distribution_channel_label"))
+    lead_time_bucket = Column(Integer)
+    booking_count = Column(Integer)
+    revenue_sum = Column(Float)
+    lead_time_sum = Column(Integer)
+    
+    __table_args__ = (
+        Index("ix_booking_cube_arrival_hotel_canceled", "arrival_date", "hotel_id", "is_canceled"),
+        Index("ix_booking_cube_country", "country_id"),
+    )
+
+class DailyRevenue(Base):
+    __tablename__ = "daily_revenue"
+    
+    # Confirmed bookings and revenue per arrival day, kept current by triggers on bookings
+    id = Column(Integer, primary_key=True)
+    arrival_date = Column(Date, nullable=False)
+    hotel_id = Column(Integer, ForeignKey("hotels.id"))
+    country_id = Column(Integer, ForeignKey("countries.id"))
+    market_segment = Column(LabelType("market_segment_label"))
+    distribution_channel = Column(LabelType("distribution_channel_label"))
+    booking_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    
+    # The trigger upserts on this key, and a booking without a country (or label) still has to land on its
+    # day's existing row, so NULLs compare equal here (PostgreSQL 15+); with the default, every delta for
+    # such a row would insert a new one
+    __table_args__ = (
+        Index(
+            "uq_daily_revenue_day",
+            "arrival_date", "hotel_id", "country_id", "market_segment", "distribution_channel",
+            unique=True,
+            info={"nulls_not_distinct": True}
+        ),
+    )
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+    
+    # Single row generation counter, bumped after every committed data load
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.now)
 
 class QueryHistory(Base):
     __tablename__ = "query_history"
@@ -67,6 +137,39 @@ class QueryHistory(Base):
     timestamp = Column(Date, default=datetime.datetime.now)
     execution_time_ms = Column(Float)
 
+@compiles(CreateIndex, "postgresql")
+def _create_index(create, compiler, **kw):
+
+    # SQLAlchemy 1.4 has no NULLS NOT DISTINCT option, so it is appended for the indexes that ask for it
+    statement = compiler.visit_create_index(create, **kw)
+    if create.element.info.get("nulls_not_distinct"):
+        statement += " NULLS NOT DISTINCT"
+    return statement
+
+def _migrate_daily_revenue_key():
+
+    # Databases created before the key treated NULLs as equal have it as a plain unique constraint, and
+    # may hold several rows per key; those are merged before the new index replaces the constraint
+    constraints = {constraint['name'] for constraint in inspect(engine).get_unique_constraints("daily_revenue")}
+    if engine.dialect.name != "postgresql" or "uq_daily_revenue_day" not in constraints:
+        return
+    
+    key_columns = "arrival_date, hotel_id, country_id, market_segment, distribution_channel"
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE daily_revenue DROP CONSTRAINT uq_daily_revenue_day"))
+        connection.execute(text(f"""
+            WITH merged AS (
+                SELECT {key_columns}, sum(booking_count) AS booking_count, sum(revenue) AS revenue
+                FROM daily_revenue
+                GROUP BY {key_columns}
+            ), cleared AS (
+                DELETE FROM daily_revenue
+            )
+            INSERT INTO daily_revenue ({key_columns}, booking_count, revenue)
+            SELECT {key_columns}, booking_count, revenue FROM merged WHERE booking_count <> 0 OR revenue <> 0
+        """))
+    print("Merged duplicate daily revenue rows and made NULL dimensions part of the key")
+
 def get_db():
     db = SessionLocal()
     try:
@@ -78,7 +181,22 @@ def init_db():
 
     print("Creating database tables...")
     
+    create_label_types(engine)
     Base.metadata.create_all(bind=engine)
+    _migrate_daily_revenue_key()
+    
+    # create_all skips tables that already exist, so add any columns, label types and indexes they are missing
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspect(engine).get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                    ))
+        migrate_label_columns(engine, [table])
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     
     print("Database tables created successfully")
     
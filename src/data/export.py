@@ -0,0 +1,121 @@
+import io
+import json
+import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import select
+from src.data.db_manager import engine, Booking, DailyRevenue, Hotel, Country
+from src.analytics.filters import apply_filters
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+EXPORT_MODELS = {
+    'bookings': Booking,
+    'daily_revenue': DailyRevenue
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+def _arrow_type(python_type):
+
+    return {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime.date: pa.date32(),
+        datetime.datetime: pa.timestamp('us')
+    }[python_type]
+
+def _json_value(value):
+
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+def export_columns(table: str) -> Dict[str, Any]:
+
+    model = EXPORT_MODELS[table]
+    columns = {column.name: column for column in model.__table__.columns}
+    # Names of the referenced hotel and country, resolved with a join only when projected
+    columns['hotel'] = Hotel.name
+    columns['country'] = Country.name
+    return columns
+
+def build_export_query(table: str, columns: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                       limit: Optional[int] = None):
+
+    if table not in EXPORT_MODELS:
+        raise KeyError(table)
+    
+    model = EXPORT_MODELS[table]
+    available = export_columns(table)
+    names = columns or list(available)
+    
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table}: {', '.join(unknown)}")
+    
+    statement = select(*[available[name].label(name) for name in names]).select_from(model)
+    if 'hotel' in names:
+        statement = statement.outerjoin(Hotel, Hotel.id == model.hotel_id)
+    if 'country' in names:
+        statement = statement.outerjoin(Country, Country.id == model.country_id)
+    
+    statement = apply_filters(statement, model, filters).order_by(model.id)
+    if limit:
+        statement = statement.limit(limit)
+    
+    return statement
+
+def stream_rows(statement, chunk_size: int) -> Iterator[List[Any]]:
+
+    # stream_results makes psycopg2 use a server-side (named) cursor, so at most one chunk is held in memory
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(statement)
+        for rows in result.partitions(chunk_size):
+            yield rows
+
+def stream_ndjson(statement, chunk_size: int) -> Iterator[bytes]:
+
+    names = [column.name for column in statement.selected_columns]
+    
+    for rows in stream_rows(statement, chunk_size):
+        yield ''.join(
+            json.dumps(dict(zip(names, row)), default=_json_value) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+def _drain(sink: io.BytesIO) -> bytes:
+
+    content = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return content
+
+def stream_arrow(statement, chunk_size: int) -> Iterator[bytes]:
+
+    schema = pa.schema([
+        pa.field(column.name, _arrow_type(column.type.python_type))
+        for column in statement.selected_columns
+    ])
+    
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    
+    for rows in stream_rows(statement, chunk_size):
+        arrays = [
+            pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows), schema)
+        ]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield _drain(sink)
+    
+    # Closing writes the end-of-stream marker (and the schema, if no rows matched)
+    writer.close()
+    yield _drain(sink)
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import datetime
+import pandas as pd
+from typing import Dict, Iterable, List, Union
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.config import CHANGES_DIR
+from src.data.db_manager import Booking
+from src.data.bulk import BOOKING_COLUMNS, prepare_booking_chunks, copy_frame
+
+STAGING_TABLE = "bookings_staging"
+
+# Columns rewritten when a known booking arrives with different content
+UPDATE_COLUMNS = [name for name in BOOKING_COLUMNS if name not in ('source_key', 'arrival_date')]
+
+# Partitioned tables cannot return xmax, so inserts are told apart from updates by looking the key up
+# in the outer query, which still sees bookings as they were before the upsert
+UPSERT_SQL = f"""
+    WITH merged AS (
+        INSERT INTO {Booking.__tablename__} ({', '.join(BOOKING_COLUMNS)})
+        SELECT {', '.join(BOOKING_COLUMNS)} FROM {STAGING_TABLE}
+        ON CONFLICT (source_key, arrival_date) DO UPDATE
+        SET {', '.join(f'{name} = EXCLUDED.{name}' for name in UPDATE_COLUMNS)}
+        WHERE {Booking.__tablename__}.source_hash IS DISTINCT FROM EXCLUDED.source_hash
+        RETURNING id, source_key, arrival_date
+    )
+    SELECT merged.id, NOT EXISTS (
+        SELECT 1 FROM {Booking.__tablename__} existing
+        WHERE existing.source_key = merged.source_key AND existing.arrival_date = merged.arrival_date
+    ) AS inserted
+    FROM merged"""
+
+def merge_booking_frame(session: Session, frame: pd.DataFrame, changes: Dict[str, List[int]]):
+
+    # The frame is copied into a temporary staging table and merged with one statement; rows whose
+    # content hash is unchanged are skipped by the conflict clause and never rewritten
+    session.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DROP AS "
+        f"SELECT {', '.join(BOOKING_COLUMNS)} FROM {Booking.__tablename__} WITH NO DATA"
+    ))
+    session.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+    copy_frame(session, STAGING_TABLE, frame)
+    
+    for booking_id, inserted in session.execute(text(UPSERT_SQL)):
+        changes['inserted' if inserted else 'updated'].append(booking_id)
+
+def upsert_bookings(session: Session, frames: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Dict[str, List[int]]:
+
+    if session.get_bind().dialect.name != 'postgresql':
+        raise RuntimeError("Incremental ingest requires PostgreSQL (COPY and INSERT ... ON CONFLICT)")
+    
+    start_time = time.perf_counter()
+    changes = {'inserted': [], 'updated': []}
+    total_rows = 0
+    
+    for frame in prepare_booking_chunks(session, frames):
+        merge_booking_frame(session, frame, changes)
+        total_rows += len(frame)
+        print(f"Merged {total_rows} source rows so far")
+    
+    session.commit()
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"Merged {total_rows} source rows in {elapsed:.2f}s: {len(changes['inserted'])} inserted, "
+          f"{len(changes['updated'])} updated, {total_rows - len(changes['inserted']) - len(changes['updated'])} unchanged")
+    return changes
+
+def write_changed_ids(changes: Dict[str, List[int]], data_version: int) -> str:
+
+    os.makedirs(CHANGES_DIR, exist_ok=True)
+    path = os.path.join(CHANGES_DIR, f"bookings-v{data_version}.json")
+    
+    payload = {
+        'data_version': data_version,
+        'created_at': datetime.datetime.now().isoformat(),
+        'inserted': changes['inserted'],
+        'updated': changes['updated']
+    }
+    
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+    
+    print(f"Changed booking ids written to {path}")
+    return path
\ No newline at end of file
@@ -0,0 +1,147 @@
+import pandas as pd
+from typing import Dict, Iterable, Set
+from sqlalchemy import String, text
+from sqlalchemy.types import TypeDecorator, UserDefinedType
+
+# PostgreSQL enum types behind the low-cardinality booking columns, seeded with the labels of the
+# public dataset; labels a feed introduces later are added on load by ensure_labels
+LABEL_TYPES = {
+    'market_segment_label': [
+        'Direct', 'Corporate', 'Online TA', 'Offline TA/TO', 'Complementary', 'Groups', 'Aviation', 'Undefined'
+    ],
+    'distribution_channel_label': ['Direct', 'Corporate', 'TA/TO', 'GDS', 'Undefined'],
+    'deposit_type_label': ['No Deposit', 'Refundable', 'Non Refund'],
+    'customer_type_label': ['Transient', 'Contract', 'Transient-Party', 'Group'],
+    'room_type_label': ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'P'],
+    'reservation_status_label': ['Check-Out', 'Canceled', 'No-Show']
+}
+
+LABEL_COLUMNS = {
+    'market_segment': 'market_segment_label',
+    'distribution_channel': 'distribution_channel_label',
+    'deposit_type': 'deposit_type_label',
+    'customer_type': 'customer_type_label',
+    'reserved_room_type': 'room_type_label',
+    'assigned_room_type': 'room_type_label',
+    'reservation_status': 'reservation_status_label'
+}
+
+# Labels known to exist per enum type in this process, so only unseen values hit the catalog
+_known_labels: Dict[str, Set[str]] = {}
+
+class _EnumName(UserDefinedType):
+    cache_ok = True
+    
+    def __init__(self, name: str):
+
+        self.name = name
+    
+    def get_col_spec(self, **kw):
+
+        return self.name
+
+class LabelType(TypeDecorator):
+    # A PostgreSQL enum (4 bytes, compared by code) that reads and writes as a plain string.
+    # Unlike sqlalchemy.Enum it accepts labels added after the model was imported, and other
+    # backends store it as a string column.
+    impl = String
+    cache_ok = True
+    
+    def __init__(self, name: str):
+
+        super().__init__()
+        self.name = name
+    
+    def load_dialect_impl(self, dialect):
+
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(_EnumName(self.name))
+        return dialect.type_descriptor(String())
+    
+    @property
+    def python_type(self):
+
+        return str
+
+def _quote(label: str) -> str:
+
+    return "'" + str(label).replace("'", "''") + "'"
+
+def _load_labels(connection, type_name: str) -> Set[str]:
+
+    rows = connection.execute(text(
+        "SELECT e.enumlabel FROM pg_enum e JOIN pg_type t ON t.oid = e.enumtypid WHERE t.typname = :name"
+    ), {'name': type_name})
+    return {label for label, in rows}
+
+def add_labels(connection, type_name: str, labels: Iterable[str]):
+
+    known = _known_labels.get(type_name)
+    if known is None:
+        known = _known_labels[type_name] = _load_labels(connection, type_name)
+    
+    for label in sorted(set(labels) - known):
+        connection.execute(text(f"ALTER TYPE {type_name} ADD VALUE IF NOT EXISTS {_quote(label)}"))
+        print(f"Added label {label!r} to {type_name}")
+        known.add(label)
+
+def create_label_types(engine):
+
+    if engine.dialect.name != 'postgresql':
+        return
+    
+    with engine.begin() as connection:
+        existing = {name for name, in connection.execute(text(
+            "SELECT typname FROM pg_type WHERE typname = ANY(:names)"
+        ), {'names': list(LABEL_TYPES)})}
+        for type_name, labels in LABEL_TYPES.items():
+            if type_name not in existing:
+                connection.execute(text(f"CREATE TYPE {type_name} AS ENUM ({', '.join(_quote(label) for label in labels)})"))
+
+def ensure_labels(engine, df: pd.DataFrame):
+
+    # Runs on its own committed connection: PostgreSQL rejects a new enum label in the
+    # transaction that added it, and the loader's transaction is still open
+    if engine.dialect.name != 'postgresql':
+        return
+    
+    new_labels = {}
+    for column, type_name in LABEL_COLUMNS.items():
+        if column in df.columns:
+            values = df[column].dropna().unique()
+            missing = {str(value) for value in values} - _known_labels.get(type_name, set())
+            if missing:
+                new_labels.setdefault(type_name, set()).update(missing)
+    
+    if new_labels:
+        with engine.begin() as connection:
+            for type_name, labels in new_labels.items():
+                add_labels(connection, type_name, labels)
+
+def migrate_label_columns(engine, tables):
+
+    # Converts string columns created before the label types existed, adding their values first
+    if engine.dialect.name != 'postgresql':
+        return
+    
+    for table in tables:
+        for column in table.columns:
+            if not isinstance(column.type, LabelType):
+                continue
+            with engine.begin() as connection:
+                current = connection.execute(text(
+                    "SELECT udt_name FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+                ), {'table': table.name, 'column': column.name}).scalar()
+                if current is None or current == column.type.name:
+                    continue
+                values = connection.execute(text(
+                    f"SELECT DISTINCT {column.name} FROM {table.name} WHERE {column.name} IS NOT NULL"
+                )).scalars().all()
+                add_labels(connection, column.type.name, values)
+            
+            with engine.begin() as connection:
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE {column.type.name} "
+                    f"USING {column.name}::{column.type.name}"
+                ))
+            print(f"Converted {table.name}.{column.name} to {column.type.name}")
\ No newline at end of file
@@ -1,7 +1,21 @@
 import pandas as pd
 import os
-from typing import Optional
-from src.config import DEFAULT_DATASET, PROCESSED_DATA_DIR
+import json
+import hashlib
+import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from src.config import DEFAULT_DATASET, PROCESSED_DATA_DIR, LOAD_CHUNK_ROWS
+from src.data.cleaner import clean_chunks, compact_dtypes, MONTH_MAP
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Bump when clean_data changes, so cached processed files from older code are rebuilt
+PROCESSED_FORMAT_VERSION = 1
+FINGERPRINT_KEY = b'hotel_bookings.source'
 
 def load_raw_data(file_path: Optional[str] = None) -> pd.DataFrame:
 
@@ -10,8 +24,172 @@ def load_raw_data(file_path: Optional[str] = None) -> pd.DataFrame:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Dataset file not found at {file_path}")
     
+    # The parsed columns of an unchanged file are read back from Parquet instead of parsing the CSV again
+    cache_path = raw_path(file_path)
+    if processed_data_is_fresh(file_path, cache_path):
+        print(f"Loading data from {cache_path}")
+        return pq.read_table(cache_path, memory_map=True).to_pandas()
+    
     print(f"Loading data from {file_path}")
-    return pd.read_csv(file_path)
+    df = pd.read_csv(file_path)
+    if pa is not None:
+        for _ in _write_processed_chunks(iter([df]), file_path, cache_path):
+            pass
+    return df
+
+def load_raw_data_chunks(file_path: Optional[str] = None, chunksize: int = LOAD_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+
+    file_path = file_path or DEFAULT_DATASET
+    
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Dataset file not found at {file_path}")
+    
+    print(f"Streaming data from {file_path} in chunks of {chunksize} rows")
+    return pd.read_csv(file_path, chunksize=chunksize)
+
+def source_arrival_months(file_path: Optional[str] = None, chunksize: int = LOAD_CHUNK_ROWS) -> List[datetime.date]:
+
+    # One cheap pass over the arrival year and month columns, so every partition a load needs can be
+    # created before it writes anything
+    file_path = file_path or DEFAULT_DATASET
+    months = set()
+    for chunk in pd.read_csv(file_path, usecols=['arrival_date_year', 'arrival_date_month'], chunksize=chunksize):
+        month = chunk['arrival_date_month']
+        if not pd.api.types.is_numeric_dtype(month):
+            month = month.map(MONTH_MAP)
+        pairs = pd.DataFrame({'year': chunk['arrival_date_year'], 'month': month}).dropna().astype('int64')
+        months.update(pairs.drop_duplicates().itertuples(index=False, name=None))
+    return [datetime.date(year, month, 1) for year, month in sorted(months)]
+
+def processed_path(file_path: Optional[str] = None) -> str:
+
+    file_name = os.path.splitext(os.path.basename(file_path or DEFAULT_DATASET))[0]
+    return os.path.join(PROCESSED_DATA_DIR, f"{file_name}.parquet")
+
+def raw_path(file_path: Optional[str] = None) -> str:
+
+    file_name = os.path.splitext(os.path.basename(file_path or DEFAULT_DATASET))[0]
+    return os.path.join(PROCESSED_DATA_DIR, f"{file_name}.raw.parquet")
+
+def _file_sha256(file_path: str) -> str:
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_fingerprint(file_path: str) -> Dict[str, Any]:
+
+    stat = os.stat(file_path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _file_sha256(file_path),
+        'format_version': PROCESSED_FORMAT_VERSION
+    }
+
+def _stored_fingerprint(cache_path: str) -> Optional[Dict[str, Any]]:
+
+    try:
+        metadata = pq.read_schema(cache_path, memory_map=True).metadata or {}
+        return json.loads(metadata[FINGERPRINT_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        return None
+
+def processed_data_is_fresh(file_path: Optional[str] = None, cache_path: Optional[str] = None) -> bool:
+
+    file_path = file_path or DEFAULT_DATASET
+    cache_path = cache_path or processed_path(file_path)
+    if pa is None or not os.path.exists(cache_path):
+        return False
+    
+    stored = _stored_fingerprint(cache_path)
+    if stored is None or stored.get('format_version') != PROCESSED_FORMAT_VERSION:
+        return False
+    
+    # Size and mtime settle the common cases without reading the file; the hash only runs
+    # when the file was touched or copied but kept its size
+    stat = os.stat(file_path)
+    if stat.st_size != stored['size']:
+        return False
+    if stat.st_mtime_ns == stored['mtime_ns']:
+        return True
+    return _file_sha256(file_path) == stored['sha256']
+
+def _arrow_table(df: pd.DataFrame, schema=None):
+
+    # Later chunks convert straight into the first chunk's schema, with NaN read as null
+    if schema is not None:
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Chunks downcast independently, so the file stores one wide type per column and
+    # compact_dtypes narrows them again after reading
+    fields = []
+    for field in table.schema:
+        if pa.types.is_integer(field.type):
+            field = field.with_type(pa.int64())
+        elif pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+        fields.append(field)
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+def _write_processed_chunks(chunks: Iterator[pd.DataFrame], file_path: str,
+                            cache_path: Optional[str] = None) -> Iterator[pd.DataFrame]:
+
+    cache_path = cache_path or processed_path(file_path)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+    
+    fingerprint = json.dumps(source_fingerprint(file_path)).encode('utf-8')
+    writer = None
+    
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = _arrow_table(chunk)
+                schema = table.schema.with_metadata({**(table.schema.metadata or {}), FINGERPRINT_KEY: fingerprint})
+                writer = pq.ParquetWriter(tmp_path, schema)
+            else:
+                table = _arrow_table(chunk, schema)
+            writer.write_table(table)
+            yield chunk
+        
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp_path, cache_path)
+            print(f"Processed data saved to {cache_path}")
+    finally:
+        # A consumer that stops early or fails leaves no partial cache behind
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def read_processed_chunks(file_path: Optional[str] = None, chunksize: int = LOAD_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+
+    cache_path = processed_path(file_path)
+    print(f"Reading processed data from {cache_path} in chunks of {chunksize} rows")
+    
+    # Memory-mapped, so batches decode straight from the page cache without a read copy
+    parquet_file = pq.ParquetFile(cache_path, memory_map=True)
+    for batch in parquet_file.iter_batches(batch_size=chunksize):
+        yield compact_dtypes(batch.to_pandas())
+
+def load_clean_chunks(file_path: Optional[str] = None, chunksize: int = LOAD_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+
+    file_path = file_path or DEFAULT_DATASET
+    
+    if processed_data_is_fresh(file_path):
+        return read_processed_chunks(file_path, chunksize)
+    
+    chunks = clean_chunks(load_raw_data_chunks(file_path, chunksize))
+    if pa is None:
+        print("pyarrow is not installed; the processed data cache is disabled")
+        return chunks
+    return _write_processed_chunks(chunks, file_path)
 
 def save_processed_data(df: pd.DataFrame, file_name: str = "processed_bookings.csv") -> str:
 
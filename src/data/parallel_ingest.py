@@ -0,0 +1,208 @@
+import io
+import os
+import math
+import time
+import tempfile
+import multiprocessing
+import pandas as pd
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.config import DEFAULT_DATASET, LOAD_CHUNK_ROWS, INGEST_WORKERS, INGEST_PARTITION_MB
+from src.data.db_manager import SessionLocal, engine, Booking
+from src.data.cleaner import clean_chunks
+from src.data.loader import source_arrival_months
+from src.data.partitions import ensure_partitions
+from src.data.bulk import resolve_dimension_ids, prepare_booking_frame, natural_key_hashes, assign_source_hashes, copy_frame
+from src.data.ingest import merge_booking_frame
+from src.data.labels import LABEL_COLUMNS
+
+def csv_byte_ranges(file_path: str, partitions: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+
+    # Boundaries are moved forward to the next line start. The bookings CSV has no quoted
+    # newlines, so every line is one record.
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        
+        boundaries = [data_start]
+        step = max(1, (size - data_start) // partitions)
+        for i in range(1, partitions):
+            f.seek(data_start + i * step)
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+        boundaries.append(size)
+    
+    boundaries = sorted(set(boundaries))
+    return header, list(zip(boundaries[:-1], boundaries[1:]))
+
+def read_csv_range(file_path: str, header: bytes, start: int, end: int, chunksize: int = LOAD_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(io.BytesIO(header + data), chunksize=chunksize)
+
+def resolve_source_dimensions(session, file_path: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+
+    # One cheap pass over the dimension and label columns, so workers never race to create the
+    # same hotel, country or enum label
+    columns = ['hotel', 'country'] + list(LABEL_COLUMNS)
+    values = {}
+    for chunk in pd.read_csv(file_path, usecols=lambda name: name in columns, chunksize=LOAD_CHUNK_ROWS):
+        chunk = chunk.fillna({'country': 'UNK'})
+        for name in chunk.columns:
+            values.setdefault(name, set()).update(chunk[name].dropna().unique())
+    
+    names = pd.DataFrame({name: pd.Series(sorted(found), dtype=object) for name, found in values.items()})
+    hotel_ids, country_ids = resolve_dimension_ids(session, names)
+    session.commit()
+    return hotel_ids, country_ids
+
+def _init_worker():
+
+    # Never reuse pooled connections inherited from the parent process
+    engine.dispose()
+
+def _clean_partition(file_path: str, header: bytes, byte_range: Tuple[int, int], hotel_ids: Dict[str, int],
+                     country_ids: Dict[str, int], spool_path: str) -> Dict[str, Any]:
+
+    start_time = time.perf_counter()
+    session = SessionLocal()
+    try:
+        frames = []
+        for df in clean_chunks(read_csv_range(file_path, header, *byte_range)):
+            hotel_ids, country_ids = resolve_dimension_ids(session, df, hotel_ids, country_ids)
+            frames.append(prepare_booking_frame(df, hotel_ids, country_ids))
+        session.commit()
+    finally:
+        session.close()
+    
+    frame = pd.concat(frames) if frames else pd.DataFrame()
+    frame.to_pickle(spool_path)
+    
+    return {
+        'pid': os.getpid(),
+        'rows': len(frame),
+        'seconds': time.perf_counter() - start_time,
+        'key_counts': natural_key_hashes(frame).value_counts().to_dict() if len(frame) else {}
+    }
+
+def _load_partition(spool_path: str, seen_keys: Dict[int, int], incremental: bool) -> Dict[str, Any]:
+
+    start_time = time.perf_counter()
+    frame = pd.read_pickle(spool_path)
+    changes = {'inserted': [], 'updated': []}
+    
+    session = SessionLocal()
+    try:
+        if len(frame):
+            frame = assign_source_hashes(frame, seen_keys)
+            if incremental:
+                merge_booking_frame(session, frame, changes)
+            else:
+                copy_frame(session, Booking.__tablename__, frame)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        os.remove(spool_path)
+    
+    return {
+        'pid': os.getpid(),
+        'rows': len(frame),
+        'seconds': time.perf_counter() - start_time,
+        'changes': changes
+    }
+
+def _partition_offsets(key_counts: List[Dict[int, int]]) -> List[Dict[int, int]]:
+
+    # Duplicate ordinals must match a sequential load, so each partition starts counting
+    # a natural key where the partitions before it stopped
+    running = Counter()
+    offsets = []
+    for counts in key_counts:
+        offsets.append({key: running[key] for key in counts if key in running})
+        running.update(counts)
+    return offsets
+
+def _run_stage(executor: ProcessPoolExecutor, label: str, tasks: Dict[int, Tuple], worker_stats) -> Dict[int, Dict[str, Any]]:
+
+    futures = {executor.submit(*task): partition for partition, task in tasks.items()}
+    results = {}
+    
+    for future in as_completed(futures):
+        partition = futures[future]
+        result = future.result()
+        results[partition] = result
+        
+        stats = worker_stats[result['pid']]
+        stats['rows_' + label] += result['rows']
+        stats['seconds_' + label] += result['seconds']
+        print(f"Worker {result['pid']}: {label} partition {partition + 1}/{len(tasks)}, {result['rows']} rows "
+              f"in {result['seconds']:.2f}s ({result['rows'] / max(result['seconds'], 1e-9):,.0f} rows/s)")
+    
+    return results
+
+def parallel_ingest(file_path: Optional[str] = None, workers: int = INGEST_WORKERS,
+                    incremental: bool = False) -> Tuple[int, Dict[str, List[int]]]:
+
+    file_path = file_path or DEFAULT_DATASET
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Dataset file not found at {file_path}")
+    
+    start_time = time.perf_counter()
+    
+    # Enough partitions to keep every worker busy and each partition's memory bounded
+    partition_count = max(workers, math.ceil(os.path.getsize(file_path) / (INGEST_PARTITION_MB << 20)))
+    header, byte_ranges = csv_byte_ranges(file_path, partition_count)
+    print(f"Ingesting {file_path} with {workers} workers over {len(byte_ranges)} byte-range partitions")
+    
+    session = SessionLocal()
+    try:
+        hotel_ids, country_ids = resolve_source_dimensions(session, file_path)
+    finally:
+        session.close()
+    print(f"Resolved {len(hotel_ids)} hotels and {len(country_ids)} countries")
+    ensure_partitions(engine, source_arrival_months(file_path))
+    
+    worker_stats = defaultdict(Counter)
+    changes = {'inserted': [], 'updated': []}
+    
+    with tempfile.TemporaryDirectory(prefix='ingest-') as spool_dir, ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    ) as executor:
+        # Stage 1 parses, cleans and prepares partitions; stage 2 hashes and loads them, each
+        # worker over its own connection and transaction. A failed full load can leave some
+        # partitions committed; rerunning with incremental=True completes it idempotently.
+        spool_paths = [os.path.join(spool_dir, f"part-{i:05d}.pkl") for i in range(len(byte_ranges))]
+        cleaned = _run_stage(executor, 'cleaned', {
+            i: (_clean_partition, file_path, header, byte_range, hotel_ids, country_ids, spool_paths[i])
+            for i, byte_range in enumerate(byte_ranges)
+        }, worker_stats)
+        
+        offsets = _partition_offsets([cleaned[i].pop('key_counts') for i in range(len(byte_ranges))])
+        loaded = _run_stage(executor, 'loaded', {
+            i: (_load_partition, spool_paths[i], offsets[i], incremental)
+            for i in range(len(byte_ranges))
+        }, worker_stats)
+    
+    for i in range(len(byte_ranges)):
+        changes['inserted'].extend(loaded[i]['changes']['inserted'])
+        changes['updated'].extend(loaded[i]['changes']['updated'])
+    total_rows = sum(result['rows'] for result in loaded.values())
+    
+    for pid, stats in sorted(worker_stats.items()):
+        busy = stats['seconds_cleaned'] + stats['seconds_loaded']
+        print(f"Worker {pid}: cleaned {stats['rows_cleaned']} rows in {stats['seconds_cleaned']:.2f}s, "
+              f"loaded {stats['rows_loaded']} rows in {stats['seconds_loaded']:.2f}s, busy {busy:.2f}s")
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"Ingested {total_rows} bookings with {workers} workers in {elapsed:.2f}s "
+          f"({total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return total_rows, changes
\ No newline at end of file
@@ -0,0 +1,154 @@
+import datetime
+import pandas as pd
+from typing import Iterable, List, Optional, Set, Tuple
+from sqlalchemy import text, MetaData, Table, PrimaryKeyConstraint
+from sqlalchemy.schema import CreateTable
+from src.data.db_manager import Booking
+from src.data.labels import create_label_types
+
+BOOKINGS_TABLE = Booking.__tablename__
+
+# Month starts with an existing partition in this process; None until checked, and stays
+# empty with partitioning disabled when bookings is a plain table
+_known_months: Optional[Set[datetime.date]] = None
+_partitioned = False
+
+def month_start(value) -> datetime.date:
+
+    return datetime.date(value.year, value.month, 1)
+
+def next_month(month: datetime.date) -> datetime.date:
+
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def partition_name(month: datetime.date) -> str:
+
+    return f"{BOOKINGS_TABLE}_{month.year}_{month.month:02d}"
+
+def is_partitioned(connection) -> bool:
+
+    return connection.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+    ), {'table': BOOKINGS_TABLE}).scalar()
+
+def list_partitions(connection) -> List[Tuple[str, datetime.date]]:
+
+    rows = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table ORDER BY c.relname"
+    ), {'table': BOOKINGS_TABLE})
+    
+    partitions = []
+    for name, in rows:
+        year, month = name[len(BOOKINGS_TABLE) + 1:].split('_')
+        partitions.append((name, datetime.date(int(year), int(month), 1)))
+    return partitions
+
+def _partitioned_bookings_table() -> Table:
+
+    # A copy of the model's table whose primary key also covers arrival_date, as PostgreSQL requires the
+    # partition key in every unique index. Plain tables keep the model's key on id alone.
+    metadata = MetaData()
+    for foreign_key in Booking.__table__.foreign_keys:
+        foreign_key.column.table.to_metadata(metadata)
+    bookings = Booking.__table__.to_metadata(metadata)
+    # A composite key is not autoincrementing by default, but id stays serial
+    bookings.c.id.autoincrement = True
+    bookings.c.arrival_date.primary_key = True
+    bookings.c.arrival_date.nullable = False
+    bookings.append_constraint(PrimaryKeyConstraint(bookings.c.id, bookings.c.arrival_date))
+    return bookings
+
+def create_partitioned_bookings(engine) -> bool:
+
+    # Same columns and indexes as the model; the source key index already includes arrival_date
+    with engine.begin() as connection:
+        exists = connection.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {'table': BOOKINGS_TABLE}).scalar()
+        if exists:
+            if not is_partitioned(connection):
+                print(f"{BOOKINGS_TABLE} already exists as a plain table; drop it and reload to partition it")
+            return False
+        
+        # The label types and the referenced dimension tables have to exist first
+        create_label_types(engine)
+        referenced = [foreign_key.column.table for foreign_key in Booking.__table__.foreign_keys]
+        Booking.metadata.create_all(bind=connection, tables=referenced)
+        
+        ddl = str(CreateTable(_partitioned_bookings_table()).compile(dialect=connection.dialect)).strip()
+        connection.execute(text(f"{ddl} PARTITION BY RANGE (arrival_date)"))
+    
+    print(f"Created {BOOKINGS_TABLE} partitioned by arrival month")
+    return True
+
+def _create_partition(connection, month: datetime.date):
+
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {BOOKINGS_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    ))
+
+def ensure_partitions(engine, dates: Iterable) -> List[datetime.date]:
+
+    # Runs on its own committed connection, so concurrent loaders see the partition. Creating one takes
+    # ACCESS EXCLUSIVE on bookings, which waits on any open transaction that has written to it, the
+    # caller's own included: loaders create every month of their source (source_arrival_months) before
+    # their first write
+    global _known_months, _partitioned
+    
+    if engine.dialect.name != 'postgresql':
+        return []
+    
+    if _known_months is None:
+        with engine.connect() as connection:
+            _partitioned = is_partitioned(connection)
+            _known_months = {month for _, month in list_partitions(connection)} if _partitioned else set()
+    if not _partitioned:
+        return []
+    
+    months = {month_start(value) for value in pd.Series(dates).dropna().unique()}
+    missing = sorted(months - _known_months)
+    
+    for month in missing:
+        # Serializes with other loaders creating the same month, so IF NOT EXISTS never races
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {'name': partition_name(month)})
+            _create_partition(connection, month)
+        _known_months.add(month)
+        print(f"Created partition {partition_name(month)}")
+    
+    return missing
+
+def detach_partitions(engine, before: datetime.date, archive_schema: Optional[str] = None,
+                      drop: bool = False) -> List[str]:
+
+    # Archiving a month is a metadata change instead of a DELETE over its rows. The daily revenue
+    # rows for those months go with it, as no row trigger sees a detached partition leave.
+    global _known_months
+    
+    detached = []
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            raise RuntimeError(f"{BOOKINGS_TABLE} is not partitioned; create it with scripts/init_db.py --partitioned")
+        
+        if archive_schema:
+            connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+        
+        for name, month in list_partitions(connection):
+            if next_month(month) > before:
+                continue
+            
+            connection.execute(text(f"ALTER TABLE {BOOKINGS_TABLE} DETACH PARTITION {name}"))
+            connection.execute(text(
+                "DELETE FROM daily_revenue WHERE arrival_date >= :start AND arrival_date < :end"
+            ), {'start': month, 'end': next_month(month)})
+            
+            if drop:
+                connection.execute(text(f"DROP TABLE {name}"))
+            elif archive_schema:
+                connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+            detached.append(name)
+    
+    _known_months = None
+    return detached
\ No newline at end of file
@@ -0,0 +1,206 @@
+import os
+import time
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional
+
+# Marginals and dependencies of the public hotel_bookings.csv (119k bookings, Jul 2015 - Aug 2017),
+# so generated files exercise the same cleaning, cardinalities and skew at any size
+FIRST_ARRIVAL = datetime.date(2015, 7, 1)
+LAST_ARRIVAL = datetime.date(2017, 8, 31)
+
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+]
+
+HOTELS = {'City Hotel': 0.665, 'Resort Hotel': 0.335}
+
+COUNTRIES = {
+    'PRT': 0.407, 'GBR': 0.102, 'FRA': 0.087, 'ESP': 0.072, 'DEU': 0.061, 'ITA': 0.032, 'IRL': 0.028,
+    'BEL': 0.020, 'BRA': 0.019, 'NLD': 0.018, 'USA': 0.018, 'CHE': 0.015, 'CN': 0.011, 'AUT': 0.011,
+    'SWE': 0.009, 'CHN': 0.008, 'POL': 0.008, 'ISR': 0.006, 'RUS': 0.005, 'NOR': 0.005, 'ROU': 0.004,
+    'FIN': 0.004, 'DNK': 0.003, 'AUS': 0.003, 'AGO': 0.003, 'LUX': 0.002, 'MAR': 0.002, 'TUR': 0.002,
+    'HUN': 0.002, 'ARG': 0.002, 'JPN': 0.002, 'CZE': 0.001, 'IND': 0.001, 'KOR': 0.001, 'GRC': 0.001,
+    'DZA': 0.001, 'SRB': 0.001, 'HRV': 0.001, 'MEX': 0.001, 'IRN': 0.001, 'EST': 0.001, 'LTU': 0.001,
+    'ZAF': 0.001, 'BGR': 0.001, 'NZL': 0.001, 'COL': 0.001, 'UKR': 0.001, 'MOZ': 0.001, 'CHL': 0.001,
+    'SVN': 0.001, 'THA': 0.001, 'SVK': 0.001, 'ISL': 0.001, 'LVA': 0.001, 'CYP': 0.001, 'TWN': 0.001
+}
+MISSING_COUNTRY_RATE = 0.004
+
+MEALS = {'BB': 0.773, 'HB': 0.121, 'SC': 0.089, 'Undefined': 0.010, 'FB': 0.007}
+
+MARKET_SEGMENTS = {
+    'Online TA': 0.473, 'Offline TA/TO': 0.203, 'Groups': 0.166, 'Direct': 0.106,
+    'Corporate': 0.044, 'Complementary': 0.006, 'Aviation': 0.002
+}
+
+# Usual channel per segment; a tenth of bookings come through any channel instead
+SEGMENT_CHANNELS = {
+    'Online TA': 'TA/TO', 'Offline TA/TO': 'TA/TO', 'Groups': 'TA/TO', 'Direct': 'Direct',
+    'Corporate': 'Corporate', 'Complementary': 'Direct', 'Aviation': 'Corporate'
+}
+CHANNELS = {'TA/TO': 0.820, 'Direct': 0.123, 'Corporate': 0.056, 'GDS': 0.001}
+
+ROOM_TYPES = {
+    'A': 0.720, 'D': 0.161, 'E': 0.055, 'F': 0.024, 'G': 0.018, 'B': 0.009,
+    'C': 0.008, 'H': 0.005, 'L': 0.0003, 'P': 0.0001
+}
+# Upgrades move to the next room type in this order
+ROOM_UPGRADES = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'P']
+ROOM_MATCH_RATE = 0.875
+
+DEPOSIT_TYPES = {'No Deposit': 0.876, 'Non Refund': 0.122, 'Refundable': 0.002}
+CUSTOMER_TYPES = {'Transient': 0.750, 'Transient-Party': 0.210, 'Contract': 0.034, 'Group': 0.006}
+AGENTS = {9: 0.37, 240: 0.16, 1: 0.08, 14: 0.04, 7: 0.04, 6: 0.04, 250: 0.03, 241: 0.02, 28: 0.02, 8: 0.02}
+MISSING_AGENT_RATE = 0.137
+COMPANY_RATE = 0.057
+
+CANCELLATION_RATE = {'City Hotel': 0.417, 'Resort Hotel': 0.278}
+BASE_ADR = {'City Hotel': 105.0, 'Resort Hotel': 95.0}
+# Seasonal rate multiplier by month; the resort swings much more than the city hotel
+SEASON_AMPLITUDE = {'City Hotel': 0.15, 'Resort Hotel': 0.55}
+
+def _choice(rng: np.random.Generator, weights: Dict, size: int) -> np.ndarray:
+
+    values = list(weights)
+    probabilities = np.array([weights[value] for value in values], dtype=float)
+    return np.array(values, dtype=object)[rng.choice(len(values), size=size, p=probabilities / probabilities.sum())]
+
+def _arrival_days(rng: np.random.Generator, size: int) -> np.ndarray:
+
+    days = pd.date_range(FIRST_ARRIVAL, LAST_ARRIVAL, freq='D')
+    # Demand peaks in August and bottoms out in January
+    weights = 1 + 0.35 * np.cos(2 * np.pi * (days.month.to_numpy() - 8) / 12)
+    return days.to_numpy()[rng.choice(len(days), size=size, p=weights / weights.sum())]
+
+def generate_bookings(rows: int, seed: int = 0) -> pd.DataFrame:
+
+    rng = np.random.default_rng(seed)
+    
+    hotel = _choice(rng, HOTELS, rows)
+    is_resort = hotel == 'Resort Hotel'
+    arrival = pd.DatetimeIndex(_arrival_days(rng, rows))
+    
+    # Most bookings are made weeks or months ahead, with a long tail of last-minute ones
+    lead_time = np.where(
+        rng.random(rows) < 0.2,
+        rng.exponential(8, rows),
+        rng.gamma(1.3, 95, rows)
+    ).round().clip(0, 737).astype(int)
+    
+    deposit_type = _choice(rng, DEPOSIT_TYPES, rows)
+    non_refund = deposit_type == 'Non Refund'
+    
+    base_cancel = np.where(is_resort, CANCELLATION_RATE['Resort Hotel'], CANCELLATION_RATE['City Hotel'])
+    cancel_probability = np.clip(base_cancel * (0.45 + 1.1 * lead_time / (lead_time + 90)), 0, 0.95)
+    # Non-refundable deposits are almost always canceled in the public data
+    cancel_probability = np.where(non_refund, 0.99, cancel_probability * 0.87)
+    is_canceled = (rng.random(rows) < cancel_probability).astype(int)
+    
+    weekend_nights = rng.poisson(np.where(is_resort, 1.19, 0.80))
+    week_nights = rng.poisson(np.where(is_resort, 3.13, 2.18))
+    
+    adults = rng.choice([0, 1, 2, 3, 4], size=rows, p=[0.003, 0.193, 0.751, 0.052, 0.001])
+    children = rng.choice([0, 1, 2, 3], size=rows, p=[0.928, 0.041, 0.030, 0.001]).astype(float)
+    children[rng.random(rows) < 0.00003] = np.nan
+    babies = rng.choice([0, 1, 2], size=rows, p=[0.9923, 0.0075, 0.0002])
+    
+    country = _choice(rng, COUNTRIES, rows)
+    country[rng.random(rows) < MISSING_COUNTRY_RATE] = None
+    
+    market_segment = _choice(rng, MARKET_SEGMENTS, rows)
+    channel = np.array([SEGMENT_CHANNELS[segment] for segment in market_segment], dtype=object)
+    reroute = rng.random(rows) < 0.1
+    channel[reroute] = _choice(rng, CHANNELS, int(reroute.sum()))
+    
+    is_repeated_guest = (rng.random(rows) < np.where(np.isin(market_segment, ['Corporate', 'Direct']), 0.12, 0.02)).astype(int)
+    previous_cancellations = rng.choice([0, 1, 2, 3], size=rows, p=[0.946, 0.050, 0.002, 0.002])
+    previous_not_canceled = np.where(is_repeated_guest == 1, rng.poisson(3, rows), (rng.random(rows) < 0.01).astype(int))
+    
+    reserved = _choice(rng, ROOM_TYPES, rows)
+    upgrade_index = np.array([min(ROOM_UPGRADES.index(room) + 1, len(ROOM_UPGRADES) - 1) for room in reserved])
+    assigned = np.where(rng.random(rows) < ROOM_MATCH_RATE, reserved, np.array(ROOM_UPGRADES, dtype=object)[upgrade_index])
+    
+    agent = _choice(rng, AGENTS, rows).astype(float)
+    agent[rng.random(rows) < MISSING_AGENT_RATE] = np.nan
+    company = np.where(rng.random(rows) < COMPANY_RATE, rng.integers(1, 540, rows), np.nan)
+    
+    season = np.cos(2 * np.pi * (arrival.month.to_numpy() - 8) / 12)
+    amplitude = np.where(is_resort, SEASON_AMPLITUDE['Resort Hotel'], SEASON_AMPLITUDE['City Hotel'])
+    base_adr = np.where(is_resort, BASE_ADR['Resort Hotel'], BASE_ADR['City Hotel'])
+    adr = base_adr * (1 + amplitude * season) * (1 + 0.12 * (adults - 2) + 0.15 * children.clip(0, 3)) * rng.lognormal(-0.045, 0.3, rows)
+    # Complimentary and zero-rate stays, which clean_data drops
+    adr = np.where(rng.random(rows) < 0.017, 0.0, adr.round(2))
+    
+    total_nights = weekend_nights + week_nights
+    reservation_status = np.where(
+        is_canceled == 1,
+        np.where(rng.random(rows) < 0.04, 'No-Show', 'Canceled'),
+        'Check-Out'
+    )
+    status_offset = np.where(
+        reservation_status == 'Check-Out',
+        total_nights,
+        np.where(reservation_status == 'No-Show', 0, -np.floor(rng.random(rows) * (lead_time + 1)))
+    )
+    status_date = arrival + pd.to_timedelta(status_offset, unit='D')
+    
+    return pd.DataFrame({
+        'hotel': hotel,
+        'is_canceled': is_canceled,
+        'lead_time': lead_time,
+        'arrival_date_year': arrival.year,
+        'arrival_date_month': np.array(MONTH_NAMES, dtype=object)[arrival.month - 1],
+        'arrival_date_week_number': arrival.isocalendar().week.to_numpy(),
+        'arrival_date_day_of_month': arrival.day,
+        'stays_in_weekend_nights': weekend_nights,
+        'stays_in_week_nights': week_nights,
+        'adults': adults,
+        'children': children,
+        'babies': babies,
+        'meal': _choice(rng, MEALS, rows),
+        'country': country,
+        'market_segment': market_segment,
+        'distribution_channel': channel,
+        'is_repeated_guest': is_repeated_guest,
+        'previous_cancellations': previous_cancellations,
+        'previous_bookings_not_canceled': previous_not_canceled,
+        'reserved_room_type': reserved,
+        'assigned_room_type': assigned,
+        'booking_changes': rng.choice([0, 1, 2, 3], size=rows, p=[0.849, 0.106, 0.032, 0.013]),
+        'deposit_type': deposit_type,
+        'agent': agent,
+        'company': company,
+        'days_in_waiting_list': np.where(rng.random(rows) < 0.031, rng.integers(1, 200, rows), 0),
+        'customer_type': _choice(rng, CUSTOMER_TYPES, rows),
+        'adr': adr,
+        'required_car_parking_spaces': (rng.random(rows) < np.where(is_resort, 0.14, 0.02)).astype(int),
+        'total_of_special_requests': rng.choice([0, 1, 2, 3, 4, 5], size=rows, p=[0.589, 0.278, 0.109, 0.021, 0.0027, 0.0003]),
+        'reservation_status': reservation_status,
+        'reservation_status_date': status_date.strftime('%Y-%m-%d')
+    })
+
+def generate_booking_chunks(rows: int, seed: int = 0, chunk_rows: int = 1000000) -> Iterator[pd.DataFrame]:
+
+    # Each chunk has its own derived seed, so a file of any size is reproducible chunk by chunk
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        yield generate_bookings(min(chunk_rows, rows - start), seed=seed * 100003 + index)
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 0, chunk_rows: int = 1000000) -> str:
+
+    start_time = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    
+    written = 0
+    for chunk in generate_booking_chunks(rows, seed, chunk_rows):
+        chunk.to_csv(tmp_path, mode='a' if written else 'w', header=not written, index=False)
+        written += len(chunk)
+        print(f"Generated {written}/{rows} bookings")
+    os.replace(tmp_path, path)
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"Wrote {rows} synthetic bookings to {path} in {elapsed:.2f}s")
+    return path
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.data.db_manager import DataVersion
+
+DATA_VERSION_ID = 1
+
+def get_data_version(session: Session) -> int:
+
+    version = session.query(DataVersion.version).filter(DataVersion.id == DATA_VERSION_ID).scalar()
+    return version or 0
+
+def bump_data_version(session: Session) -> int:
+
+    # Atomic increment, so concurrent ingest paths never hand out the same generation
+    statement = insert(DataVersion).values(
+        id=DATA_VERSION_ID,
+        version=1,
+        updated_at=func.now()
+    ).on_conflict_do_update(
+        index_elements=[DataVersion.id],
+        set_={'version': DataVersion.version + 1, 'updated_at': func.now()}
+    ).returning(DataVersion.version)
+    
+    version = session.execute(statement).scalar()
+    session.commit()
+    
+    print(f"Data version bumped to {version}")
+    return version
\ No newline at end of file
@@ -0,0 +1,308 @@
+import os
+import json
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+# One fixed-width record per document, in position order. Hotel and country names are stored as
+# codes into the vocabularies kept beside the records; the base records' texts live in a separate blob.
+RECORD_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('hotel_name', '<i2'),
+    ('hotel_type', '<i2'),
+    ('country', '<i2'),
+    ('arrival_date', '<M8[D]'),
+    ('departure_date', '<M8[D]'),
+    ('lead_time', '<i4'),
+    ('total_nights', '<i4'),
+    ('adr', '<f8'),
+    ('is_canceled', '?'),
+    ('text_offset', '<i8'),
+    ('text_length', '<i4')
+])
+
+VOCABULARY_FIELDS = ['hotel_name', 'hotel_type', 'country']
+STORE_FORMAT_VERSION = 1
+
+def document_store_paths(prefix: str) -> List[str]:
+
+    return [f"{prefix}_docs.npy", f"{prefix}_texts.bin", f"{prefix}_docs.json"]
+
+def _date_or_none(value) -> Any:
+
+    return None if np.isnat(value) else str(value)
+
+class DocumentStore:
+    def __init__(self, prefix: str):
+
+        self.records_path, self.texts_path, self.vocabulary_path = document_store_paths(prefix)
+        self.paths = [self.records_path, self.texts_path, self.vocabulary_path]
+        
+        self.vocabularies = {field: [] for field in VOCABULARY_FIELDS}
+        self._records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._texts = np.zeros(0, dtype=np.uint8)
+        
+        self._finish_write_base()
+        if self.exists():
+            with open(self.vocabulary_path, 'r', encoding='utf-8') as f:
+                self.vocabularies = json.load(f)['vocabularies']
+            # Both files are mapped read-only; only the pages of the records and texts touched are read
+            self._records = np.load(self.records_path, mmap_mode='r')
+            if os.path.getsize(self.texts_path):
+                self._texts = np.memmap(self.texts_path, dtype=np.uint8, mode='r')
+        
+        self._codes = {field: {value: code for code, value in enumerate(values)} for field, values in self.vocabularies.items()}
+        # Rows after the base records: those replayed from saved segments, then additions not flushed yet.
+        # Their texts are kept in memory after the base blob's bytes, in the same offset space
+        self._appended = []
+        self._unsaved_from = len(self._records)
+        self._base_text_bytes = len(self._texts)
+        self._appended_texts = bytearray()
+        
+        # Removed and superseded rows stay in place until the next compaction; positions never move in memory
+        self.live = np.ones(len(self._records), dtype=bool)
+        self.version = 0
+        # Built on first use and kept up to date as rows are appended, never rebuilt per change: the base
+        # ids sorted for binary search, and the position of each appended booking's newest row
+        self._base_lookup = None
+        self._appended_positions = None
+    
+    def exists(self) -> bool:
+
+        return all(os.path.exists(path) for path in self.paths)
+    
+    def __len__(self) -> int:
+
+        return len(self._records) + sum(len(records) for records in self._appended)
+    
+    def _changed(self):
+
+        self.version += 1
+    
+    def _appended_rows(self, records: np.ndarray, start: int):
+
+        if self._appended_positions is not None:
+            self._appended_positions.update(zip(records['id'].tolist(), range(start, start + len(records))))
+    
+    def _code(self, field: str, value: str) -> int:
+
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(self.vocabularies[field])
+            self.vocabularies[field].append(value)
+        return codes[value]
+    
+    def code_of(self, field: str, value: str) -> Optional[int]:
+
+        return self._codes[field].get(value)
+    
+    def add(self, documents: List[Dict[str, Any]]):
+
+        if not documents:
+            return
+        
+        metadatas = [doc['metadata'] for doc in documents]
+        texts = [doc['text'].encode('utf-8') for doc in documents]
+        lengths = np.array([len(text) for text in texts], dtype='int64')
+        
+        records = np.zeros(len(documents), dtype=RECORD_DTYPE)
+        for field in ['id', 'arrival_date', 'departure_date', 'adr', 'is_canceled']:
+            # Missing dates become NaT
+            records[field] = [metadata.get(field) for metadata in metadatas]
+        for field in VOCABULARY_FIELDS:
+            records[field] = [self._code(field, metadata[field]) for metadata in metadatas]
+        for field in ['lead_time', 'total_nights']:
+            values = pd.Series([metadata.get(field) for metadata in metadatas], dtype='float64')
+            records[field] = values.fillna(-1).to_numpy()
+        
+        start = self._base_text_bytes + len(self._appended_texts)
+        records['text_offset'] = start + np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        records['text_length'] = lengths
+        
+        self._appended_texts += b''.join(texts)
+        start = len(self)
+        self._appended.append(records)
+        self.live = np.concatenate([self.live, np.ones(len(records), dtype=bool)])
+        self._appended_rows(records, start)
+        self._changed()
+    
+    def extend(self, records: np.ndarray, texts: bytes):
+
+        # Rows replayed from a saved segment, with their texts
+        records = np.array(records, dtype=RECORD_DTYPE)
+        records['text_offset'] += self._base_text_bytes + len(self._appended_texts)
+        self._appended_texts += texts
+        start = len(self)
+        self._appended.append(records)
+        self._unsaved_from = len(self)
+        self.live = np.concatenate([self.live, np.ones(len(records), dtype=bool)])
+        self._appended_rows(records, start)
+        self._changed()
+    
+    def remove(self, positions: np.ndarray):
+
+        self.live[positions] = False
+        self._changed()
+    
+    def _tail(self) -> np.ndarray:
+
+        if len(self._appended) > 1:
+            self._appended[:] = [np.concatenate(self._appended)]
+        return self._appended[0] if self._appended else np.zeros(0, dtype=RECORD_DTYPE)
+    
+    def records(self) -> np.ndarray:
+
+        # Base records stay memory-mapped; rows appended since are concatenated in memory
+        if not self._appended:
+            return self._records
+        return np.concatenate([self._records, self._tail()])
+    
+    def live_records(self) -> np.ndarray:
+
+        records = self.records()
+        return records if self.live.all() else records[self.live]
+    
+    def ids_at(self, positions: np.ndarray) -> np.ndarray:
+
+        positions = np.asarray(positions, dtype='int64')
+        ids = np.empty(len(positions), dtype='int64')
+        in_base = positions < len(self._records)
+        ids[in_base] = self._records['id'][positions[in_base]]
+        if not in_base.all():
+            ids[~in_base] = self._tail()['id'][positions[~in_base] - len(self._records)]
+        return ids
+    
+    def positions_of(self, booking_ids: np.ndarray) -> np.ndarray:
+
+        # Position of each booking's live row, or -1 when it has none. A booking has at most one live row:
+        # adding it again retires the previous one, so a newer appended row wins over the base
+        booking_ids = np.asarray(booking_ids, dtype='int64')
+        positions = np.full(len(booking_ids), -1, dtype='int64')
+        
+        if len(self._records):
+            if self._base_lookup is None:
+                order = np.argsort(self._records['id'], kind='stable')
+                self._base_lookup = (np.asarray(self._records['id'])[order], order)
+            sorted_ids, order = self._base_lookup
+            found = np.minimum(np.searchsorted(sorted_ids, booking_ids), len(sorted_ids) - 1)
+            matched = sorted_ids[found] == booking_ids
+            positions[matched] = order[found[matched]]
+        
+        if len(self._records) < len(self):
+            if self._appended_positions is None:
+                tail = self._tail()
+                self._appended_positions = dict(zip(tail['id'].tolist(), range(len(self._records), len(self._records) + len(tail))))
+            appended = np.fromiter((self._appended_positions.get(booking_id, -1) for booking_id in booking_ids.tolist()),
+                                   dtype='int64', count=len(booking_ids))
+            positions = np.where(appended >= 0, appended, positions)
+        
+        found = positions >= 0
+        found[found] = self.live[positions[found]]
+        positions[~found] = -1
+        return positions
+    
+    def _record(self, position: int):
+
+        if position < len(self._records):
+            return self._records[position]
+        return self._tail()[position - len(self._records)]
+    
+    def _text_bytes(self, offset: int, length: int) -> bytes:
+
+        if offset < self._base_text_bytes:
+            return self._texts[offset:offset + length].tobytes()
+        start = offset - self._base_text_bytes
+        return bytes(self._appended_texts[start:start + length])
+    
+    def _text(self, offset: int, length: int) -> str:
+
+        return self._text_bytes(offset, length).decode('utf-8')
+    
+    def packed(self, records: np.ndarray) -> Tuple[np.ndarray, bytes]:
+
+        # The given rows' texts back to back, with the rows' offsets rebased onto them
+        texts = b''.join(self._text_bytes(int(offset), int(length))
+                         for offset, length in zip(records['text_offset'], records['text_length']))
+        records = np.array(records, dtype=RECORD_DTYPE)
+        lengths = records['text_length'].astype('int64')
+        records['text_offset'] = np.cumsum(lengths) - lengths
+        return records, texts
+    
+    def metadata(self, position: int) -> Dict[str, Any]:
+
+        record = self._record(position)
+        lead_time, total_nights = int(record['lead_time']), int(record['total_nights'])
+        adr = float(record['adr'])
+        return {
+            'id': int(record['id']),
+            'hotel_name': self.vocabularies['hotel_name'][record['hotel_name']],
+            'hotel_type': self.vocabularies['hotel_type'][record['hotel_type']],
+            'country': self.vocabularies['country'][record['country']],
+            'arrival_date': _date_or_none(record['arrival_date']),
+            'departure_date': _date_or_none(record['departure_date']),
+            'lead_time': None if lead_time < 0 else lead_time,
+            'total_nights': None if total_nights < 0 else total_nights,
+            'adr': adr,
+            'revenue': adr * total_nights if total_nights >= 0 else None,
+            'is_canceled': bool(record['is_canceled'])
+        }
+    
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+
+        # Materializes one document; nothing else is decoded
+        record = self._record(position)
+        metadata = self.metadata(position)
+        return {
+            'id': str(metadata['id']),
+            'text': self._text(int(record['text_offset']), int(record['text_length'])),
+            'metadata': metadata,
+            'faiss_id': metadata['id']
+        }
+    
+    def flush(self) -> Tuple[np.ndarray, np.ndarray]:
+
+        # Writes the vocabularies and returns the rows added since the last flush with their live flags,
+        # for the caller to persist (with their packed texts) in a segment or a new base
+        with open(f"{self.vocabulary_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({
+                'format_version': STORE_FORMAT_VERSION,
+                'saved_at': datetime.datetime.now().isoformat(),
+                'vocabularies': self.vocabularies
+            }, f)
+        os.replace(f"{self.vocabulary_path}.tmp", self.vocabulary_path)
+        
+        records = self._tail()[self._unsaved_from - len(self._records):]
+        live = self.live[self._unsaved_from:]
+        self._unsaved_from = len(self)
+        return records, live
+    
+    def _finish_write_base(self):
+
+        # A texts blob renamed to .next means both new base files were complete; a crash before the
+        # records and blob took their places is finished here, so the pair is never mixed
+        if not os.path.exists(f"{self.texts_path}.next"):
+            return
+        if os.path.exists(f"{self.records_path}.tmp"):
+            os.replace(f"{self.records_path}.tmp", self.records_path)
+        os.replace(f"{self.texts_path}.next", self.texts_path)
+    
+    def write_base(self, records: np.ndarray):
+
+        # Replaces the base record file and texts blob with the given rows and only their texts, dropping
+        # those of removed and superseded rows. The rows in memory keep their positions and offsets,
+        # still read from the previous blob's mapping
+        records, texts = self.packed(records)
+        with open(f"{self.records_path}.tmp", 'wb') as f:
+            np.save(f, records)
+        with open(f"{self.texts_path}.tmp", 'wb') as f:
+            f.write(texts)
+        os.replace(f"{self.texts_path}.tmp", f"{self.texts_path}.next")
+        self._finish_write_base()
+    
+    def save(self):
+
+        if self._unsaved_from == len(self) and self.exists():
+            return
+        self.flush()
+        self.write_base(self.live_records())
\ No newline at end of file
@@ -1,26 +1,79 @@
 from sentence_transformers import SentenceTransformer
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Iterator, Optional, Union
 from sqlalchemy.orm import Session
-from src.config import MODEL_PATH
+from src.config import MODEL_PATH, DOCUMENT_BATCH_ROWS, EMBEDDING_BATCH_SIZE
 from src.data.db_manager import Booking, Hotel, Country
+from src.rag.embedding_cache import embedding_cache
 
 class TextEmbedder:
-    def __init__(self, model_path: str = MODEL_PATH):
+    def __init__(self, model_path: str = MODEL_PATH, use_cache: bool = True):
 
         self.model = SentenceTransformer(model_path)
+        # Questions and booking texts already encoded with this model are served from the embedding cache
+        self.cache = embedding_cache(model_path) if use_cache else None
     
     def embed_text(self, text: str) -> np.ndarray:
 
-        return self.model.encode(text)
+        if self.cache is None:
+            return self.model.encode(text)
+        return self.cache.embed_text(text, self.model.encode)
     
-    def embed_batch(self, texts: List[str]) -> np.ndarray:
+    def embed_batch(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
 
-        return self.model.encode(texts)
+        if self.cache is None:
+            return self.model.encode(texts, batch_size=batch_size)
+        return self.cache.embed_batch(texts, lambda missing: self.model.encode(missing, batch_size=batch_size))
 
 
-def generate_booking_documents(session: Session) -> List[Dict[str, Any]]:
+def format_booking_texts(df: pd.DataFrame, revenue: pd.Series) -> List[str]:
+
+    # Column-wise string concatenation; same text layout the per-row f-string produced
+    status = np.where(df['is_canceled'].astype(bool), "Canceled", "Confirmed")
+    texts = (
+        "\n        Booking ID: " + df['id'].astype(str)
+        + "\n        Hotel: " + df['hotel_name'].astype(str)
+        + "\n        Hotel Type: " + df['hotel_type'].astype(str)
+        + "\n        Country: " + df['country_name'].astype(str)
+        + "\n        Arrival Date: " + df['arrival_date'].astype(str)
+        + "\n        Departure Date: " + df['departure_date'].astype(str)
+        + "\n        Lead Time: " + df['lead_time'].astype(str) + " days"
+        + "\n        Total Nights: " + df['total_nights'].astype(str)
+        + "\n        Average Daily Rate: $" + df['adr'].map('{:.2f}'.format)
+        + "\n        Total Revenue: $" + revenue.map('{:.2f}'.format)
+        + "\n        Status: " + status
+        + "\n        "
+    )
+    return texts.tolist()
+
+def documents_from_rows(rows: List[Any], columns: List[str]) -> List[Dict[str, Any]]:
+
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    revenue = df['adr'] * df['total_nights']
+    texts = format_booking_texts(df, revenue)
+    
+    metadatas = pd.DataFrame({
+        'id': df['id'],
+        'hotel_name': df['hotel_name'],
+        'hotel_type': df['hotel_type'],
+        'country': df['country_name'],
+        'arrival_date': [value.strftime('%Y-%m-%d') for value in df['arrival_date']],
+        'departure_date': [value.strftime('%Y-%m-%d') if value else None for value in df['departure_date']],
+        'lead_time': df['lead_time'],
+        'total_nights': df['total_nights'],
+        'adr': df['adr'].astype(float),
+        'revenue': revenue.astype(float),
+        'is_canceled': df['is_canceled'].astype(bool)
+    }).to_dict('records')
+    
+    return [
+        {'id': str(metadata['id']), 'text': text, 'metadata': metadata}
+        for text, metadata in zip(texts, metadatas)
+    ]
+
+def generate_booking_documents(session: Session, batch_size: int = DOCUMENT_BATCH_ROWS, after_id: Optional[int] = None,
+                               booking_ids: Optional[List[int]] = None) -> Iterator[List[Dict[str, Any]]]:
 
     query = session.query(
         Booking.id,
@@ -37,45 +90,21 @@ def generate_booking_documents(session: Session) -> List[Dict[str, Any]]:
         Hotel, Booking.hotel_id == Hotel.id
     ).join(
         Country, Booking.country_id == Country.id
+    ).order_by(
+        Booking.id
     )
+    # A resumed build continues after the last booking already in its checkpoint
+    if after_id is not None:
+        query = query.filter(Booking.id > after_id)
+    # An incremental update only re-reads the bookings that changed
+    if booking_ids is not None:
+        query = query.filter(Booking.id.in_(booking_ids))
     
-    df = pd.read_sql(query.statement, session.bind)
-    
-    documents = []
-    for _, row in df.iterrows():
-        revenue = row['adr'] * row['total_nights']
-        
-        text = f"""
-        Booking ID: {row['id']}
-        Hotel: {row['hotel_name']}
-        Hotel Type: {row['hotel_type']}
-        Country: {row['country_name']}
-        Arrival Date: {row['arrival_date']}
-        Departure Date: {row['departure_date']}
-        Lead Time: {row['lead_time']} days
-        Total Nights: {row['total_nights']}
-        Average Daily Rate: ${row['adr']:.2f}
-        Total Revenue: ${revenue:.2f}
-        Status: {"Canceled" if row['is_canceled'] else "Confirmed"}
-        """
-        
-        document = {
-            'id': str(row['id']),
-            'text': text,
-            'metadata': {
-                 'id': row['id'],
-                'hotel_name': row['hotel_name'],
-                'hotel_type': row['hotel_type'],
-                'country': row['country_name'],
-                'arrival_date': row['arrival_date'].strftime('%Y-%m-%d'),
-                'departure_date': row['departure_date'].strftime('%Y-%m-%d') if row['departure_date'] else None,
-                'lead_time': row['lead_time'],
-                'total_nights': row['total_nights'],
-                'adr': float(row['adr']),
-                'revenue': float(revenue),
-                'is_canceled': bool(row['is_canceled'])
-            }
-        }
-        documents.append(document)
+    # stream_results makes psycopg2 use a server-side (named) cursor, so only one batch of rows is held at a time
+    result = session.connection().execution_options(
+        stream_results=True, max_row_buffer=batch_size
+    ).execute(query.statement)
+    columns = list(result.keys())
     
-    return documents
\ No newline at end of file
+    for rows in result.partitions(batch_size):
+        yield documents_from_rows(rows, columns)
\ No newline at end of file
@@ -0,0 +1,310 @@
+import os
+import re
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.config import EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_BYTES
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CACHE_MAGIC = b'EMBC'
+CACHE_FORMAT_VERSION = 1
+# Magic, format version, dimension and the number of compactions the file has been through
+HEADER_BYTES = 16
+# Rows appended since the sorted key index was built are found through a dict until there are this many
+UNSORTED_ROWS_MAX = 65536
+
+def text_keys(model_path: str, texts: List[str]) -> np.ndarray:
+
+    # 128-bit digest of model and text, as two uint64 words per text
+    prefix = model_path.encode('utf-8') + b'\0'
+    digests = b''.join(hashlib.blake2b(prefix + text.encode('utf-8'), digest_size=16).digest() for text in texts)
+    return np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+
+def _record_dtype(dimension: int) -> np.dtype:
+
+    return np.dtype([('key', '<u8', (2,)), ('vector', '<f4', (dimension,))])
+
+class EmbeddingFile:
+    def __init__(self, path: str, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+
+        # Append-only file of (key, vector) records behind a small header holding the dimension.
+        # It is memory-mapped for reading, so only the vectors that are hit are read from disk.
+        self.path = path
+        self.max_bytes = max_bytes
+        self.dimension = None
+        self._generation = None
+        self._rows = None
+        self._count = 0
+        self._sorted_count = 0
+        self._sorted_keys = np.zeros(0, dtype='<u8')
+        self._order = np.zeros(0, dtype='int64')
+        self._unsorted = {}
+        self._tail_checked = False
+        self._lock = threading.Lock()
+    
+    def _read_header(self) -> bool:
+
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER_BYTES)
+        if len(header) < HEADER_BYTES:
+            return False
+        version, dimension = np.frombuffer(header[4:12], dtype='<u4')
+        if header[:4] != CACHE_MAGIC or version != CACHE_FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not an embedding cache file (format {CACHE_FORMAT_VERSION})")
+        self.dimension = int(dimension)
+        return True
+    
+    def _refresh(self):
+
+        # Picks up rows appended since the last lookup, by this process or any other sharing the file
+        if not os.path.exists(self.path):
+            return
+        if self.dimension is None and not self._read_header():
+            return
+        
+        record_dtype = _record_dtype(self.dimension)
+        with open(self.path, 'rb') as f:
+            generation = int(np.frombuffer(f.read(HEADER_BYTES)[12:16], dtype='<u4')[0])
+            if generation != self._generation:
+                # A compaction (in any process) replaced the file; its rows are indexed again from the start
+                self._generation = generation
+                self._rows = None
+                self._count = self._sorted_count = 0
+                self._sorted_keys = np.zeros(0, dtype='<u8')
+                self._order = np.zeros(0, dtype='int64')
+                self._unsorted.clear()
+            count = (os.fstat(f.fileno()).st_size - HEADER_BYTES) // record_dtype.itemsize
+            if count == self._count:
+                return
+            self._rows = np.memmap(f, dtype=record_dtype, mode='r', offset=HEADER_BYTES, shape=(count,))
+        
+        if count - self._sorted_count > UNSORTED_ROWS_MAX:
+            # Sorted on the first key word; the second is compared on lookup
+            first_words = np.asarray(self._rows['key'][:, 0])
+            self._order = np.argsort(first_words, kind='stable')
+            self._sorted_keys = first_words[self._order]
+            self._sorted_count = count
+            self._unsorted.clear()
+        else:
+            new_keys = np.asarray(self._rows['key'][self._count:count])
+            for row, key in enumerate(new_keys.tolist(), start=self._count):
+                self._unsorted[tuple(key)] = row
+        self._count = count
+    
+    def lookup(self, keys: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+
+        # Returns the row of each key (-1 when it is not cached) and the cached vectors of the found rows
+        with self._lock:
+            self._refresh()
+            rows = np.full(len(keys), -1, dtype='int64')
+            if not self._count:
+                return rows, None
+            
+            if self._sorted_count:
+                positions = np.minimum(np.searchsorted(self._sorted_keys, keys[:, 0]), self._sorted_count - 1)
+                candidates = self._order[positions]
+                found = self._sorted_keys[positions] == keys[:, 0]
+                found[found] = self._rows['key'][candidates[found], 1] == keys[found, 1]
+                rows[found] = candidates[found]
+            if self._unsorted:
+                for i in np.flatnonzero(rows < 0):
+                    rows[i] = self._unsorted.get((int(keys[i, 0]), int(keys[i, 1])), -1)
+            
+            hits = rows >= 0
+            return rows, np.asarray(self._rows['vector'][rows[hits]]) if hits.any() else None
+    
+    def append(self, keys: np.ndarray, vectors: np.ndarray):
+
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        with self._lock:
+            if self.dimension is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                try:
+                    with open(self.path, 'xb') as f:
+                        f.write(CACHE_MAGIC + np.array([CACHE_FORMAT_VERSION, vectors.shape[1], 0], dtype='<u4').tobytes())
+                except FileExistsError:
+                    pass
+                if not self._read_header():
+                    return
+            if vectors.shape[1] != self.dimension:
+                print(f"Not caching {vectors.shape[1]}-dimensional embeddings in {self.path} ({self.dimension} dimensions)")
+                return
+            
+            records = np.zeros(len(vectors), dtype=_record_dtype(self.dimension))
+            records['key'] = keys
+            records['vector'] = vectors
+            
+            # One O_APPEND write per batch, so processes appending at the same time never interleave records
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                # A crash mid-append can leave a partial record at the end, cut off here so rows stay aligned.
+                # The file lock keeps other processes' appends out meanwhile; without fcntl it is only done
+                # on this process's first append, before it could race its own writes
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                    # The file may have been compacted and replaced while this process waited for the lock
+                    while os.fstat(fd).st_ino != os.stat(self.path).st_ino:
+                        os.close(fd)
+                        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                if fcntl or not self._tail_checked:
+                    size = os.fstat(fd).st_size
+                    aligned = size - (size - HEADER_BYTES) % records.dtype.itemsize
+                    if aligned != size:
+                        os.ftruncate(fd, aligned)
+                    self._tail_checked = True
+                os.write(fd, records.tobytes())
+                if fcntl and self.max_bytes and os.fstat(fd).st_size > self.max_bytes:
+                    self._compact(records.dtype)
+            finally:
+                os.close(fd)
+    
+    def _compact(self, record_dtype: np.dtype):
+
+        # Called with the file lock held. Keeps the newest records up to half the cap, so compactions stay
+        # rare; the file is replaced, and every process re-indexes it on its next lookup
+        keep = max(1, (self.max_bytes // 2 - HEADER_BYTES) // record_dtype.itemsize)
+        with open(self.path, 'rb') as f:
+            header = bytearray(f.read(HEADER_BYTES))
+            count = (os.fstat(f.fileno()).st_size - HEADER_BYTES) // record_dtype.itemsize
+            f.seek(HEADER_BYTES + max(0, count - keep) * record_dtype.itemsize)
+            kept = f.read(min(count, keep) * record_dtype.itemsize)
+        
+        generation = int(np.frombuffer(bytes(header[12:16]), dtype='<u4')[0])
+        header[12:16] = np.array([(generation + 1) & 0xFFFFFFFF], dtype='<u4').tobytes()
+        
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(kept)
+        os.replace(tmp_path, self.path)
+        print(f"Compacted {self.path} to its newest {len(kept) // record_dtype.itemsize} embeddings")
+
+class EmbeddingCache:
+    def __init__(self, model_path: str, max_entries: int = EMBEDDING_CACHE_SIZE, cache_dir: str = EMBEDDING_CACHE_DIR):
+
+        self.model_path = model_path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = None
+        if cache_dir:
+            model_name = re.sub(r'[^A-Za-z0-9]+', '_', model_path).strip('_')
+            self.disk = EmbeddingFile(os.path.join(cache_dir, f"{model_name}.bin"))
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def _set_in_memory(self, key: bytes, vector: np.ndarray):
+
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def embed_text(self, text: str, encode: Callable[[str], np.ndarray]) -> np.ndarray:
+
+        keys = text_keys(self.model_path, [text])
+        key = keys.tobytes()
+        
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+        
+        rows, vectors = self.disk.lookup(keys) if self.disk else (None, None)
+        if vectors is not None:
+            vector = vectors[0]
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            vector = np.asarray(encode(text), dtype='float32')
+            with self._lock:
+                self.misses += 1
+            if self.disk:
+                self.disk.append(keys, vector.reshape(1, -1))
+        
+        if self.max_entries > 0:
+            self._set_in_memory(key, vector)
+        return vector
+    
+    def lookup(self, texts: List[str]) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+
+        # Batches only use the disk tier: a build's texts are seen once each and would just evict the questions
+        keys = text_keys(self.model_path, texts)
+        if not self.disk:
+            return keys, None, np.arange(len(texts))
+        
+        rows, cached = self.disk.lookup(keys)
+        missing = np.flatnonzero(rows < 0)
+        with self._lock:
+            self.disk_hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return keys, cached, missing
+    
+    def complete(self, keys: np.ndarray, cached: Optional[np.ndarray], missing: np.ndarray,
+                 encoded: Optional[np.ndarray]) -> np.ndarray:
+
+        # Stores the vectors encoded for the missing texts and merges them with the cached ones, in text order
+        if not len(keys):
+            dimension = self.disk.dimension if self.disk and self.disk.dimension else 0
+            return np.zeros((0, dimension), dtype='float32')
+        if len(missing):
+            encoded = np.asarray(encoded, dtype='float32')
+            if self.disk:
+                self.disk.append(keys[missing], encoded)
+            if cached is None:
+                return encoded
+        
+        vectors = np.empty((len(keys), cached.shape[1]), dtype='float32')
+        hits = np.ones(len(keys), dtype=bool)
+        hits[missing] = False
+        vectors[hits] = cached
+        if len(missing):
+            vectors[missing] = encoded
+        return vectors
+    
+    def embed_batch(self, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+
+        keys, cached, missing = self.lookup(texts)
+        encoded = encode([texts[i] for i in missing]) if len(missing) else None
+        return self.complete(keys, cached, missing, encoded)
+    
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'disk_tier': self.disk.path if self.disk else None,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def embedding_cache(model_path: str) -> Optional[EmbeddingCache]:
+
+    # One cache per model and process, shared by every embedder using that model
+    if EMBEDDING_CACHE_SIZE <= 0 and not EMBEDDING_CACHE_DIR:
+        return None
+    with _caches_lock:
+        if model_path not in _caches:
+            _caches[model_path] = EmbeddingCache(model_path)
+        return _caches[model_path]
\ No newline at end of file
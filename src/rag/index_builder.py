@@ -0,0 +1,270 @@
+import os
+import glob
+import json
+import time
+import datetime
+import multiprocessing
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from src.config import (EMBEDDINGS_DIR, CHANGES_DIR, MODEL_PATH, EMBEDDING_WORKERS, EMBEDDING_BATCH_SIZE,
+                        EMBEDDING_CHECKPOINT_BATCHES, FAISS_INDEX_TYPE, FAISS_TRAIN_SAMPLE, FAISS_SEGMENTS_MAX)
+from src.data.db_manager import SessionLocal, Booking
+from src.data.version import get_data_version
+from src.rag.embedder import TextEmbedder, generate_booking_documents
+from src.rag.vector_store import VectorStore, SegmentWriter, store_paths, segment_paths
+
+_worker_embedder = None
+
+def _init_worker(threads: int):
+
+    global _worker_embedder
+    
+    # Split the cores between workers instead of every process starting a full-size torch thread pool
+    import torch
+    torch.set_num_threads(threads)
+    # The parent process looks texts up in the embedding cache; workers only see the misses
+    _worker_embedder = TextEmbedder(use_cache=False)
+
+def _embed_texts(texts: List[str], batch_size: int) -> np.ndarray:
+
+    return _worker_embedder.embed_batch(texts, batch_size=batch_size)
+
+def checkpoint_path(collection_name: str) -> str:
+
+    return os.path.join(EMBEDDINGS_DIR, f"{collection_name}_build.json")
+
+def read_checkpoint(collection_name: str) -> Optional[Dict[str, Any]]:
+
+    path = checkpoint_path(collection_name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_checkpoint(collection_name: str, checkpoint: Dict[str, Any]):
+
+    path = checkpoint_path(collection_name)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump({**checkpoint, 'updated_at': datetime.datetime.now().isoformat()}, f)
+    os.replace(f"{path}.tmp", path)
+
+def _remove_build_files(vector_store_paths: List[str], collection_name: str):
+
+    for path in vector_store_paths + [checkpoint_path(collection_name)]:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _split_texts(texts: List[str], workers: int, batch_size: int) -> List[List[str]]:
+
+    # One slice per worker, rounded up to whole encoder batches
+    per_worker = -(-len(texts) // workers)
+    size = max(batch_size, -(-per_worker // batch_size) * batch_size)
+    return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+def build_index(collection_name: str = "hotel_bookings", workers: int = EMBEDDING_WORKERS,
+                batch_size: int = EMBEDDING_BATCH_SIZE, checkpoint_every: int = EMBEDDING_CHECKPOINT_BATCHES,
+                restart: bool = False, index_type: str = FAISS_INDEX_TYPE, train_sample: int = FAISS_TRAIN_SAMPLE) -> int:
+
+    # The build writes to a separate collection and only replaces the live index once complete,
+    # so /ask keeps serving the previous index while a rebuild runs or after one is interrupted
+    build_name = f"{collection_name}_build"
+    
+    checkpoint = None if restart else read_checkpoint(collection_name)
+    if checkpoint and (checkpoint.get('model'), checkpoint.get('index_type')) != (MODEL_PATH, index_type):
+        print(f"Checkpoint was built with {checkpoint.get('model')} ({checkpoint.get('index_type')}), "
+              f"starting over with {MODEL_PATH} ({index_type})")
+        checkpoint = None
+    if checkpoint is None:
+        _remove_build_files(store_paths(build_name), collection_name)
+    
+    session = SessionLocal()
+    expected_vectors = session.query(func.count(Booking.id)).scalar() or 0
+    # Bookings changed by later incremental loads are picked up by update_index
+    data_version = get_data_version(session)
+    
+    vector_store = VectorStore(collection_name=build_name, index_type=index_type, expected_vectors=expected_vectors)
+    if checkpoint and (vector_store.index.ntotal != checkpoint['documents'] or len(vector_store.documents) != checkpoint['documents']):
+        # Index and documents were not flushed together; the partial build cannot be trusted
+        print("Checkpoint does not match the saved partial index, starting over")
+        _remove_build_files(store_paths(build_name), collection_name)
+        checkpoint = None
+        vector_store = VectorStore(collection_name=build_name, index_type=index_type, expected_vectors=expected_vectors)
+    
+    checkpoint = checkpoint or {'model': MODEL_PATH, 'index_type': index_type, 'last_id': None, 'documents': 0, 'batches': 0,
+                                'data_version': data_version}
+    if checkpoint['documents']:
+        print(f"Resuming embedding build after booking {checkpoint['last_id']} "
+              f"({checkpoint['documents']} documents already embedded)")
+    
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(max(1, (os.cpu_count() or 1) // workers),)
+        )
+    
+    cache = vector_store.embedder.cache
+    
+    def encode(texts: List[str]):
+
+        if executor is None:
+            return vector_store.embedder.embed_batch(texts, batch_size=batch_size)
+        # Unchanged bookings are found in the embedding cache and never reach the workers
+        keys, cached, missing = cache.lookup(texts) if cache else (None, None, np.arange(len(texts)))
+        missing_texts = [texts[i] for i in missing]
+        futures = [executor.submit(_embed_texts, chunk, batch_size) for chunk in _split_texts(missing_texts, workers, batch_size)]
+        return keys, cached, missing, futures
+    
+    def flush():
+
+        vector_store.save()
+        write_checkpoint(collection_name, checkpoint)
+    
+    def embedded(encoded) -> np.ndarray:
+
+        if executor is None:
+            return encoded
+        keys, cached, missing, futures = encoded
+        embeddings = np.vstack([future.result() for future in futures]) if futures else None
+        return cache.complete(keys, cached, missing, embeddings) if cache else embeddings
+    
+    def train():
+
+        # IVF indexes learn their centroids from a sample strided over all bookings (training_sample_mask);
+        # the sampled texts are found in the embedding cache again when the build reaches them
+        row = func.row_number().over(order_by=Booking.id) - 1
+        numbered = session.query(Booking.id.label('id'), row.label('row')).subquery()
+        sample_ids = [booking_id for booking_id, in session.query(numbered.c.id).filter(
+            (numbered.c.row * train_sample) % expected_vectors < train_sample
+        )]
+        
+        vectors = [embedded(encode([doc['text'] for doc in documents]))
+                   for documents in generate_booking_documents(session, booking_ids=sample_ids)]
+        print(f"Training FAISS index on {len(sample_ids)} of {expected_vectors} vectors")
+        vector_store.index.train(np.vstack(vectors).astype('float32'))
+    
+    start_time = time.time()
+    added = 0
+    unsaved = 0
+    pending = deque()
+    
+    def add(documents: List[Dict[str, Any]], embeddings: np.ndarray):
+
+        nonlocal added, unsaved
+        # Bookings come in id order after the checkpoint's last id, so none of them is indexed yet
+        vector_store.add_embeddings(documents, embeddings, save=False, replace=False)
+        
+        added += len(documents)
+        checkpoint['documents'] += len(documents)
+        checkpoint['batches'] += 1
+        checkpoint['last_id'] = documents[-1]['metadata']['id']
+        
+        rate = added / max(time.time() - start_time, 1e-9)
+        print(f"Embedded {checkpoint['documents']} documents ({rate:,.0f} docs/s)")
+        
+        unsaved += 1
+        if unsaved >= checkpoint_every:
+            flush()
+            unsaved = 0
+    
+    def add_oldest():
+
+        documents, encoded = pending.popleft()
+        add(documents, embedded(encoded))
+    
+    try:
+        if not vector_store.index.is_trained and expected_vectors:
+            train()
+        
+        # The next batch is fetched and queued while the workers are still encoding the previous one
+        for documents in generate_booking_documents(session, after_id=checkpoint['last_id']):
+            pending.append((documents, encode([doc['text'] for doc in documents])))
+            if len(pending) > 1:
+                add_oldest()
+        while pending:
+            add_oldest()
+    finally:
+        session.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    
+    flush()
+    # The finished build is compacted into a single base, which then replaces the live one, manifest last;
+    # segments appended to the previous index belong to its generation and are dropped
+    vector_store.compact()
+    vector_store.set_data_version(checkpoint.get('data_version', data_version))
+    for build_path, live_path in zip(store_paths(build_name, segments=False), store_paths(collection_name, segments=False)):
+        os.replace(build_path, live_path)
+    for path in segment_paths(collection_name):
+        os.remove(path)
+    os.remove(checkpoint_path(collection_name))
+    
+    elapsed = time.time() - start_time
+    print(f"Embedded {added} new documents in {elapsed:.1f}s with {max(1, workers)} worker(s); "
+          f"index now holds {checkpoint['documents']} documents")
+    if cache:
+        stats = cache.stats()
+        print(f"Embedding cache: {stats['disk_hits']} texts reused, {stats['misses']} encoded")
+    return checkpoint['documents']
+
+def changed_booking_ids(after_version: int) -> Tuple[List[int], List[int]]:
+
+    # Booking ids written by the incremental loads (src/data/ingest.py) newer than after_version,
+    # and the data versions they cover
+    booking_ids = set()
+    versions = []
+    for path in glob.glob(os.path.join(CHANGES_DIR, "bookings-v*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            changes = json.load(f)
+        if changes['data_version'] > after_version:
+            booking_ids.update(changes['inserted'])
+            booking_ids.update(changes['updated'])
+            versions.append(changes['data_version'])
+    return sorted(booking_ids), sorted(versions)
+
+def update_index(collection_name: str = "hotel_bookings", batch_size: int = EMBEDDING_BATCH_SIZE) -> int:
+
+    # Re-embeds only the bookings inserted or changed since the index's data version and appends them
+    # as a segment, so the cost follows the size of the change rather than of the index
+    try:
+        writer = SegmentWriter(collection_name)
+    except ValueError:
+        raise ValueError(f"No {collection_name} index to update; build it with scripts/build_embeddings.py first")
+    
+    applied = writer.manifest.get('data_version') or 0
+    booking_ids, versions = changed_booking_ids(applied)
+    
+    session = SessionLocal()
+    try:
+        latest = get_data_version(session)
+        # Full loads and partition archiving bump the data version without writing changed ids, so
+        # any version without a changes file means the index can only be brought up to date by a rebuild
+        untracked = sorted(set(range(applied + 1, latest + 1)) - set(versions))
+        if untracked:
+            raise ValueError(f"Data version(s) {', '.join(map(str, untracked))} were not incremental loads; "
+                             f"rebuild the {collection_name} index with scripts/build_embeddings.py")
+        if not booking_ids:
+            print(f"Index is up to date with data version {applied}")
+            return 0
+        
+        start_time = time.time()
+        updated = 0
+        embedder = TextEmbedder()
+        for documents in generate_booking_documents(session, booking_ids=booking_ids):
+            writer.add_embeddings(documents, embedder.embed_batch([doc['text'] for doc in documents], batch_size=batch_size))
+            updated += len(documents)
+    finally:
+        session.close()
+    
+    segments = writer.save(latest)
+    print(f"Updated {updated} documents through data version {latest} in {time.time() - start_time:.1f}s")
+    
+    # Only compaction loads the whole index, once every FAISS_SEGMENTS_MAX updates
+    if segments > FAISS_SEGMENTS_MAX:
+        VectorStore(collection_name=collection_name).compact()
+    return updated
\ No newline at end of file
@@ -0,0 +1,124 @@
+import math
+import faiss
+from typing import Optional, Tuple
+import numpy as np
+from src.config import (FAISS_INDEX_TYPE, FAISS_TRAIN_SAMPLE, FAISS_NLIST, FAISS_PQ_M, FAISS_HNSW_M, FAISS_NPROBE,
+                        FAISS_EF_SEARCH, FAISS_PREFILTER_EXACT_MAX)
+
+INDEX_TYPES = ['flat', 'ivf_flat', 'ivf_pq', 'hnsw']
+
+def default_nlist(expected_vectors: int, train_sample: int = FAISS_TRAIN_SAMPLE) -> int:
+
+    # ~4*sqrt(n) inverted lists, but never so many that training leaves under 39 points per centroid
+    training_vectors = min(expected_vectors, train_sample)
+    return max(1, min(int(4 * math.sqrt(max(expected_vectors, 1))), training_vectors // 39))
+
+def training_sample_mask(total: int, train_sample: int = FAISS_TRAIN_SAMPLE) -> np.ndarray:
+
+    # Exactly min(total, train_sample) vectors evenly strided over the booking-id order, so the sample spans
+    # every hotel and season instead of the oldest bookings. index_builder selects the same rows in SQL
+    rows = np.arange(total, dtype='int64')
+    return (rows * train_sample) % max(total, 1) < train_sample
+
+def create_index(dimension: int, index_type: str = FAISS_INDEX_TYPE, expected_vectors: int = 0,
+                 nlist: int = FAISS_NLIST, pq_m: int = FAISS_PQ_M, hnsw_m: int = FAISS_HNSW_M,
+                 train_sample: int = FAISS_TRAIN_SAMPLE):
+
+    # Vectors are keyed by booking id: flat and HNSW indexes through an IndexIDMap2, IVF indexes natively
+    if index_type == 'flat':
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+    if index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m)
+        index.hnsw.efSearch = FAISS_EF_SEARCH
+        return faiss.IndexIDMap2(index)
+    
+    nlist = nlist or default_nlist(expected_vectors, train_sample)
+    quantizer = faiss.IndexFlatL2(dimension)
+    if index_type == 'ivf_flat':
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+    elif index_type == 'ivf_pq':
+        if dimension % pq_m:
+            raise ValueError(f"FAISS_PQ_M={pq_m} must divide the embedding dimension {dimension}")
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, 8)
+    else:
+        raise ValueError(f"Unknown FAISS index type {index_type!r}. Supported types: {', '.join(INDEX_TYPES)}")
+    
+    index.nprobe = FAISS_NPROBE
+    enable_reconstruct(index)
+    return index
+
+def enable_reconstruct(index):
+
+    # IVF indexes need a direct map (booking id -> list entry) before filtered searches can read a subset's
+    # vectors, or updates can remove a booking's old vector
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.type != faiss.DirectMap.Hashtable:
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+def base_index(index):
+
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+def index_type_of(index) -> str:
+
+    index = base_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    if isinstance(index, faiss.IndexIVFPQ):
+        return 'ivf_pq'
+    if isinstance(index, faiss.IndexIVF):
+        return 'ivf_flat'
+    return 'flat'
+
+def set_search_params(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+
+    # Flat indexes have no knobs; IVF scans nprobe lists, HNSW keeps efSearch candidates
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = nprobe
+    
+    hnsw = base_index(index)
+    if isinstance(hnsw, faiss.IndexHNSW) and ef_search:
+        hnsw.hnsw.efSearch = ef_search
+
+def index_memory_bytes(index) -> int:
+
+    return int(faiss.serialize_index(index).nbytes)
+
+def search_subset(index, queries: np.ndarray, k: int, ids: Optional[np.ndarray] = None,
+                  exact_max: int = FAISS_PREFILTER_EXACT_MAX) -> Tuple[np.ndarray, np.ndarray]:
+
+    if ids is None:
+        return index.search(queries, k)
+    
+    distances = np.full((len(queries), k), np.inf, dtype='float32')
+    labels = np.full((len(queries), k), -1, dtype='int64')
+    if len(ids) == 0:
+        return distances, labels
+    
+    # A small subset is scanned exactly: approximate indexes lose recall when most of the vectors they
+    # visit are filtered out, and reading a few thousand vectors is cheaper than a full search
+    if len(ids) <= exact_max:
+        try:
+            vectors = index.reconstruct_batch(ids)
+        except RuntimeError:
+            vectors = None
+        if vectors is not None:
+            found = min(k, len(ids))
+            distances[:, :found], positions = faiss.knn(queries, vectors, found)
+            labels[:, :found] = ids[positions]
+            return distances, labels
+    
+    selector = faiss.IDSelectorBatch(ids)
+    ivf = faiss.try_extract_index_ivf(index)
+    hnsw = base_index(index)
+    if ivf is not None:
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    elif isinstance(hnsw, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=hnsw.hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    return index.search(queries, k, params=params)
\ No newline at end of file
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+from src.rag.document_store import DocumentStore, VOCABULARY_FIELDS
+
+CATEGORY_FIELDS = ['hotel_name', 'hotel_type', 'country', 'is_canceled']
+RANGE_FIELDS = ['arrival_date', 'adr', 'lead_time']
+RANGE_DTYPES = {
+    'arrival_date': 'datetime64[D]',
+    'adr': 'float64',
+    'lead_time': 'float64'
+}
+BOOLEAN_STRINGS = {'1': True, 'true': True, 'yes': True, '0': False, 'false': False, 'no': False}
+
+def _as_bool(field: str, value: Any) -> bool:
+
+    # Filters often arrive as query-string text, where bool('false') would be True
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in BOOLEAN_STRINGS:
+        return BOOLEAN_STRINGS[value.strip().lower()]
+    raise ValueError(f"Filter '{field}' must be true or false, got {value!r}")
+
+class MetadataIndex:
+    def __init__(self, documents: DocumentStore):
+
+        # Built lazily from the store's fixed-width records on the first filtered query, and again
+        # whenever documents were added or removed since
+        self.documents = documents
+        self.version = -1
+        self._postings = {}
+        self._sorted = {}
+    
+    def _refresh(self):
+
+        if self.documents.version != self.version:
+            self.version = self.documents.version
+            self._postings.clear()
+            self._sorted.clear()
+    
+    def _category_positions(self, field: str, value: Any) -> np.ndarray:
+
+        # Inverted list per value: the positions of every document holding it, in ascending order.
+        # Names are looked up as their vocabulary codes, which is what the records hold.
+        if field not in self._postings:
+            column = self.documents.records()[field]
+            self._postings[field] = pd.Series(column).groupby(column, sort=False).indices
+        
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        if field in VOCABULARY_FIELDS:
+            values = [self.documents.code_of(field, value) for value in values]
+        else:
+            values = [_as_bool(field, value) for value in values]
+        
+        postings = [self._postings[field][value] for value in values if value in self._postings[field]]
+        if not postings:
+            return np.array([], dtype='int64')
+        return np.sort(np.concatenate(postings)).astype('int64')
+    
+    def _range_positions(self, field: str, value: Any) -> np.ndarray:
+
+        # Positions sorted by value, so any [min, max] range is one contiguous slice found by binary search.
+        # Missing values (NaT, NaN or a negative lead time) sort last and never match.
+        if field not in self._sorted:
+            column = np.asarray(self.documents.records()[field])
+            if column.dtype.kind == 'i':
+                column = np.where(column < 0, np.nan, column)
+            order = np.argsort(column, kind='stable')
+            missing = np.isnat(column) if column.dtype.kind == 'M' else np.isnan(column)
+            self._sorted[field] = (column[order], order, len(column) - int(missing.sum()))
+        sorted_values, order, present = self._sorted[field]
+        
+        if isinstance(value, dict):
+            low, high = value.get('min'), value.get('max')
+        else:
+            low = high = value
+        
+        dtype = RANGE_DTYPES[field]
+        start = 0 if low is None else int(np.searchsorted(sorted_values[:present], np.array(low, dtype=dtype), side='left'))
+        end = present if high is None else int(np.searchsorted(sorted_values[:present], np.array(high, dtype=dtype), side='right'))
+        
+        return np.sort(order[start:end]).astype('int64')
+    
+    def select(self, filters: Dict[str, Any]) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+
+        # Returns the matching positions (None when no indexed field is filtered) and the filters left for
+        # post-filtering. Lists match any of their values; range fields also take {"min": ..., "max": ...}.
+        self._refresh()
+        positions = None
+        residual = {}
+        
+        for field, value in filters.items():
+            if field in CATEGORY_FIELDS:
+                matched = self._category_positions(field, value)
+            elif field in RANGE_FIELDS:
+                matched = self._range_positions(field, value)
+            else:
+                residual[field] = value
+                continue
+            
+            positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+        
+        # Removed and superseded rows keep their postings until the next compaction
+        if positions is not None and not self.documents.live.all():
+            positions = positions[self.documents.live[positions]]
+        
+        return positions, residual
\ No newline at end of file
@@ -1,58 +1,341 @@
 import os
-import numpy as np
+import glob
+import json
+import time
+import uuid
 import pickle
+import threading
+import numpy as np
 import faiss
 from typing import List, Dict, Any, Optional
-from src.config import EMBEDDINGS_DIR
+from src.config import (EMBEDDINGS_DIR, FAISS_INDEX_TYPE, FAISS_NPROBE, FAISS_EF_SEARCH, FAISS_PREFILTER_EXACT_MAX,
+                        FAISS_SEGMENTS_MAX)
 from src.rag.embedder import TextEmbedder
+from src.rag.index_types import create_index, set_search_params, enable_reconstruct, search_subset, index_type_of
+from src.rag.metadata_index import MetadataIndex
+from src.rag.document_store import DocumentStore, document_store_paths
+
+def segment_paths(collection_name: str, generation: str = "*") -> List[str]:
+
+    return sorted(glob.glob(os.path.join(EMBEDDINGS_DIR, f"{collection_name}_seg_{generation}_*.npz")))
+
+def store_paths(collection_name: str, segments: bool = True) -> List[str]:
+
+    # The manifest comes last: it is what makes a set of base files current
+    prefix = os.path.join(EMBEDDINGS_DIR, collection_name)
+    paths = [f"{prefix}_faiss.index"] + document_store_paths(prefix) + [f"{prefix}_segments.json"]
+    return paths + segment_paths(collection_name) if segments else paths
+
+def _segment_number(path: str) -> int:
+
+    return int(os.path.splitext(path)[0].rsplit('_', 1)[1])
+
+def _next_segment_number(collection_name: str, manifest: Dict[str, Any]) -> int:
+
+    numbers = [_segment_number(path) for path in segment_paths(collection_name, manifest['generation'])]
+    return max(numbers + [manifest['segments_through']]) + 1
+
+def _write_segment_file(path: str, records: np.ndarray, texts: bytes, vectors: np.ndarray, removed: np.ndarray):
+
+    # The segment carries its rows' texts, so compaction can rewrite the base blob while segments are being saved
+    with open(f"{path}.tmp", 'wb') as f:
+        np.savez(f, records=records, vectors=vectors, removed=removed, texts=np.frombuffer(texts, dtype=np.uint8))
+    os.replace(f"{path}.tmp", path)
+
+def _matches_metadata(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+
+    return all(key not in metadata or metadata[key] == value for key, value in filters.items())
 
 class VectorStore:
-    def __init__(self, collection_name: str = "hotel_bookings", embedding_dim: int = 384):
+    def __init__(self, collection_name: str = "hotel_bookings", embedding_dim: int = 384,
+                 index_type: str = FAISS_INDEX_TYPE, expected_vectors: int = 0):
 
         self.collection_name = collection_name
         self.embedding_dim = embedding_dim
         self.index_path = os.path.join(EMBEDDINGS_DIR, f"{collection_name}_faiss.index")
-        self.documents_path = os.path.join(EMBEDDINGS_DIR, f"{collection_name}_docs.pkl")
+        self.manifest_path = os.path.join(EMBEDDINGS_DIR, f"{collection_name}_segments.json")
         
         os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
         
-        if os.path.exists(self.index_path) and os.path.exists(self.documents_path):
-            self.index = faiss.read_index(self.index_path)
-            with open(self.documents_path, 'rb') as f:
-                self.documents = pickle.load(f)
-            print(f"Loaded existing FAISS index with {self.index.ntotal} documents")
+        # Saves append the changes since the previous save as a segment file beside the base index and
+        # documents; compaction folds the segments back into a new base
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction = None
+        
+        # A compaction in another process can replace the base files while they are being read
+        for attempt in range(3):
+            try:
+                converted = self._load(index_type, expected_vectors)
+                if self._read_manifest() == self.manifest:
+                    break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+            print("Index was compacted while loading, reloading")
         else:
-            self.index = faiss.IndexFlatL2(embedding_dim)
-            self.documents = []
-            print(f"Created new FAISS index")
+            raise RuntimeError(f"{collection_name} index kept changing while it was loaded; retry once compaction is done")
         
+        set_search_params(self.index, FAISS_NPROBE, FAISS_EF_SEARCH)
+        self.metadata_index = MetadataIndex(self.documents)
         self.embedder = TextEmbedder()
+        
+        if converted:
+            self.save()
+    
+    def _load(self, index_type: str, expected_vectors: int) -> bool:
+
+        legacy_documents_path = os.path.join(EMBEDDINGS_DIR, f"{self.collection_name}_docs.pkl")
+        self.manifest = self._read_manifest()
+        self.next_segment = 1
+        self.stale_vectors = 0
+        self._unsaved_vectors = []
+        self._unsaved_removed = []
+        
+        # Documents are memory-mapped and decoded one at a time, only for the hits a query returns
+        self.documents = DocumentStore(os.path.join(EMBEDDINGS_DIR, self.collection_name))
+        
+        if not (os.path.exists(self.index_path) and (self.documents.exists() or os.path.exists(legacy_documents_path))):
+            self.index = create_index(self.embedding_dim, index_type, expected_vectors)
+            print(f"Created new FAISS index ({index_type})")
+            return False
+        
+        self.index = faiss.read_index(self.index_path)
+        enable_reconstruct(self.index)
+        converted = self.manifest is None
+        if converted:
+            if not self.documents.exists():
+                self._convert_pickled_documents(legacy_documents_path)
+            self._key_by_booking_id()
+        else:
+            self._apply_segments()
+        print(f"Loaded existing FAISS index with {self.index.ntotal} documents")
+        return converted
+    
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_manifest(self):
+
+        with open(f"{self.manifest_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(f"{self.manifest_path}.tmp", self.manifest_path)
+    
+    def _convert_pickled_documents(self, legacy_documents_path: str):
+
+        # One-off migration of a collection saved as a pickled list of documents
+        with open(legacy_documents_path, 'rb') as f:
+            documents = pickle.load(f)
+        self.documents.add(documents)
+        self.documents.save()
+        print(f"Converted {len(documents)} pickled documents to {self.documents.records_path}")
+    
+    def _key_by_booking_id(self):
+
+        # Indexes saved before segments used document positions as ids; their vectors are re-added under
+        # booking ids, into a copy that keeps an IVF index's trained centroids
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        if faiss.try_extract_index_ivf(self.index) is not None:
+            keyed = faiss.clone_index(self.index)
+            keyed.reset()
+            enable_reconstruct(keyed)
+        else:
+            keyed = create_index(self.index.d, index_type_of(self.index))
+        keyed.add_with_ids(vectors, np.asarray(self.documents.records()['id'], dtype='int64'))
+        self.index = keyed
+        print(f"Keyed {self.index.ntotal} vectors by booking id")
+    
+    def _apply_segments(self):
+
+        # A segment replaces every booking it holds, so replaying one already folded into the base by an
+        # interrupted compaction leaves the same documents and vectors
+        self.next_segment = self.manifest['segments_through'] + 1
+        for path in segment_paths(self.collection_name, self.manifest['generation']):
+            number = _segment_number(path)
+            if number < self.next_segment:
+                continue
+            with np.load(path) as segment:
+                records, vectors, removed = segment['records'], segment['vectors'], segment['removed']
+                texts = segment['texts'].tobytes()
+            
+            self._drop(np.concatenate([removed, records['id']]))
+            if len(records):
+                if not self.index.is_trained:
+                    self.index.train(vectors)
+                self.index.add_with_ids(vectors, records['id'])
+                self.documents.extend(records, texts)
+            self.next_segment = number + 1
     
-    def add_documents(self, documents: List[Dict[str, Any]]):
+    def _drop(self, booking_ids: np.ndarray) -> np.ndarray:
+
+        # Removes the current document and vector of every given booking that has one
+        positions = self.documents.positions_of(booking_ids)
+        present = positions >= 0
+        dropped = np.asarray(booking_ids, dtype='int64')[present]
+        if not len(dropped):
+            return dropped
+        
+        self.documents.remove(positions[present])
+        try:
+            self.index.remove_ids(dropped)
+        except RuntimeError:
+            # HNSW graphs cannot remove vectors; superseded ones are skipped on search until compaction
+            self.stale_vectors += len(dropped)
+        return dropped
+    
+    def add_documents(self, documents: List[Dict[str, Any]], save: bool = True):
 
         if not documents:
             print("No documents to add")
             return
         
         texts = [doc['text'] for doc in documents]
-        embeddings = self.embedder.embed_batch(texts)
-        
-        self.index.add(np.array(embeddings).astype('float32'))
+        self.add_embeddings(documents, self.embedder.embed_batch(texts), save)
+    
+    def add_embeddings(self, documents: List[Dict[str, Any]], embeddings: np.ndarray, save: bool = True,
+                       replace: bool = True):
+
+        vectors = np.array(embeddings).astype('float32')
+        booking_ids = np.array([doc['metadata']['id'] for doc in documents], dtype='int64')
         
-        start_idx = len(self.documents)
-        for i, doc in enumerate(documents):
-            doc['faiss_id'] = start_idx + i
-            self.documents.append(doc)
+        with self._lock:
+            # Adding a booking that is already indexed replaces its document and vector; a build, whose
+            # bookings are all new, skips the lookup
+            if replace:
+                replaced = self._drop(booking_ids)
+                if len(replaced):
+                    self._unsaved_removed.append(replaced)
+            
+            # IVF indexes learn their centroids (and PQ codebooks) from the first vectors they are given
+            if not self.index.is_trained:
+                print(f"Training FAISS index on {len(vectors)} vectors")
+                self.index.train(vectors)
+            self.index.add_with_ids(vectors, booking_ids)
+            
+            self.documents.add(documents)
+            self._unsaved_vectors.append(vectors)
         
         print(f"Added {len(documents)} documents to the FAISS index")
         
-        self._save()
+        # Batched builds save once at the end instead of rewriting the index after every batch
+        if save:
+            self.save()
+    
+    def remove_documents(self, booking_ids: List[int], save: bool = True):
+
+        with self._lock:
+            removed = self._drop(np.asarray(booking_ids, dtype='int64'))
+            if len(removed):
+                self._unsaved_removed.append(removed)
+        
+        print(f"Removed {len(removed)} documents from the FAISS index")
+        if save:
+            self.save()
+    
+    def save(self):
+
+        with self._lock:
+            if self.manifest is None:
+                # A new collection is written out whole; after that only changes are appended as segments
+                self.documents.flush()
+                self._unsaved_vectors, self._unsaved_removed = [], []
+                self.manifest = {'generation': uuid.uuid4().hex[:12], 'segments_through': 0, 'data_version': None}
+                self._write_base(faiss.serialize_index(self.index), self.documents.live_records(), 0)
+                print(f"Saved FAISS index and documents to {EMBEDDINGS_DIR}")
+                return
+            if not self._unsaved_vectors and not self._unsaved_removed:
+                return
+            
+            path = self._write_segment()
+            segments = self.next_segment - 1 - self.manifest['segments_through']
+        
+        print(f"Saved changes to {os.path.basename(path)} ({segments} segment(s) since the last compaction)")
+        if segments > FAISS_SEGMENTS_MAX:
+            self.compact(background=True)
     
-    def _save(self):
-        faiss.write_index(self.index, self.index_path)
-        with open(self.documents_path, 'wb') as f:
-            pickle.dump(self.documents, f)
-        print(f"Saved FAISS index and documents to {EMBEDDINGS_DIR}")
+    def _write_segment(self) -> str:
+
+        records, live = self.documents.flush()
+        vectors = np.vstack(self._unsaved_vectors)[live] if self._unsaved_vectors else np.zeros((0, self.index.d), dtype='float32')
+        removed = np.concatenate(self._unsaved_removed) if self._unsaved_removed else np.zeros(0, dtype='int64')
+        
+        # Rows added and then replaced or removed before this save never reach the segment
+        records, texts = self.documents.packed(records[live])
+        path = os.path.join(EMBEDDINGS_DIR, f"{self.collection_name}_seg_{self.manifest['generation']}_{self.next_segment:06d}.npz")
+        _write_segment_file(path, records, texts, vectors, removed)
+        
+        self.next_segment += 1
+        self._unsaved_vectors, self._unsaved_removed = [], []
+        return path
+    
+    def _write_base(self, index_bytes: np.ndarray, records: np.ndarray, segments_through: int):
+
+        # Each file is replaced atomically and the manifest last; a crash in between is repaired on load by
+        # replaying the segments the manifest still lists over whichever base files were replaced
+        with open(f"{self.index_path}.tmp", 'wb') as f:
+            f.write(index_bytes.tobytes())
+        self.documents.write_base(records)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+        
+        with self._lock:
+            self.manifest['segments_through'] = segments_through
+            self._write_manifest()
+        
+        for path in segment_paths(self.collection_name):
+            if f"_seg_{self.manifest['generation']}_" not in path or _segment_number(path) <= segments_through:
+                os.remove(path)
+    
+    def compact(self, background: bool = False):
+
+        if background:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._compaction = threading.Thread(target=self.compact, name=f"compact-{self.collection_name}", daemon=True)
+                self._compaction.start()
+            return
+        
+        with self._compaction_lock:
+            with self._lock:
+                self.save()
+                segments_through = self.next_segment - 1
+                if segments_through <= self.manifest['segments_through'] and not self.stale_vectors:
+                    return
+                if self.stale_vectors:
+                    self._rebuild_graph()
+                index_bytes = faiss.serialize_index(self.index)
+                records = self.documents.live_records()
+            
+            # Written outside the lock, so queries and new segments carry on while the base is rewritten
+            start_time = time.time()
+            self._write_base(index_bytes, records, segments_through)
+            print(f"Compacted {self.collection_name} into a base of {len(records)} documents in {time.time() - start_time:.1f}s")
+    
+    def wait_for_compaction(self):
+
+        if self._compaction is not None:
+            self._compaction.join()
+    
+    def _rebuild_graph(self):
+
+        # Rebuilds an HNSW graph from the live vectors, leaving out those superseded by updates or removed
+        booking_ids = np.asarray(self.documents.live_records()['id'], dtype='int64')
+        vectors = self.index.reconstruct_batch(booking_ids)
+        index = create_index(self.index.d, 'hnsw')
+        index.add_with_ids(vectors, booking_ids)
+        set_search_params(index, FAISS_NPROBE, FAISS_EF_SEARCH)
+        self.index = index
+        self.stale_vectors = 0
+    
+    def set_data_version(self, data_version: int):
+
+        # The data version the index reflects; incremental updates re-embed bookings changed after it
+        with self._lock:
+            self.save()
+            self.manifest['data_version'] = data_version
+            self._write_manifest()
     
     def query(self, query_text: str, n_results: int = 5, filter_metadata: Optional[Dict] = None) -> Dict:
 
@@ -63,36 +346,91 @@ class VectorStore:
         query_embedding = self.embedder.embed_text(query_text)
         query_embedding = np.array([query_embedding]).astype('float32')
         
-        distances, indices = self.index.search(query_embedding, n_results)
+        # Indexed metadata fields restrict the search to their matching documents up front, so a
+        # selective filter still returns n_results hits. Other fields narrow a small candidate set
+        # the same way, and are otherwise checked on the hits.
+        candidate_ids, residual_filters = None, {}
+        if filter_metadata:
+            positions, residual_filters = self.metadata_index.select(filter_metadata)
+            if residual_filters and positions is not None and len(positions) <= FAISS_PREFILTER_EXACT_MAX:
+                positions = np.array([
+                    idx for idx in positions if _matches_metadata(self.documents.metadata(idx), residual_filters)
+                ], dtype='int64')
+                residual_filters = {}
+            if positions is not None:
+                candidate_ids = self.documents.ids_at(positions)
+        
+        # Vectors superseded in an HNSW graph can take some of the top slots until the next compaction
+        k = n_results + min(self.stale_vectors, n_results * 4)
+        distances, labels = search_subset(self.index, query_embedding, k, candidate_ids)
+        positions = self.documents.positions_of(labels[0])
         
         results_ids = []
         results_documents = []
         results_metadatas = []
         results_distances = []
         
-        for i, idx in enumerate(indices[0]):
-            if idx < 0 or idx >= len(self.documents):
+        for i, idx in enumerate(positions):
+            if idx < 0 or str(labels[0][i]) in results_ids:
                 continue
-                
+            
             doc = self.documents[idx]
             
-            if filter_metadata:
-                skip = False
-                for key, value in filter_metadata.items():
-                    if key in doc['metadata'] and doc['metadata'][key] != value:
-                        skip = True
-                        break
-                if skip:
-                    continue
+            if residual_filters and not _matches_metadata(doc['metadata'], residual_filters):
+                continue
             
             results_ids.append(doc['id'])
             results_documents.append(doc['text'])
             results_metadatas.append(doc['metadata'])
             results_distances.append(float(distances[0][i]))
+            if len(results_ids) == n_results:
+                break
         
         return {
             'ids': [results_ids],
             'documents': [results_documents],
             'metadatas': [results_metadatas],
             'distances': [results_distances]
-        }
\ No newline at end of file
+        }
+
+class SegmentWriter:
+    def __init__(self, collection_name: str = "hotel_bookings"):
+
+        # Appends one segment to a saved collection without loading it: only the manifest, the vocabularies
+        # and the memory-mapped base records are opened, so the cost follows the size of the change.
+        # Replaying the segment replaces every booking it holds, so superseded rows need no lookup here
+        self.collection_name = collection_name
+        self.manifest_path = os.path.join(EMBEDDINGS_DIR, f"{collection_name}_segments.json")
+        if not os.path.exists(self.manifest_path):
+            raise ValueError(f"No saved {collection_name} index to append to")
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.documents = DocumentStore(os.path.join(EMBEDDINGS_DIR, collection_name))
+        self._vectors = []
+    
+    def add_embeddings(self, documents: List[Dict[str, Any]], embeddings: np.ndarray):
+
+        self.documents.add(documents)
+        self._vectors.append(np.array(embeddings).astype('float32'))
+    
+    def save(self, data_version: int) -> int:
+
+        # Writes the segment, then records the data version it brings the collection to; returns the
+        # number of segments since the last compaction
+        if self._vectors:
+            records, _ = self.documents.flush()
+            records, texts = self.documents.packed(records)
+            path = os.path.join(EMBEDDINGS_DIR, f"{self.collection_name}_seg_{self.manifest['generation']}_"
+                                                f"{_next_segment_number(self.collection_name, self.manifest):06d}.npz")
+            _write_segment_file(path, records, texts, np.vstack(self._vectors), np.zeros(0, dtype='int64'))
+            self._vectors = []
+            print(f"Saved changes to {os.path.basename(path)}")
+        
+        # Read again, so a compaction that finished meanwhile is not undone
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.manifest['data_version'] = data_version
+        with open(f"{self.manifest_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(f"{self.manifest_path}.tmp", self.manifest_path)
+        return _next_segment_number(self.collection_name, self.manifest) - 1 - self.manifest['segments_through']